@@ -1,63 +1,454 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, abort, render_template, jsonify, request, g
 from utils.stack import Stack
 from utils.queue import Queue
-import heapq
+from utils.linked_list import LinkedList, LIST_TYPES
+from utils.state_store import create_state_store
+from utils.process_import import detect_format, normalize_processes, parse_processes
+from utils.change_log import sync_payload
+from utils.broadcast import Broadcaster
+from utils.expression import compile_expression, describe_trace, ExpressionError
+from utils.graph import ALGORITHMS, GraphBuilder, describe_event, run_algorithm
+from utils.sorting import SEARCHES, SORTS, generate_values, run_counted, run_fast
+from utils.sorting import describe_event as describe_sort_event
+from utils.trace import TraceWindow
+from utils.typed_buffer import check_capacity
+from utils.metrics import Metrics, SamplingProfiler, SIZE_BUCKETS
+from utils.persistence import CheckpointGate, Journal, ScenarioLibrary, load_snapshot, save_snapshot
+from utils.serving import AssetCache, OrjsonProvider, PageCache, orjson
+from contextlib import contextmanager, nullcontext
+import hmac
+import json
+import os
+import time
+import uuid
 
 app = Flask(__name__)
+app.config.from_object('config')
+
+if app.config['FAST_JSON'] and orjson is not None:
+    app.json = OrjsonProvider(app)
+
+page_cache = PageCache()
+asset_cache = AssetCache(app.static_folder)
+
+def cached_response(entry, max_age):
+    """Serve a cached body, gzipped when the client accepts it, answering If-None-Match with a 304"""
+    gzipped = entry.gzipped is not None and request.accept_encodings['gzip'] > 0
+    response = Response(entry.gzipped if gzipped else entry.body, mimetype=entry.mimetype)
+    if gzipped:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(entry.etag + '-gz' if gzipped else entry.etag)
+    response.vary.add('Accept-Encoding')
+    if max_age:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def render_page(template):
+    """Render a page once and serve the cached copy after that (not in debug mode)"""
+    if not app.config['PAGE_CACHE'] or app.debug:
+        return render_template(template)
+    # Static URLs in the page depend on the mount point
+    entry = page_cache.get((template, request.script_root), lambda: render_template(template))
+    return cached_response(entry, 0)
+
+def static_version(entry):
+    return entry.etag[:12]
+
+def send_static(filename):
+    entry = asset_cache.get(filename)
+    if entry is None:
+        abort(404)
+    # Only a URL naming the current content is cached without revalidation,
+    # anything else (an old version, no version) is revalidated by ETag
+    versioned = request.args.get('v') == static_version(entry)
+    return cached_response(entry, app.config['STATIC_MAX_AGE'] if versioned else 0)
+
+def version_static_urls(endpoint, values):
+    # url_for('static', ...) gets the file's content hash, so a deploy changes the URL
+    if endpoint == 'static' and 'v' not in values:
+        entry = asset_cache.get(values.get('filename', ''))
+        if entry is not None:
+            values['v'] = static_version(entry)
+
+# Static files are served from memory, precompressed, in place of Flask's own view
+if app.config['STATIC_CACHE']:
+    app.view_functions['static'] = send_static
+    app.url_defaults(version_static_urls)
+    asset_cache.precompress()
 
 # Homepage route
 @app.route('/')
 def homepage():
-    return render_template('homepage.html')
+    return render_page('homepage.html')
 
 # Stack visualization route
 @app.route('/stacks')
 def stacks():
-    return render_template('stacks.html')
+    return render_page('stacks.html')
 
 # Queue visualization route
 @app.route('/queues')
 def queues():
-    return render_template('queues.html')
+    return render_page('queues.html')
+
+# Linked list visualization route
+@app.route('/linked_lists')
+def linked_lists():
+    return render_page('linked_lists.html')
+
+# Builders for the structures every session starts with
+STRUCTURE_BUILDERS = {
+    'stack': lambda: Stack(history_limit=app.config['HISTORY_LIMIT']),
+    'linear': lambda: Queue(queue_type='linear', history_limit=app.config['HISTORY_LIMIT']),
+    'circular': lambda: Queue(queue_type='circular', history_limit=app.config['HISTORY_LIMIT']),
+    'deque': lambda: Queue(queue_type='deque', history_limit=app.config['HISTORY_LIMIT']),
+    'priority': lambda: Queue(queue_type='priority', history_limit=app.config['HISTORY_LIMIT']),
+    'singly_list': lambda: LinkedList(list_type='singly'),
+    'doubly_list': lambda: LinkedList(list_type='doubly'),
+    'circular_list': lambda: LinkedList(list_type='circular'),
+}
+
+QUEUE_TYPES = ('linear', 'circular', 'deque', 'priority')
+
+# Every visitor gets their own structures, kept in the configured backend
+state_store = create_state_store(app.config, STRUCTURE_BUILDERS)
+
+def get_session_id():
+    """Get the caller's session id from the header or cookie, assigning one if missing"""
+    session_id = request.headers.get('X-Session-Id')
+    if session_id:
+        return session_id
+    # Cookie sessions get their cookie sent again, see refresh_session_cookie
+    session_id = request.cookies.get(app.config['SESSION_COOKIE']) or uuid.uuid4().hex
+    g.cookie_session_id = session_id
+    return session_id
+
+# Pushes structure changes to viewers watching a shared session
+broadcaster = Broadcaster(
+    max_subscribers=app.config['STREAM_MAX_VIEWERS'],
+    buffer_size=app.config['STREAM_BUFFER_SIZE'],
+    share_ttl=app.config['STREAM_SHARE_TTL']
+)
+
+# Request timing and operation counters, served at /metrics when enabled
+metrics = Metrics(enabled=app.config['METRICS_ENABLED'], max_series=app.config['METRICS_MAX_SERIES'])
+profiler = SamplingProfiler(metrics, interval=app.config['PROFILER_INTERVAL'])
+
+# Operation journal for crash recovery, set up by recover_state when JOURNAL_PATH is configured
+journal = None
+checkpoint_gate = CheckpointGate()
+scenarios = ScenarioLibrary(app.config['SCENARIO_DIR'], app.config['SNAPSHOT_MMAP_THRESHOLD'],
+                            app.config['SCENARIO_MAX_COUNT'], app.config['SCENARIO_MAX_BYTES'])
+
+@contextmanager
+def open_structure(name, read_only=False):
+    """Open the caller's structure for the duration of a request
+
+    read_only requests are not written back, so the shared backends can
+    serve them without taking a write lock.
+    """
+    session_id = get_session_id()
+    g.structure_name = name
+    g.journal_operations = []
+    with checkpoint_gate.shared() if journal is not None else nullcontext():
+        with state_store.open(session_id, name, read_only) as structure:
+            version = structure.changes.version
+            try:
+                yield structure
+            except Exception as e:
+                metrics.record_error(name, e)
+                raise
+            metrics.observe('dsa_structure_size', (('structure', name),), structure.size(), SIZE_BUCKETS)
+            if g.journal_operations:
+                journal.append({'s': session_id, 'n': name, 'o': g.journal_operations})
+            if structure.changes.version != version:
+                broadcaster.publish(session_id, name, structure.changes.version,
+                                    structure.changes.since(version))
+    if journal is not None and (g.pop('checkpoint_needed', False)
+                                or journal.count >= app.config['JOURNAL_CHECKPOINT_EVERY']):
+        checkpoint()
+
+def journal_operation(run_operation, data):
+    """Remember a successful operation for the journal if it changed the structure"""
+    if journal is None:
+        return
+    kind = RUNNER_KINDS[run_operation]
+    if kind == 'scheduler':
+        mutating = data.get('action') in SCHEDULER_MUTATIONS
+    else:
+        mutating = data.get('operation') not in READ_ONLY_OPERATIONS
+    if mutating:
+        g.journal_operations.append([kind, data])
+
+@app.before_request
+def start_request_timer():
+    if metrics.enabled:
+        g.request_started = time.perf_counter()
+
+def operation_label():
+    """Name the operation a request ran, for the latency metric's labels"""
+    if request.path.endswith('/batch'):
+        return 'batch'
+    data = request.get_json(silent=True) if request.is_json else None
+    if not isinstance(data, dict):
+        return ''
+    operation = data.get('operation') or data.get('action') or data.get('algorithm') or ''
+    return operation if isinstance(operation, str) and len(operation) <= 32 else 'other'
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('dsa_request_duration_seconds', (('route', route), ('operation', operation_label())),
+                        time.perf_counter() - started)
+    return response
 
-# Initialize global instances
-stack = Stack()
-linear_queue = Queue(queue_type='linear')
-circular_queue = Queue(queue_type='circular')
-deque_queue = Queue(queue_type='deque')
-priority_queue = Queue(queue_type='priority')
+@app.after_request
+def refresh_session_cookie(response):
+    # Sessions expire after SESSION_TTL of inactivity, so the cookie's max_age
+    # restarts on every request that used the session
+    session_id = g.pop('cookie_session_id', None)
+    if session_id:
+        response.set_cookie(app.config['SESSION_COOKIE'], session_id,
+                            max_age=app.config['SESSION_TTL'], httponly=True, samesite='Lax')
+    return response
+
+def capacity_option(structure, data):
+    """Get the capacity to configure, a null capacity meaning the largest allowed (MAX_CAPACITY)"""
+    capacity = check_capacity(data['capacity'] if 'capacity' in data else structure.capacity)
+    max_capacity = app.config['MAX_CAPACITY']
+    if capacity is None:
+        return max_capacity
+    if capacity > max_capacity:
+        raise Exception(f"Capacity can be at most {max_capacity}")
+    return capacity
+
+def configure_options(structure, data):
+    """Get the capacity and element type to configure"""
+    element_type = data['element_type'] if 'element_type' in data else structure.element_type
+    return capacity_option(structure, data), element_type
+
+def list_option(data, key):
+    values = data.get(key)
+    if not isinstance(values, list):
+        raise Exception(f"{key} must be a list")
+    return values
+
+def count_option(data):
+    count = data.get('count')
+    if isinstance(count, bool) or not isinstance(count, int) or count < 0:
+        raise Exception("count must be a non-negative integer")
+    return count
+
+# Apply a single stack operation and return its result
+def run_stack_operation(stack, operation, data):
+    if operation == 'push':
+        return stack.push(data.get('value'))
+    elif operation == 'pop':
+        return stack.pop()
+    elif operation == 'push_many':
+        return stack.push_many(list_option(data, 'values'))
+    elif operation == 'pop_many':
+        return stack.pop_many(count_option(data))
+    elif operation == 'peek':
+        return stack.peek()
+    elif operation == 'size':
+        return stack.size()
+    elif operation == 'is_empty':
+        return stack.is_empty()
+    elif operation == 'clear':
+        stack.clear()
+        return "Stack cleared"
+    elif operation == 'get_all':
+        return stack.to_list()
+    elif operation == 'configure':
+        return stack.configure(*configure_options(stack, data))
+    elif operation == 'get_config':
+        return stack.get_config()
+    elif operation == 'undo':
+        return stack.undo()
+    elif operation == 'redo':
+        return stack.redo()
+    elif operation == 'jump':
+        return stack.jump(data.get('step'))
+    elif operation == 'get_history':
+        return stack.get_history(*trace_window(data))
+    elif operation == 'get_changes':
+        return sync_payload(stack, data.get('since'))
+    else:
+        raise Exception("Invalid operation")
+
+# Apply a single queue operation and return its result
+def run_queue_operation(queue_instance, operation, data):
+    value = data.get('value')
+    priority = data.get('priority')
+    
+    if operation == 'enqueue':
+        return queue_instance.enqueue(value, priority)
+    elif operation == 'dequeue':
+        return queue_instance.dequeue()
+    elif operation == 'enqueue_many':
+        return queue_instance.enqueue_many(list_option(data, 'values'), priority)
+    elif operation == 'dequeue_many':
+        return queue_instance.dequeue_many(count_option(data))
+    elif operation == 'enqueue_front':
+        return queue_instance.enqueue_front(value)
+    elif operation == 'dequeue_rear':
+        return queue_instance.dequeue_rear()
+    elif operation == 'update_priority':
+        return queue_instance.update_priority(data.get('element_id'), priority)
+    elif operation == 'peek':
+        return queue_instance.peek()
+    elif operation == 'size':
+        return queue_instance.size()
+    elif operation == 'is_empty':
+        return queue_instance.is_empty()
+    elif operation == 'is_full':
+        return queue_instance.is_full()
+    elif operation == 'clear':
+        queue_instance.clear()
+        return "Queue cleared"
+    elif operation == 'get_all':
+        return queue_instance.to_list()
+    elif operation == 'configure':
+        return queue_instance.configure(*configure_options(queue_instance, data))
+    elif operation == 'get_config':
+        return queue_instance.get_config()
+    elif operation == 'undo':
+        return queue_instance.undo()
+    elif operation == 'redo':
+        return queue_instance.redo()
+    elif operation == 'jump':
+        return queue_instance.jump(data.get('step'))
+    elif operation == 'get_history':
+        return queue_instance.get_history(*trace_window(data))
+    elif operation == 'get_changes':
+        return sync_payload(queue_instance, data.get('since'))
+    else:
+        raise Exception("Invalid operation")
+
+# Apply a single linked list operation and return its result
+def run_linked_list_operation(linked_list, operation, data):
+    value = data.get('value')
+    index = data.get('index')
+    
+    if operation == 'insert_head':
+        return linked_list.insert_head(value)
+    elif operation == 'insert_tail':
+        return linked_list.insert_tail(value)
+    elif operation == 'insert_at':
+        return linked_list.insert_at(index, value)
+    elif operation == 'remove_head':
+        return linked_list.remove_head()
+    elif operation == 'remove_tail':
+        return linked_list.remove_tail()
+    elif operation == 'remove_at':
+        return linked_list.remove_at(index)
+    elif operation == 'remove_value':
+        return linked_list.remove_value(value)
+    elif operation == 'find':
+        return linked_list.find(value)
+    elif operation == 'get':
+        return linked_list.get(index)
+    elif operation == 'reverse':
+        return linked_list.reverse()
+    elif operation == 'merge':
+        return linked_list.merge(data.get('values') or [], data.get('ordered', False))
+    elif operation == 'peek':
+        return linked_list.peek()
+    elif operation == 'size':
+        return linked_list.size()
+    elif operation == 'is_empty':
+        return linked_list.is_empty()
+    elif operation == 'is_full':
+        return linked_list.is_full()
+    elif operation == 'clear':
+        linked_list.clear()
+        return "Linked list cleared"
+    elif operation == 'get_all':
+        return linked_list.to_list()
+    elif operation == 'get_nodes':
+        return linked_list.get_nodes()
+    elif operation == 'configure':
+        return linked_list.configure(capacity_option(linked_list, data))
+    elif operation == 'get_config':
+        return linked_list.get_config()
+    elif operation == 'get_changes':
+        return sync_payload(linked_list, data.get('since'))
+    else:
+        raise Exception("Invalid operation")
+
+# Operations that never change a structure, batches of only these skip the rollback copy
+READ_ONLY_OPERATIONS = {'peek', 'size', 'is_empty', 'is_full', 'get_all', 'get_changes', 'find', 'get', 'get_nodes',
+                        'get_config', 'get_history'}
+
+def read_only_batch(operations):
+    """Tell whether every operation of a batch leaves the structure unchanged"""
+    return isinstance(operations, list) and all(
+        isinstance(op, dict) and op.get('operation') in READ_ONLY_OPERATIONS for op in operations)
+
+def run_batch(structure, run_operation, data):
+    """Run an ordered list of operations against one structure
+
+    Atomic batches (the default) stop at the first failure and restore the
+    structure to its state before the batch; otherwise failures are
+    reported per operation and the rest still run.
+    """
+    operations = data.get('operations') or []
+    if len(operations) > app.config['BATCH_MAX_OPERATIONS']:
+        return {"result": "error",
+                "message": f"A batch can hold at most {app.config['BATCH_MAX_OPERATIONS']} operations"}
+    
+    atomic = data.get('atomic', True)
+    backup = structure.to_state() if atomic and not read_only_batch(operations) else None
+    
+    results = []
+    for index, op in enumerate(operations):
+        try:
+            results.append({"result": "success", "data": run_operation(structure, op.get('operation'), op)})
+            journal_operation(run_operation, op)
+        except Exception as e:
+            metrics.record_error(g.get('structure_name', ''), e)
+            if atomic:
+                if backup is not None:
+                    structure.load_state(backup)
+                    g.journal_operations.clear()
+                return {"result": "error", "message": str(e), "failed_index": index, "data": results}
+            results.append({"result": "error", "message": str(e)})
+    
+    response = {"result": "success", "data": results}
+    if data.get('snapshot'):
+        response["snapshot"] = structure.to_list()
+    if 'since' in data:
+        # Only the operations the client has not seen yet
+        response["sync"] = sync_payload(structure, data.get('since'))
+    return response
 
 # API endpoint for stack operations
 @app.route('/api/stack', methods=['POST'])
 def stack_api():
     data = request.json
-    operation = data.get('operation')
-    value = data.get('value')
     
     try:
-        if operation == 'push':
-            result = stack.push(value)
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'pop':
-            result = stack.pop()
+        with open_structure('stack', read_only=data.get('operation') in READ_ONLY_OPERATIONS) as stack:
+            result = run_stack_operation(stack, data.get('operation'), data)
+            journal_operation(run_stack_operation, data)
             return jsonify({"result": "success", "data": result})
-        elif operation == 'peek':
-            result = stack.peek()
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'size':
-            result = stack.size()
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'is_empty':
-            result = stack.is_empty()
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'clear':
-            stack.clear()
-            return jsonify({"result": "success", "data": "Stack cleared"})
-        elif operation == 'get_all':
-            result = stack.to_list()
-            return jsonify({"result": "success", "data": result})
-        else:
-            return jsonify({"result": "error", "message": "Invalid operation"})
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+# API endpoint for a batch of stack operations
+@app.route('/api/stack/batch', methods=['POST'])
+def stack_batch_api():
+    data = request.json
+    
+    try:
+        with open_structure('stack', read_only=read_only_batch(data.get('operations'))) as stack:
+            return jsonify(run_batch(stack, run_stack_operation, data))
     except Exception as e:
         return jsonify({"result": "error", "message": str(e)})
 
@@ -65,59 +456,77 @@ def stack_api():
 @app.route('/api/queue', methods=['POST'])
 def queue_api():
     data = request.json
-    operation = data.get('operation')
-    value = data.get('value')
-    priority = data.get('priority')
     queue_type = data.get('queue_type', 'linear')
     
     # Select the appropriate queue instance
-    if queue_type == 'linear':
-        queue_instance = linear_queue
-    elif queue_type == 'circular':
-        queue_instance = circular_queue
-    elif queue_type == 'deque':
-        queue_instance = deque_queue
-    elif queue_type == 'priority':
-        queue_instance = priority_queue
-    else:
+    if queue_type not in QUEUE_TYPES:
         return jsonify({"result": "error", "message": "Invalid queue type"})
     
     try:
-        if operation == 'enqueue':
-            result = queue_instance.enqueue(value, priority)
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'dequeue':
-            result = queue_instance.dequeue()
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'enqueue_front':
-            result = queue_instance.enqueue_front(value)
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'dequeue_rear':
-            result = queue_instance.dequeue_rear()
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'peek':
-            result = queue_instance.peek()
+        with open_structure(queue_type, read_only=data.get('operation') in READ_ONLY_OPERATIONS) as queue_instance:
+            result = run_queue_operation(queue_instance, data.get('operation'), data)
+            journal_operation(run_queue_operation, data)
             return jsonify({"result": "success", "data": result})
-        elif operation == 'size':
-            result = queue_instance.size()
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'is_empty':
-            result = queue_instance.is_empty()
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'is_full':
-            result = queue_instance.is_full()
-            return jsonify({"result": "success", "data": result})
-        elif operation == 'clear':
-            queue_instance.clear()
-            return jsonify({"result": "success", "data": "Queue cleared"})
-        elif operation == 'get_all':
-            result = queue_instance.to_list()
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+# API endpoint for a batch of queue operations
+@app.route('/api/queue/batch', methods=['POST'])
+def queue_batch_api():
+    data = request.json
+    queue_type = data.get('queue_type', 'linear')
+    
+    if queue_type not in QUEUE_TYPES:
+        return jsonify({"result": "error", "message": "Invalid queue type"})
+    
+    try:
+        with open_structure(queue_type, read_only=read_only_batch(data.get('operations'))) as queue_instance:
+            return jsonify(run_batch(queue_instance, run_queue_operation, data))
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+# API endpoint for linked list operations
+@app.route('/api/linked_list', methods=['POST'])
+def linked_list_api():
+    data = request.json
+    list_type = data.get('list_type', 'singly')
+    
+    if list_type not in LIST_TYPES:
+        return jsonify({"result": "error", "message": "Invalid list type"})
+    
+    try:
+        with open_structure(f"{list_type}_list",
+                            read_only=data.get('operation') in READ_ONLY_OPERATIONS) as linked_list:
+            result = run_linked_list_operation(linked_list, data.get('operation'), data)
+            journal_operation(run_linked_list_operation, data)
             return jsonify({"result": "success", "data": result})
-        else:
-            return jsonify({"result": "error", "message": "Invalid operation"})
     except Exception as e:
         return jsonify({"result": "error", "message": str(e)})
 
+# API endpoint for a batch of linked list operations
+@app.route('/api/linked_list/batch', methods=['POST'])
+def linked_list_batch_api():
+    data = request.json
+    list_type = data.get('list_type', 'singly')
+    
+    if list_type not in LIST_TYPES:
+        return jsonify({"result": "error", "message": "Invalid list type"})
+    
+    try:
+        with open_structure(f"{list_type}_list", read_only=read_only_batch(data.get('operations'))) as linked_list:
+            return jsonify(run_batch(linked_list, run_linked_list_operation, data))
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+# Step traces are returned one window at a time
+def trace_window(data):
+    """Read the requested trace window, capped at TRACE_PAGE_SIZE events"""
+    page_size = app.config['TRACE_PAGE_SIZE']
+    offset = max(int(data.get('offset') or 0), 0)
+    limit = data.get('limit')
+    limit = page_size if limit is None else min(max(int(limit), 0), page_size)
+    return offset, limit
+
 # API endpoint for expression evaluation
 @app.route('/api/evaluate_expression', methods=['POST'])
 def evaluate_expression():
@@ -125,153 +534,466 @@ def evaluate_expression():
     expression = data.get('expression')
     
     try:
-        # Convert infix to postfix
-        postfix_expression = infix_to_postfix(expression)
+        # Compile to postfix once, repeated expressions come from the cache
+        program = compile_expression(expression)
+        
+        bindings = data.get('bindings')
+        if bindings is not None:
+            # One compiled program evaluated over every set of variables
+            if not isinstance(bindings, list) or not all(isinstance(b, dict) for b in bindings):
+                raise Exception("bindings must be a list of objects")
+            if len(bindings) > app.config['EXPRESSION_MAX_BINDINGS']:
+                raise Exception(f"At most {app.config['EXPRESSION_MAX_BINDINGS']} bindings can be evaluated at once")
+            results, errors = program.run_many(bindings)
+            return jsonify({
+                "result": "success",
+                "postfix": program.postfix,
+                "variables": program.names,
+                "results": results,
+                "errors": errors
+            })
         
-        # Evaluate postfix expression
-        result, evaluation_steps = evaluate_postfix(postfix_expression)
+        variables = data.get('variables') or {}
+        if not isinstance(variables, dict):
+            raise Exception("variables must be an object")
         
-        return jsonify({
+        # The compact trace is cheap to record; clients that need no steps can opt out
+        result, trace = program.run(record_trace=data.get('steps', True), variables=variables)
+        trace = trace or []
+        offset, limit = trace_window(data)
+        
+        response = {
             "result": "success", 
-            "postfix": postfix_expression,
-            "evaluation_steps": evaluation_steps,
-            "final_result": result
-        })
+            "postfix": program.postfix,
+            "variables": program.names,
+            "final_result": result,
+            "trace_window": {"offset": offset, "total": len(trace)}
+        }
+        if data.get('trace') == 'compact':
+            response["trace"] = trace[offset:offset + limit]
+        else:
+            response["evaluation_steps"] = describe_trace(trace, offset, limit)
+        return jsonify(response)
+    except ExpressionError as e:
+        return jsonify({"result": "error", "message": str(e), "position": e.position})
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+# API endpoint for graph algorithms over a graph sent with the request
+@app.route('/api/graph', methods=['POST'])
+def graph_api():
+    data = request.json
+    algorithm = data.get('algorithm')
+    
+    if algorithm not in ALGORITHMS:
+        return jsonify({"result": "error", "message": "Invalid algorithm"})
+    
+    try:
+        # Edges come as [source, target, weight] lists or as parallel arrays,
+        # and are packed straight into typed arrays. The limits are checked
+        # before anything is allocated
+        nodes = data.get('nodes') or []
+        edges = (data.get('sources') if 'sources' in data else data.get('edges')) or []
+        if not isinstance(nodes, list) or not isinstance(edges, list):
+            raise Exception("nodes and edges must be lists")
+        if len(edges) > app.config['GRAPH_MAX_EDGES']:
+            raise Exception(f"A graph can have at most {app.config['GRAPH_MAX_EDGES']} edges")
+        if len(nodes) > app.config['GRAPH_MAX_NODES']:
+            raise Exception(f"A graph can have at most {app.config['GRAPH_MAX_NODES']} nodes")
+        
+        builder = GraphBuilder(directed=data.get('directed', False), max_nodes=app.config['GRAPH_MAX_NODES'])
+        for label in nodes:
+            builder.add_node(label)
+        if 'sources' in data:
+            builder.add_edge_columns(edges, data.get('targets') or [], data.get('weights'))
+        else:
+            builder.add_edges(edges)
+        graph = builder.build()
+        
+        # Only the requested window of the trace is kept while the algorithm runs
+        trace = None
+        if data.get('trace'):
+            offset, limit = trace_window(data)
+            trace = TraceWindow(offset, limit)
+        
+        result = run_algorithm(graph, algorithm, data.get('source'), data.get('target'), trace)
+        result['node_count'] = graph.node_count()
+        result['edge_count'] = graph.edge_count
+        if trace is not None:
+            result['trace_window'] = {"offset": trace.offset, "total": trace.total}
+            if data.get('trace') == 'compact':
+                result['trace'] = trace.events
+            else:
+                result['steps'] = [describe_event(graph, event) for event in trace.events]
+        return jsonify({"result": "success", "data": result})
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+# API endpoint for sorting and searching, traced for animation or timed on large inputs
+@app.route('/api/sorting', methods=['POST'])
+def sorting_api():
+    data = request.json
+    algorithm = data.get('algorithm')
+    mode = data.get('mode', 'count')
+    target = data.get('target')
+    
+    if algorithm not in SORTS and algorithm not in SEARCHES:
+        return jsonify({"result": "error", "message": "Invalid algorithm"})
+    if mode not in ('count', 'fast'):
+        return jsonify({"result": "error", "message": "Invalid mode"})
+    
+    try:
+        # Benchmarks generate their input here instead of sending millions of values
+        if 'size' in data:
+            size = int(data.get('size'))
+            if size < 0 or size > app.config['SORT_MAX_SIZE']:
+                raise Exception(f"Size must be between 0 and {app.config['SORT_MAX_SIZE']}")
+            values = generate_values(size, data.get('seed'), int(data.get('max_value') or 1000000))
+            if mode == 'count':
+                values = values.tolist()
+            if algorithm == 'binary_search':
+                values = sorted(values) if mode == 'count' else run_fast('quick_sort', values)['values']
+        else:
+            values = data.get('values') or []
+            if not isinstance(values, list):
+                raise Exception("values must be a list")
+        
+        size = len(values)
+        if algorithm in SEARCHES and target is None:
+            raise Exception("A target value is required")
+        
+        trace = None
+        if mode == 'fast':
+            result = run_fast(algorithm, values, target)
+        else:
+            if size > app.config['SORT_MAX_COUNTED']:
+                raise Exception(f"Counting mode takes at most {app.config['SORT_MAX_COUNTED']} values, use the fast mode")
+            if data.get('trace'):
+                offset, limit = trace_window(data)
+                trace = TraceWindow(offset, limit)
+            result = run_counted(algorithm, values, target, trace)
+        
+        result.update({'algorithm': algorithm, 'mode': mode, 'size': size})
+        if 'values' in result:
+            if size <= app.config['SORT_RETURN_LIMIT']:
+                result['values'] = list(result['values']) if mode == 'count' else result['values'].tolist()
+            else:
+                del result['values']
+        if trace is not None:
+            result['trace_window'] = {"offset": trace.offset, "total": trace.total}
+            if data.get('trace') == 'compact':
+                result['trace'] = trace.events
+            else:
+                result['steps'] = [describe_sort_event(event) for event in trace.events]
+        return jsonify({"result": "success", "data": result})
     except Exception as e:
         return jsonify({"result": "error", "message": str(e)})
 
 # API endpoint for priority CPU scheduling
+# Scheduler actions that change the stored processes, the ones the journal keeps
+SCHEDULER_MUTATIONS = {'add_process', 'add_processes', 'calculate_schedule', 'reset_scheduler'}
+
+def process_room(priority_queue):
+    """Get how many more processes the scheduler may hold, MAX_PROCESSES in all"""
+    room = app.config['MAX_PROCESSES'] - len(priority_queue.processes)
+    if room < 1:
+        raise Exception(f"The scheduler holds at most {app.config['MAX_PROCESSES']} processes")
+    return room
+
+# Apply a scheduler action and return the response body
+def run_scheduler_action(priority_queue, action, data):
+    if action == 'add_process':
+        process_room(priority_queue)
+        process_id = data.get('process_id')
+        arrival_time = data.get('arrival_time')
+        burst_time = data.get('burst_time')
+        priority = data.get('priority')
+    
+        # Add to priority queue's process list
+        priority_queue.add_process(process_id, arrival_time, burst_time, priority)
+        return {"result": "success", "message": f"Process {process_id} added"}
+    
+    elif action == 'add_processes':
+        limit = min(app.config['IMPORT_MAX_PROCESSES'], process_room(priority_queue))
+        count = priority_queue.add_processes(normalize_processes(data.get('processes') or [], limit))
+        return {"result": "success", "data": count, "message": f"{count} processes added"}
+    
+    elif action == 'calculate_schedule':
+        policy = data.get('policy', 'priority')
+        quantum = data.get('quantum', 2)
+        
+        # Calculate the schedule under the requested policy, returning one trace window
+        offset, limit = trace_window(data)
+        result = priority_queue.calculate_schedule(policy, quantum, data.get('trace', 'text'), offset, limit,
+                                                   app.config['SCHEDULER_MAX_SLICES'])
+        metrics.observe('dsa_scheduler_processes', (('policy', policy),),
+                        len(priority_queue.processes), SIZE_BUCKETS)
+        return {"result": "success", "data": result}
+    
+    elif action == 'reset_scheduler':
+        priority_queue.reset_scheduler()
+        return {"result": "success", "message": "Scheduler reset"}
+    
+    elif action == 'get_processes':
+        processes = priority_queue.get_processes()
+        return {"result": "success", "data": processes}
+    
+    else:
+        raise Exception("Invalid action")
+
 @app.route('/api/priority_scheduler', methods=['POST'])
 def priority_scheduler():
     data = request.json
     action = data.get('action')
     
     try:
-        if action == 'add_process':
-            process_id = data.get('process_id')
-            arrival_time = data.get('arrival_time')
-            burst_time = data.get('burst_time')
-            priority = data.get('priority')
-            
-            # Add to priority queue's process list
-            priority_queue.add_process(process_id, arrival_time, burst_time, priority)
-            return jsonify({"result": "success", "message": f"Process {process_id} added"})
-            
-        elif action == 'calculate_schedule':
-            # Calculate priority scheduling
-            result = priority_queue.calculate_priority_schedule()
-            return jsonify({"result": "success", "data": result})
+        with open_structure('priority', read_only=action not in SCHEDULER_MUTATIONS) as priority_queue:
+            # Stream events as they are produced instead of one big response
+            if action == 'calculate_schedule' and data.get('stream') in STREAM_FORMATS:
+                events = priority_queue.iter_schedule(data.get('policy', 'priority'), data.get('quantum', 2),
+                                                      data.get('trace', 'text'), app.config['SCHEDULER_MAX_SLICES'])
+                encode, mimetype = STREAM_FORMATS[data.get('stream')]
+                return Response((encode(event) for event in events), mimetype=mimetype)
             
-        elif action == 'reset_scheduler':
-            priority_queue.reset_scheduler()
-            return jsonify({"result": "success", "message": "Scheduler reset"})
-            
-        elif action == 'get_processes':
-            processes = priority_queue.get_processes()
-            return jsonify({"result": "success", "data": processes})
-            
-        else:
-            return jsonify({"result": "error", "message": "Invalid action"})
+            response = run_scheduler_action(priority_queue, action, data)
+            journal_operation(run_scheduler_action, data)
+            return jsonify(response)
             
     except Exception as e:
         return jsonify({"result": "error", "message": str(e)})
 
-# Helper function to check operator precedence
-def precedence(op):
-    if op == '+' or op == '-':
-        return 1
-    if op == '*' or op == '/':
-        return 2
-    return 0
-
-# Convert infix expression to postfix notation
-def infix_to_postfix(expression):
-    # Remove spaces
-    expression = expression.replace(" ", "")
-    
-    output = []
-    ops_stack = Stack()
-    
-    i = 0
-    while i < len(expression):
-        char = expression[i]
-        
-        # If character is a digit, parse the whole number
-        if char.isdigit():
-            num = char
-            while i + 1 < len(expression) and expression[i + 1].isdigit():
-                i += 1
-                num += expression[i]
-            output.append(num)
-        
-        # If character is '(', push it to stack
-        elif char == '(':
-            ops_stack.push(char)
-        
-        # If character is ')', pop until '(' is found
-        elif char == ')':
-            while not ops_stack.is_empty() and ops_stack.peek() != '(':
-                output.append(ops_stack.pop())
-            ops_stack.pop()  # Remove '(' from stack
-        
-        # If character is an operator
-        else:
-            while (not ops_stack.is_empty() and 
-                   precedence(ops_stack.peek()) >= precedence(char)):
-                output.append(ops_stack.pop())
-            ops_stack.push(char)
-        
-        i += 1
+# API endpoint to share the caller's structures with read-only viewers
+@app.route('/api/share', methods=['POST'])
+def share():
+    # Changes are broadcast within one process, viewers on another worker would never see them
+    if app.config['SERVER_WORKERS'] > 1:
+        return jsonify({"result": "error",
+                        "message": "Live views need a single server process (DSA_SERVER_WORKERS=1)"})
+    return jsonify({"result": "success", "data": {"watch_id": broadcaster.share(get_session_id())}})
+
+def sse_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+# Server-sent events stream of a shared structure's changes
+@app.route('/api/stream/<watch_id>/<name>')
+def stream_structure(watch_id, name):
+    session_id = broadcaster.session_for(watch_id)
+    if session_id is None or name not in STRUCTURE_BUILDERS:
+        return jsonify({"result": "error", "message": "Unknown shared structure"}), 404
     
-    # Pop all operators from stack
-    while not ops_stack.is_empty():
-        output.append(ops_stack.pop())
+    try:
+        subscriber = broadcaster.subscribe(watch_id, name)
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)}), 503
+    
+    def snapshot_event():
+        with state_store.open(session_id, name, read_only=True) as structure:
+            return dict(sync_payload(structure, None), type='snapshot')
     
-    return ' '.join(output)
+    def generate():
+        try:
+            # Subscribed before the snapshot, so no change can fall in between;
+            # viewers skip changes at or below the snapshot version
+            yield sse_event(snapshot_event())
+            while True:
+                events = subscriber.drain(timeout=app.config['STREAM_KEEPALIVE'])
+                if not events:
+                    yield ": keepalive\n\n"
+                for event in events:
+                    if event['type'] == 'resync':
+                        event = snapshot_event()
+                    yield sse_event(event)
+        finally:
+            broadcaster.unsubscribe(watch_id, name, subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Streaming encodings for schedule events: newline-delimited JSON or server-sent events
+STREAM_FORMATS = {
+    'ndjson': (lambda event: json.dumps(event) + '\n', 'application/x-ndjson'),
+    'sse': (sse_event, 'text/event-stream'),
+}
 
-# Evaluate postfix expression and return steps
-def evaluate_postfix(expression):
-    tokens = expression.split()
-    eval_stack = Stack()
-    steps = []
+# API endpoint for bulk process import (JSON array, CSV or NDJSON upload)
+@app.route('/api/priority_scheduler/import', methods=['POST'])
+def import_processes():
+    upload = request.files.get('file')
+    if upload:
+        stream = upload.stream
+        fmt = request.args.get('format') or detect_format(upload.mimetype, upload.filename)
+    else:
+        stream = request.stream
+        fmt = request.args.get('format') or detect_format(request.content_type)
     
-    for token in tokens:
-        step = {}
+    try:
+        with open_structure('priority') as priority_queue:
+            limit = min(app.config['IMPORT_MAX_PROCESSES'], process_room(priority_queue))
+            count = priority_queue.add_processes(parse_processes(stream, fmt, limit))
+            if journal is not None:
+                # Journal the parsed records, the upload itself is gone after this request
+                added = priority_queue.processes[len(priority_queue.processes) - count:]
+                journal_operation(run_scheduler_action, {'action': 'add_processes', 'processes': [
+                    {'process_id': p['id'], 'arrival_time': p['arrival_time'], 'burst_time': p['burst_time'],
+                     'priority': p['priority']} for p in added
+                ]})
+        return jsonify({"result": "success", "data": count, "message": f"{count} processes added"})
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+def metrics_denied():
+    """Get the 403 response for a caller without METRICS_TOKEN, or None if they have it
+
+    Every metrics endpoint stays closed until a token is configured. The
+    token is sent as X-Metrics-Token or as a bearer token (Prometheus'
+    authorization setting).
+    """
+    token = app.config['METRICS_TOKEN']
+    if not token:
+        return jsonify({"result": "error", "message": "Metrics endpoints are disabled until METRICS_TOKEN is set"}), 403
+    supplied = request.headers.get('X-Metrics-Token')
+    if supplied is None and request.authorization is not None and request.authorization.type == 'bearer':
+        supplied = request.authorization.token
+    if supplied is None or not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        return jsonify({"result": "error", "message": "Invalid metrics token"}), 403
+    return None
+
+# Prometheus scrape endpoint
+@app.route('/metrics')
+def metrics_endpoint():
+    denied = metrics_denied()
+    if denied:
+        return denied
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Turn metrics and the sampling profiler on or off at runtime
+@app.route('/metrics/config', methods=['POST'])
+def metrics_config():
+    denied = metrics_denied()
+    if denied:
+        return denied
+    data = request.get_json(silent=True) or {}
+
+    try:
+        if 'enabled' in data:
+            metrics.enabled = bool(data['enabled'])
+        if data.get('reset'):
+            metrics.reset()
+            profiler.reset()
+        if 'profiler' in data:
+            if data['profiler']:
+                interval = data.get('profiler_interval')
+                if interval is not None and not (isinstance(interval, (int, float)) and 0.001 <= interval <= 1):
+                    raise Exception("profiler_interval must be between 0.001 and 1 seconds")
+                profiler.start(interval)
+            else:
+                profiler.stop()
+        return jsonify({"result": "success", "data": {
+            "enabled": metrics.enabled, "profiler": profiler.running, "profiler_interval": profiler.interval
+        }})
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+# Sampled stacks in collapsed format, ready for flamegraph.pl or speedscope
+@app.route('/metrics/profile')
+def metrics_profile():
+    denied = metrics_denied()
+    if denied:
+        return denied
+    return Response(profiler.collapsed(), mimetype='text/plain')
+
+def scenario_writes_denied():
+    """Get the 403 response for saving or deleting scenarios without SCENARIO_TOKEN, or None"""
+    token = app.config['SCENARIO_TOKEN']
+    if not token:
+        return jsonify({"result": "error", "message": "Saving scenarios is disabled until SCENARIO_TOKEN is set"}), 403
+    supplied = request.headers.get('X-Scenario-Token')
+    if supplied is None or not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        return jsonify({"result": "error", "message": "Invalid scenario token"}), 403
+    return None
+
+# Named snapshots of structures that any session can load, e.g. big demo workloads
+@app.route('/api/scenarios', methods=['POST'])
+def scenarios_api():
+    data = request.json
+    action = data.get('action')
+    
+    try:
+        if action == 'list':
+            return jsonify({"result": "success", "data": scenarios.list()})
         
-        # If token is a number, push to stack
-        if token.isdigit():
-            eval_stack.push(int(token))
-            step['action'] = f"Push operand {token}"
-            step['stack'] = eval_stack.to_list()
+        if action in ('save', 'delete'):
+            denied = scenario_writes_denied()
+            if denied:
+                return denied
         
-        # If token is an operator
-        else:
-            # Pop two operands
-            operand2 = eval_stack.pop()
-            operand1 = eval_stack.pop()
-            
-            # Perform operation
-            if token == '+':
-                result = operand1 + operand2
-            elif token == '-':
-                result = operand1 - operand2
-            elif token == '*':
-                result = operand1 * operand2
-            elif token == '/':
-                result = operand1 / operand2
-            else:
-                raise ValueError(f"Unknown operator: {token}")
-            
-            # Push result back to stack
-            eval_stack.push(result)
-            
-            step['action'] = f"Apply {token} on last two operands: {operand1} {token} {operand2} = {result}"
-            step['stack'] = eval_stack.to_list()
+        name = data.get('name')
+        if action == 'save':
+            structure_name = data.get('structure')
+            if structure_name not in STRUCTURE_BUILDERS:
+                raise Exception("Invalid structure")
+            with open_structure(structure_name, read_only=True) as structure:
+                scenarios.save(name, structure_name, structure.to_state())
+            return jsonify({"result": "success", "message": f"Scenario {name} saved"})
         
-        steps.append(step)
+        elif action == 'load':
+            # The scenario replaces the caller's structure of the same name
+            structure_name, state = scenarios.load(name)
+            with open_structure(structure_name) as structure:
+                structure.load_state(state)
+                structure.changes.restart()
+                g.checkpoint_needed = True
+                return jsonify({"result": "success", "data": {"structure": structure_name, "size": structure.size()}})
+        
+        elif action == 'delete':
+            scenarios.delete(name)
+            return jsonify({"result": "success", "message": f"Scenario {name} deleted"})
+        
+        else:
+            return jsonify({"result": "error", "message": "Invalid action"})
+    except Exception as e:
+        return jsonify({"result": "error", "message": str(e)})
+
+# How journaled operations are replayed, by the kind recorded with them
+RUNNERS = {
+    'stack': run_stack_operation,
+    'queue': run_queue_operation,
+    'linked_list': run_linked_list_operation,
+    'scheduler': run_scheduler_action,
+}
+RUNNER_KINDS = {run_operation: kind for kind, run_operation in RUNNERS.items()}
+
+def checkpoint():
+    """Write every structure to the checkpoint file and start an empty journal"""
+    with checkpoint_gate.exclusive():
+        save_snapshot(app.config['CHECKPOINT_PATH'], state_store.snapshot())
+        journal.truncate()
+
+def recover_state():
+    """Rebuild the memory store from the last checkpoint and the journal after it"""
+    checkpoint_path = app.config['CHECKPOINT_PATH']
+    if os.path.exists(checkpoint_path):
+        state_store.restore(load_snapshot(checkpoint_path, app.config['SNAPSHOT_MMAP_THRESHOLD']))
     
-    final_result = eval_stack.pop()
-    return final_result, steps
+    recovered = Journal(app.config['JOURNAL_PATH'], fsync=app.config['JOURNAL_FSYNC'])
+    for record in recovered.records():
+        with state_store.open(record['s'], record['n']) as structure:
+            for kind, data in record['o']:
+                operation = data.get('action') if kind == 'scheduler' else data.get('operation')
+                try:
+                    RUNNERS[kind](structure, operation, data)
+                except Exception:
+                    pass  # recovery is best effort, one bad record must not stop it
+    
+    # Fold the replayed operations (and any torn last line) into a fresh checkpoint
+    if os.path.getsize(app.config['JOURNAL_PATH']):
+        save_snapshot(checkpoint_path, state_store.snapshot())
+        recovered.truncate()
+    return recovered
+
+# Only the memory backend loses state on restart, the others are already persistent
+if app.config['JOURNAL_PATH'] and app.config['STATE_BACKEND'] == 'memory':
+    journal = recover_state()
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
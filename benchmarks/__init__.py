@@ -0,0 +1 @@
+"""Benchmark suites for the data structures, scheduler, expressions and API, see python -m benchmarks --help"""
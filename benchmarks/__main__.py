@@ -0,0 +1,60 @@
+"""Run the benchmark suites
+
+    python -m benchmarks                       run everything and print a table
+    python -m benchmarks -k queue --json out.json
+    python -m benchmarks --save-baseline       store results as the baseline
+    python -m benchmarks --compare             fail if anything got slower than the baseline
+"""
+import argparse
+import os
+import sys
+
+from benchmarks import harness
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the benchmark suites')
+    parser.add_argument('-k', dest='keyword', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--rounds', type=int, default=5, help='minimum timed rounds per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.1, help='minimum total seconds per benchmark')
+    parser.add_argument('--json', dest='json_path', help='write the results to this file')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the baseline')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, help='compare against a baseline file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='slowdown of the median counted as a regression (default 0.10)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline path for --save-baseline')
+    args = parser.parse_args(argv)
+
+    cases = harness.discover()
+    if args.keyword:
+        cases = [case for case in cases if args.keyword in case[0]]
+    if not cases:
+        print("No benchmarks selected")
+        return 1
+
+    def report(name, stats):
+        print(f"{name:<55} median {harness.format_time(stats['median']):>10}  "
+              f"min {harness.format_time(stats['min']):>10}  rounds {stats['rounds']}")
+
+    results = harness.run(cases, rounds=args.rounds, min_time=args.min_time, report=report)
+
+    if args.json_path:
+        harness.save(results, args.json_path)
+    if args.save_baseline:
+        harness.save(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.compare:
+        rows = harness.compare(results, harness.load(args.compare), args.threshold)
+        print()
+        for name, ratio, regressed in rows:
+            print(f"{name:<55} {ratio:6.2f}x {'REGRESSION' if regressed else ''}")
+        if any(regressed for _, _, regressed in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
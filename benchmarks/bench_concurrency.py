@@ -0,0 +1,24 @@
+#bench_concurrency.py
+from benchmarks.harness import parametrize
+from benchmarks.stress_concurrency import check_compound, check_queue, check_stack
+
+
+def checked(check, *args):
+    """Run a stress check, failing the benchmark run if an invariant broke"""
+    failures = check(*args)
+    if failures:
+        raise AssertionError(failures[0])
+
+
+@parametrize('threads', [1, 4, 16])
+def bench_contended_stack(benchmark, threads):
+    benchmark(lambda: checked(check_stack, threads, 1000))
+
+
+@parametrize('queue_type', ['linear', 'circular', 'priority'])
+def bench_contended_queue(benchmark, queue_type):
+    benchmark(lambda: checked(check_queue, queue_type, 8, 1000))
+
+
+def bench_contended_push_many(benchmark):
+    benchmark(lambda: checked(check_compound, 8, 1000))
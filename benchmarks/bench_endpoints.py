@@ -0,0 +1,53 @@
+#bench_endpoints.py
+from benchmarks.bench_scheduler import synthetic_processes
+from benchmarks.harness import parametrize
+from app import app
+
+SESSION = {'X-Session-Id': 'benchmark-session'}
+
+
+def client():
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+def bench_stack_push_pop(benchmark):
+    http = client()
+
+    def push_pop():
+        http.post('/api/stack', json={'operation': 'push', 'value': 1}, headers=SESSION)
+        http.post('/api/stack', json={'operation': 'pop'}, headers=SESSION)
+
+    benchmark(push_pop)
+
+
+@parametrize('queue_type', ['linear', 'circular', 'deque', 'priority'])
+def bench_queue_batch(benchmark, queue_type):
+    http = client()
+    operations = ([{'operation': 'enqueue', 'value': i, 'priority': i} for i in range(10)]
+                  + [{'operation': 'dequeue'}] * 10)
+    benchmark(lambda: http.post('/api/queue/batch', headers=SESSION,
+                                json={'queue_type': queue_type, 'operations': operations}))
+
+
+def bench_evaluate_expression(benchmark):
+    http = client()
+    benchmark(lambda: http.post('/api/evaluate_expression', headers=SESSION,
+                                json={'expression': '(3 + 4) * 2 - 10 / 5'}))
+
+
+@parametrize('count', [100, 1000])
+def bench_calculate_schedule(benchmark, count):
+    http = client()
+    headers = {'X-Session-Id': f'benchmark-scheduler-{count}'}
+    http.post('/api/priority_scheduler', headers=headers, json={'action': 'reset_scheduler'})
+    http.post('/api/priority_scheduler', headers=headers,
+              json={'action': 'add_processes', 'processes': synthetic_processes(count)})
+    benchmark(lambda: http.post('/api/priority_scheduler', headers=headers,
+                                json={'action': 'calculate_schedule', 'policy': 'priority'}))
+
+
+@parametrize('path', ['/queues', '/static/js/queues.js'])
+def bench_page(benchmark, path):
+    http = client()
+    benchmark(lambda: http.get(path, headers={'Accept-Encoding': 'gzip'}))
@@ -0,0 +1,54 @@
+#bench_expression.py
+import random
+
+from benchmarks.harness import parametrize
+from utils import expression
+from utils.expression import compile_expression, evaluate_postfix, infix_to_postfix
+
+
+def long_expression(terms, seed=7):
+    """A random arithmetic expression with nested parentheses"""
+    rng = random.Random(seed)
+    parts = [str(rng.randint(1, 99))]
+    depth = 0
+    for _ in range(terms - 1):
+        parts.append(rng.choice('+-*'))
+        if rng.random() < 0.2:
+            parts.append('(')
+            depth += 1
+        parts.append(str(rng.randint(1, 99)))
+        if depth and rng.random() < 0.2:
+            parts.append(')')
+            depth -= 1
+    parts.append(')' * depth)
+    return ' '.join(parts)
+
+
+@parametrize('terms', [10, 100, 1000])
+def bench_infix_to_postfix_uncached(benchmark, terms):
+    text = long_expression(terms)
+
+    def convert():
+        expression._compile.cache_clear()
+        infix_to_postfix(text)
+
+    benchmark(convert)
+
+
+@parametrize('terms', [10, 100, 1000])
+def bench_infix_to_postfix_cached(benchmark, terms):
+    text = long_expression(terms)
+    benchmark(lambda: infix_to_postfix(text))
+
+
+@parametrize('terms', [10, 100, 1000])
+def bench_evaluate_postfix(benchmark, terms):
+    postfix = infix_to_postfix(long_expression(terms))
+    benchmark(lambda: evaluate_postfix(postfix))
+
+
+@parametrize('rows', [100, 10000])
+def bench_run_many(benchmark, rows):
+    program = compile_expression('a * x ^ 2 + b * x + c')
+    bindings = [{'a': 1, 'b': i % 7, 'c': 3, 'x': i} for i in range(rows)]
+    benchmark(lambda: program.run_many(bindings))
@@ -0,0 +1,34 @@
+#bench_scheduler.py
+import random
+
+from benchmarks.harness import parametrize
+from utils.queue import Queue
+from utils.scheduler import POLICIES, schedule
+
+
+def synthetic_processes(count, seed=42):
+    """Random arrivals, bursts and priorities, the same for every run"""
+    rng = random.Random(seed)
+    return [{
+        'id': f"P{i + 1}",
+        'arrival_time': rng.randrange(count * 2),
+        'burst_time': rng.randint(1, 20),
+        'priority': rng.randint(1, 10),
+    } for i in range(count)]
+
+
+@parametrize('count', [100, 1000, 10000])
+def bench_calculate_priority_schedule(benchmark, count):
+    def loaded_queue():
+        queue = Queue(queue_type='priority')
+        for process in synthetic_processes(count):
+            queue.add_process(process['id'], process['arrival_time'], process['burst_time'], process['priority'])
+        return (queue,)
+
+    benchmark(lambda queue: queue.calculate_priority_schedule(), setup=loaded_queue)
+
+
+@parametrize('policy', list(POLICIES))
+def bench_policy(benchmark, policy):
+    processes = synthetic_processes(1000)
+    benchmark(lambda: schedule(processes, policy, quantum=4))
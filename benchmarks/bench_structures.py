@@ -0,0 +1,77 @@
+#bench_structures.py
+from benchmarks.harness import parametrize
+from utils.linked_list import LinkedList
+from utils.queue import Queue
+from utils.stack import Stack
+
+SIZES = [100, 1000, 10000]
+
+
+@parametrize('queue_type', ['linear', 'circular', 'deque', 'priority'])
+@parametrize('size', SIZES)
+def bench_queue_enqueue(benchmark, queue_type, size):
+    def enqueue_all(queue):
+        for value in range(size):
+            queue.enqueue(value, value % 10)
+
+    benchmark(enqueue_all, setup=lambda: (Queue(capacity=size, queue_type=queue_type),))
+
+
+@parametrize('queue_type', ['linear', 'circular', 'deque', 'priority'])
+@parametrize('size', SIZES)
+def bench_queue_dequeue(benchmark, queue_type, size):
+    def full_queue():
+        queue = Queue(capacity=size, queue_type=queue_type)
+        for value in range(size):
+            queue.enqueue(value, value % 10)
+        return (queue,)
+
+    def dequeue_all(queue):
+        for _ in range(size):
+            queue.dequeue()
+
+    benchmark(dequeue_all, setup=full_queue)
+
+
+@parametrize('size', SIZES)
+def bench_stack_push_pop(benchmark, size):
+    def push_pop(stack):
+        for value in range(size):
+            stack.push(value)
+        for _ in range(size):
+            stack.pop()
+
+    benchmark(push_pop, setup=lambda: (Stack(capacity=size),))
+
+
+@parametrize('list_type', ['singly', 'doubly', 'circular'])
+@parametrize('size', SIZES)
+def bench_linked_list_insert_remove(benchmark, list_type, size):
+    def insert_remove(linked_list):
+        for value in range(size):
+            linked_list.insert_tail(value)
+        for _ in range(size):
+            linked_list.remove_head()
+
+    benchmark(insert_remove, setup=lambda: (LinkedList(capacity=size, list_type=list_type),))
+
+
+@parametrize('size', SIZES)
+def bench_queue_snapshot_round_trip(benchmark, size):
+    queue = Queue(capacity=size, queue_type='circular')
+    for value in range(size):
+        queue.enqueue(value)
+
+    benchmark(lambda: Queue.from_state(queue.to_state()))
+
+
+@parametrize('element_type', [None, 'int'])
+@parametrize('queue_type', ['linear', 'deque'])
+def bench_unbounded_queue_round_trip(benchmark, queue_type, element_type):
+    def enqueue_dequeue(queue):
+        for value in range(10000):
+            queue.enqueue(value)
+        for _ in range(10000):
+            queue.dequeue()
+
+    benchmark(enqueue_dequeue, setup=lambda: (Queue(capacity=None, queue_type=queue_type, element_type=element_type),))
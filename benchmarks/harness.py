@@ -0,0 +1,128 @@
+#harness.py
+import importlib
+import json
+import math
+import pkgutil
+import platform
+import statistics
+import time
+
+
+def parametrize(name, values):
+    """Run a benchmark once per value, passed as a keyword argument"""
+    def decorate(func):
+        func.params = getattr(func, 'params', []) + [(name, values)]
+        return func
+    return decorate
+
+
+class Benchmark:
+    """Times a callable over several rounds, in the spirit of pytest-benchmark
+
+    Each round calls setup (if given) outside the timed region and passes
+    what it returns to the function, so destructive operations get fresh
+    input every round.
+    """
+
+    def __init__(self, rounds=5, min_time=0.1, warmup=1):
+        self.rounds = rounds
+        self.min_time = min_time
+        self.warmup = warmup
+        self.timings = []
+
+    def __call__(self, func, setup=None):
+        for _ in range(self.warmup):
+            func(*(setup() if setup else ()))
+
+        # At least `rounds` rounds, and more while the total is under min_time
+        total = 0.0
+        while len(self.timings) < self.rounds or total < self.min_time:
+            args = setup() if setup else ()
+            started = time.perf_counter()
+            func(*args)
+            elapsed = time.perf_counter() - started
+            self.timings.append(elapsed)
+            total += elapsed
+
+    def stats(self):
+        timings = self.timings
+        return {
+            'rounds': len(timings),
+            'min': min(timings),
+            'max': max(timings),
+            'mean': statistics.fmean(timings),
+            'median': statistics.median(timings),
+            'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        }
+
+
+def discover(package='benchmarks'):
+    """Find bench_* functions in the bench_* modules of a package, expanded per parameter"""
+    module = importlib.import_module(package)
+    cases = []
+    for info in sorted(pkgutil.iter_modules(module.__path__), key=lambda info: info.name):
+        if not info.name.startswith('bench_'):
+            continue
+        suite = importlib.import_module(f"{package}.{info.name}")
+        for name, func in vars(suite).items():
+            if not name.startswith('bench_') or not callable(func):
+                continue
+            combinations = [({}, '')]
+            for param, values in reversed(getattr(func, 'params', [])):
+                combinations = [(dict(kwargs, **{param: value}), f"{suffix}-{value}" if suffix else str(value))
+                                for kwargs, suffix in combinations for value in values]
+            for kwargs, suffix in combinations:
+                full_name = f"{info.name[len('bench_'):]}.{name[len('bench_'):]}"
+                cases.append((f"{full_name}[{suffix}]" if suffix else full_name, func, kwargs))
+    return cases
+
+
+def run(cases, rounds=5, min_time=0.1, report=None):
+    """Run benchmark cases and return the results document"""
+    results = {}
+    for name, func, kwargs in cases:
+        benchmark = Benchmark(rounds=rounds, min_time=min_time)
+        func(benchmark, **kwargs)
+        results[name] = benchmark.stats()
+        if report:
+            report(name, results[name])
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+        },
+        'benchmarks': results,
+    }
+
+
+def compare(current, baseline, threshold=0.10):
+    """Compare medians against a baseline, returning (name, ratio, regressed) rows"""
+    rows = []
+    for name, stats in current['benchmarks'].items():
+        previous = baseline['benchmarks'].get(name)
+        if previous is None or not previous['median']:
+            continue
+        ratio = stats['median'] / previous['median']
+        rows.append((name, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(document, path):
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def format_time(seconds):
+    if seconds == 0 or math.isnan(seconds):
+        return '0'
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
@@ -0,0 +1,231 @@
+"""Hammer the structures and the API from many threads and check nothing breaks
+
+    python -m benchmarks.stress_concurrency
+    python -m benchmarks.stress_concurrency --threads 32 --operations 50000
+
+Each check runs its workers together and then verifies the invariants
+(capacity never exceeded, counts matching contents, every value accounted
+for, compound operations never interleaved). Throughput is then measured
+for 1 to --threads threads, on one shared structure and on one structure
+per thread. Exits 1 if any invariant is broken.
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+
+from app import app
+from utils.queue import Queue
+from utils.stack import Stack
+
+CAPACITY = 64
+BLOCK = 8
+
+
+def hammer(threads, worker):
+    """Run worker(index) on threads threads started together, returning the wall time"""
+    barrier = threading.Barrier(threads + 1)
+    errors = []
+
+    def run(index):
+        barrier.wait()
+        try:
+            worker(index)
+        except Exception as e:
+            errors.append(e)
+
+    pool = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+    return elapsed
+
+
+def check_counts(name, structure, additions, removals):
+    """After the threads join: successful adds minus removes is the size, and each made one change"""
+    failures = []
+    if structure.size() != additions - removals:
+        failures.append(f"{name} holds {structure.size()} values after {additions} adds and {removals} removes")
+    if structure.changes.version != additions + removals:
+        failures.append(f"{name} change log is at version {structure.changes.version} "
+                        f"after {additions + removals} changes")
+    return failures
+
+
+def check_stack(threads, operations):
+    stack = Stack(capacity=CAPACITY, history_limit=0)
+    pushed = [[] for _ in range(threads)]
+    popped = [[] for _ in range(threads)]
+    failures = []
+
+    def worker(index):
+        for n in range(operations):
+            value = index * operations + n
+            try:
+                stack.push(value)
+                pushed[index].append(value)
+            except Exception:
+                pass  # overflow is expected once the stack fills up
+            if n % 2:
+                try:
+                    popped[index].append(stack.pop())
+                except Exception:
+                    pass
+            if stack.size() > CAPACITY:
+                failures.append(f"stack grew to {stack.size()}")
+
+    hammer(threads, worker)
+    pushed_values = Counter(value for values in pushed for value in values)
+    taken_values = Counter(value for values in popped for value in values) + Counter(stack.to_list())
+    if pushed_values != taken_values:
+        failures.append("stack lost or duplicated values")
+    return failures + check_counts('stack', stack, sum(map(len, pushed)), sum(map(len, popped)))
+
+
+def check_queue(queue_type, threads, operations):
+    queue = Queue(capacity=CAPACITY, queue_type=queue_type, history_limit=0)
+    pushed = [[] for _ in range(threads)]
+    popped = [[] for _ in range(threads)]
+    failures = []
+
+    def worker(index):
+        for n in range(operations):
+            value = index * operations + n
+            try:
+                queue.enqueue(value, n % 10 + 1)
+                pushed[index].append(value)
+            except Exception:
+                pass
+            if n % 2:
+                try:
+                    value = queue.dequeue()
+                    popped[index].append(value['value'] if queue_type == 'priority' else value)
+                except Exception:
+                    pass
+            if queue.size() > CAPACITY:
+                failures.append(f"{queue_type} queue grew to {queue.size()}")
+
+    hammer(threads, worker)
+    remaining = queue.to_list()
+    if queue_type == 'priority':
+        remaining = [element['value'] for element in remaining]
+    if queue.size() != len(remaining):
+        failures.append(f"{queue_type} queue count {queue.size()} but {len(remaining)} values")
+    pushed_values = Counter(value for values in pushed for value in values)
+    taken_values = Counter(value for values in popped for value in values) + Counter(remaining)
+    if pushed_values != taken_values:
+        failures.append(f"{queue_type} queue lost or duplicated values")
+    failures += check_counts(f"{queue_type} queue", queue, sum(map(len, pushed)), sum(map(len, popped)))
+    if queue_type != 'priority':
+        # FIFO: each consumer sees any one producer's values in the order they were enqueued
+        for values in popped:
+            last = {}
+            for value in values:
+                producer = value // operations
+                if value < last.get(producer, -1):
+                    failures.append(f"{queue_type} queue served values out of order")
+                    break
+                last[producer] = value
+    return failures
+
+
+def check_compound(threads, operations):
+    """push_many and pop_many move whole blocks, so every popped block is one pushed block reversed"""
+    stack = Stack(capacity=CAPACITY, history_limit=0)
+    pushed = set()
+    popped = [[] for _ in range(threads)]
+
+    def worker(index):
+        for n in range(operations // BLOCK):
+            block = tuple(range((index * operations + n * BLOCK), (index * operations + (n + 1) * BLOCK)))
+            try:
+                stack.push_many(block)
+                pushed.add(block)
+            except Exception:
+                pass
+            try:
+                popped[index].append(tuple(reversed(stack.pop_many(BLOCK))))
+            except Exception:
+                pass
+
+    hammer(threads, worker)
+    if any(block not in pushed for blocks in popped for block in blocks):
+        return ["push_many and pop_many interleaved"]
+    return check_counts('push_many/pop_many', stack, len(pushed) * BLOCK, sum(map(len, popped)) * BLOCK)
+
+
+def check_api(threads, operations):
+    """Atomic batches on one session must never see each other's operations"""
+    app.config['TESTING'] = True
+    headers = {'X-Session-Id': 'stress-session'}
+    app.test_client().post('/api/stack', json={'operation': 'configure', 'capacity': None}, headers=headers)
+    failures = []
+
+    def worker(index):
+        client = app.test_client()
+        for n in range(operations // 100):
+            value = index * operations + n
+            response = client.post('/api/stack/batch', headers=headers, json={'operations': [
+                {'operation': 'push', 'value': value}, {'operation': 'push', 'value': -value},
+                {'operation': 'pop'}, {'operation': 'pop'}]}).get_json()
+            if [result.get('data') for result in response['data']] != [True, True, -value, value]:
+                failures.append("API batches interleaved")
+                return
+
+    hammer(threads, worker)
+    return failures
+
+
+def throughput(threads, operations, shared):
+    stacks = [Stack(capacity=None, history_limit=0) for _ in range(1 if shared else threads)]
+
+    def worker(index):
+        stack = stacks[0 if shared else index]
+        for value in range(operations):
+            stack.push(value)
+            stack.pop()
+
+    return threads * operations * 2 / hammer(threads, worker)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.stress_concurrency',
+                                     description='Stress the structures and the API from many threads')
+    parser.add_argument('--threads', type=int, default=16, help='worker threads (default 16)')
+    parser.add_argument('--operations', type=int, default=20000, help='operations per thread (default 20000)')
+    args = parser.parse_args(argv)
+
+    checks = [('stack', lambda: check_stack(args.threads, args.operations))]
+    checks += [(f"{queue_type} queue", lambda queue_type=queue_type: check_queue(queue_type, args.threads,
+                                                                                   args.operations))
+               for queue_type in ('linear', 'circular', 'deque', 'priority')]
+    checks += [('push_many/pop_many', lambda: check_compound(args.threads, args.operations)),
+               ('API batches', lambda: check_api(args.threads, args.operations))]
+
+    failed = False
+    for name, check in checks:
+        try:
+            failures = check()
+        except Exception as e:
+            failures = [f"raised {e!r}"]
+        failed = failed or bool(failures)
+        print(f"{name:<25} {'FAIL ' + failures[0] if failures else 'ok'}")
+
+    print(f"\n{'threads':>8} {'shared ops/s':>14} {'per-thread ops/s':>18}")
+    threads = 1
+    while threads <= args.threads:
+        print(f"{threads:>8} {throughput(threads, args.operations, True):>14,.0f} "
+              f"{throughput(threads, args.operations, False):>18,.0f}")
+        threads *= 2
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import os
+
+# Session-scoped structure registry
+SESSION_COOKIE = os.environ.get('DSA_SESSION_COOKIE', 'dsa_session')
+SESSION_TTL = int(os.environ.get('DSA_SESSION_TTL', 1800))
+MAX_SESSIONS = int(os.environ.get('DSA_MAX_SESSIONS', 10000))
+
+# Where structure state lives: 'memory' (single process), 'sqlite' or 'redis'
+STATE_BACKEND = os.environ.get('DSA_STATE_BACKEND', 'memory')
+STATE_SQLITE_PATH = os.environ.get('DSA_STATE_SQLITE_PATH', 'dsa_state.db')
+# Without REDIS_URL the redis backend uses an in-process stand-in
+REDIS_URL = os.environ.get('DSA_REDIS_URL')
+
+# Largest number of operations accepted by the batch endpoints
+BATCH_MAX_OPERATIONS = int(os.environ.get('DSA_BATCH_MAX_OPERATIONS', 1000))
+# Largest number of processes added by one import or add_processes request
+IMPORT_MAX_PROCESSES = int(os.environ.get('DSA_IMPORT_MAX_PROCESSES', 100000))
+
+# Largest capacity a structure can be configured with; a null capacity asks for this much
+MAX_CAPACITY = int(os.environ.get('DSA_MAX_CAPACITY', 100000))
+# Most processes one session's scheduler holds. With MAX_CAPACITY and
+# HISTORY_LIMIT this bounds every structure, so each of the MAX_SESSIONS
+# sessions kept in memory has a bounded size
+MAX_PROCESSES = int(os.environ.get('DSA_MAX_PROCESSES', 100000))
+
+# Largest number of variable bindings evaluated in one expression request
+EXPRESSION_MAX_BINDINGS = int(os.environ.get('DSA_EXPRESSION_MAX_BINDINGS', 10000))
+
+# Most step-trace events returned per response; larger traces are paged with offset/limit
+TRACE_PAGE_SIZE = int(os.environ.get('DSA_TRACE_PAGE_SIZE', 1000))
+
+# Most time slices a round robin schedule may take (total burst time over the quantum)
+SCHEDULER_MAX_SLICES = int(os.environ.get('DSA_SCHEDULER_MAX_SLICES', 1000000))
+
+# Largest graph accepted by the graph endpoint
+GRAPH_MAX_EDGES = int(os.environ.get('DSA_GRAPH_MAX_EDGES', 5000000))
+GRAPH_MAX_NODES = int(os.environ.get('DSA_GRAPH_MAX_NODES', 1000000))
+
+# Sorting and searching: largest input overall, largest input for the
+# instrumented (counting/tracing) mode, and largest result echoed back
+SORT_MAX_SIZE = int(os.environ.get('DSA_SORT_MAX_SIZE', 10000000))
+SORT_MAX_COUNTED = int(os.environ.get('DSA_SORT_MAX_COUNTED', 100000))
+SORT_RETURN_LIMIT = int(os.environ.get('DSA_SORT_RETURN_LIMIT', 1000))
+
+# Metrics at /metrics (Prometheus text); off by default and switchable at
+# runtime through /metrics/config. Every metrics endpoint requires
+# METRICS_TOKEN and is disabled while it is unset
+METRICS_ENABLED = os.environ.get('DSA_METRICS_ENABLED', '0').lower() in ('1', 'true', 'yes')
+METRICS_TOKEN = os.environ.get('DSA_METRICS_TOKEN')
+METRICS_MAX_SERIES = int(os.environ.get('DSA_METRICS_MAX_SERIES', 1000))
+PROFILER_INTERVAL = float(os.environ.get('DSA_PROFILER_INTERVAL', 0.01))
+
+# Crash recovery for the memory backend: operations are appended to
+# JOURNAL_PATH (unset disables it) and folded into CHECKPOINT_PATH every
+# JOURNAL_CHECKPOINT_EVERY requests and at startup
+JOURNAL_PATH = os.environ.get('DSA_JOURNAL_PATH')
+JOURNAL_FSYNC = os.environ.get('DSA_JOURNAL_FSYNC', '0').lower() in ('1', 'true', 'yes')
+JOURNAL_CHECKPOINT_EVERY = int(os.environ.get('DSA_JOURNAL_CHECKPOINT_EVERY', 10000))
+CHECKPOINT_PATH = os.environ.get('DSA_CHECKPOINT_PATH', 'dsa_checkpoint.dsas')
+
+# Named scenarios saved and loaded through /api/scenarios. Saving and
+# deleting require SCENARIO_TOKEN and are disabled while it is unset; at
+# most SCENARIO_MAX_COUNT files of SCENARIO_MAX_BYTES each are kept
+SCENARIO_DIR = os.environ.get('DSA_SCENARIO_DIR', 'scenarios')
+SCENARIO_TOKEN = os.environ.get('DSA_SCENARIO_TOKEN')
+SCENARIO_MAX_COUNT = int(os.environ.get('DSA_SCENARIO_MAX_COUNT', 100))
+SCENARIO_MAX_BYTES = int(os.environ.get('DSA_SCENARIO_MAX_BYTES', 64 * 1024 * 1024))
+# Snapshot files at least this large are memory-mapped when loaded
+SNAPSHOT_MMAP_THRESHOLD = int(os.environ.get('DSA_SNAPSHOT_MMAP_THRESHOLD', 1024 * 1024))
+
+# Undo/redo steps each stack and queue keeps, 0 turns history off. The
+# sqlite and redis backends store the history with the structure on every
+# request, so they keep fewer steps by default
+HISTORY_LIMIT = int(os.environ.get('DSA_HISTORY_LIMIT', 1000 if STATE_BACKEND == 'memory' else 100))
+
+# Production serving through wsgi.py (python wsgi.py, or gunicorn -c gunicorn.conf.py wsgi:app).
+# The memory backend lives in one process, so more than one worker needs sqlite or redis
+SERVER_HOST = os.environ.get('DSA_SERVER_HOST', '127.0.0.1')
+SERVER_PORT = int(os.environ.get('DSA_SERVER_PORT', 8000))
+SERVER_WORKERS = int(os.environ.get('DSA_SERVER_WORKERS', 1 if STATE_BACKEND == 'memory' else os.cpu_count() or 1))
+SERVER_THREADS = int(os.environ.get('DSA_SERVER_THREADS', 8))
+# gunicorn worker class: 'gthread' runs SERVER_THREADS threads per worker, 'gevent'
+# (needs the gevent package) serves each request as a greenlet, so live view
+# streams no longer tie up a thread each
+SERVER_WORKER_CLASS = os.environ.get('DSA_SERVER_WORKER_CLASS', 'gthread')
+# Encode JSON responses with orjson when it is installed
+FAST_JSON = os.environ.get('DSA_FAST_JSON', '1').lower() in ('1', 'true', 'yes')
+# Serve static files from memory, gzipped and with ETags. Static URLs carry a
+# content hash (?v=), so browsers cache them for STATIC_MAX_AGE seconds and a
+# changed file gets a new URL; requests without the current hash revalidate
+STATIC_CACHE = os.environ.get('DSA_STATIC_CACHE', '1').lower() in ('1', 'true', 'yes')
+STATIC_MAX_AGE = int(os.environ.get('DSA_STATIC_MAX_AGE', 365 * 24 * 3600))
+# Render each page once (outside debug mode) and revalidate it by ETag
+PAGE_CACHE = os.environ.get('DSA_PAGE_CACHE', '1').lower() in ('1', 'true', 'yes')
+
+# Live viewers of shared structures (server-sent events). Every open stream
+# holds a server thread for as long as it is watched, so STREAM_MAX_VIEWERS
+# caps the streams each worker process serves at a quarter of its threads,
+# leaving the rest for API requests; further viewers get a 503. Gevent
+# workers serve hundreds. Changes only reach viewers in the process that
+# made them, so sharing is refused unless SERVER_WORKERS is 1
+STREAM_MAX_VIEWERS = int(os.environ.get('DSA_STREAM_MAX_VIEWERS',
+                                        1000 if SERVER_WORKER_CLASS == 'gevent' else max(SERVER_THREADS // 4, 1)))
+STREAM_BUFFER_SIZE = int(os.environ.get('DSA_STREAM_BUFFER_SIZE', 256))
+STREAM_KEEPALIVE = int(os.environ.get('DSA_STREAM_KEEPALIVE', 15))
+# Seconds a shared session with no viewers stays watchable
+STREAM_SHARE_TTL = int(os.environ.get('DSA_STREAM_SHARE_TTL', 600))
@@ -0,0 +1,7 @@
+# gunicorn settings, taken from config.py
+import config
+
+bind = f"{config.SERVER_HOST}:{config.SERVER_PORT}"
+workers = config.SERVER_WORKERS
+threads = config.SERVER_THREADS
+worker_class = config.SERVER_WORKER_CLASS
@@ -0,0 +1,205 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Linked list view, the list itself lives on the server
+    const linkedList = {
+        nodes: [],
+        capacity: 10,
+        type: 'singly', // 'singly', 'doubly', 'circular'
+
+        init: function(type) {
+            this.type = type;
+            this.nodes = [];
+
+            document.getElementById('history-list').innerHTML = '';
+            document.querySelectorAll('.list-type-btn').forEach(btn => {
+                btn.classList.toggle('active', btn.dataset.type === this.type);
+            });
+            const titles = { singly: 'Singly Linked List', doubly: 'Doubly Linked List', circular: 'Circular Linked List' };
+            document.getElementById('visualization-title').textContent = `${titles[type]} Visualization`;
+
+            this.run({ operation: 'size' }, () => `Initialized ${type} linked list`);
+        },
+
+        // Run one operation and fetch the nodes in the same batch, so the
+        // view is redrawn without a second round trip
+        run: function(operation, describe) {
+            fetch('/api/linked_list/batch', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    list_type: this.type,
+                    operations: [operation, { operation: 'get_nodes' }]
+                })
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.result === 'success') {
+                    this.nodes = data.data[1].data;
+                    this.updateVisualization();
+                    this.logOperation(describe(data.data[0].data));
+                } else {
+                    alert(data.message);
+                }
+            })
+            .catch(error => {
+                alert(`Error: ${error.message}`);
+            });
+        },
+
+        updateVisualization: function() {
+            const listNodes = document.getElementById('list-nodes');
+            listNodes.innerHTML = '';
+
+            this.nodes.forEach((node, index) => {
+                const element = document.createElement('div');
+                element.className = 'list-node';
+                element.style.backgroundColor = this.getElementColor(node.value);
+                element.innerHTML = `<span>${node.value}</span><span class="node-slot">slot ${node.node}</span>`;
+                listNodes.appendChild(element);
+
+                const isLast = index === this.nodes.length - 1;
+                const link = document.createElement('div');
+                if (isLast && this.type !== 'circular') {
+                    link.className = 'node-link end';
+                    link.textContent = '→ NULL';
+                } else if (isLast) {
+                    link.className = 'node-link';
+                    link.textContent = '↺ HEAD';
+                } else {
+                    link.className = 'node-link';
+                    link.textContent = this.type === 'singly' ? '→' : '⇄';
+                }
+                listNodes.appendChild(link);
+            });
+
+            // Update info panel
+            const size = this.nodes.length;
+            document.getElementById('list-size').textContent = size;
+            document.getElementById('list-capacity').textContent = this.capacity;
+            document.getElementById('head-element').textContent = size ? this.nodes[0].value : 'None';
+            document.getElementById('tail-element').textContent = size ? this.nodes[size - 1].value : 'None';
+        },
+
+        getElementColor: function(value) {
+            // Generate a color based on the value for visual distinction
+            const hue = (value * 137) % 360; // Simple hash for hue
+            return `hsl(${hue}, 70%, 65%)`;
+        },
+
+        logOperation: function(operation) {
+            const historyList = document.getElementById('history-list');
+            const historyItem = document.createElement('div');
+
+            // Determine operation type for styling
+            let operationType = 'other';
+            if (operation.startsWith('Inserted')) operationType = 'insert';
+            if (operation.startsWith('Removed')) operationType = 'remove';
+
+            historyItem.className = `history-item ${operationType}`;
+            historyItem.textContent = `${new Date().toLocaleTimeString()}: ${operation}`;
+
+            historyList.appendChild(historyItem);
+            historyList.scrollTop = historyList.scrollHeight;
+        }
+    };
+
+    function readValue() {
+        const value = document.getElementById('element-value').value;
+        if (!value) {
+            alert('Please enter a value.');
+            return null;
+        }
+        return Number(value);
+    }
+
+    function readIndex() {
+        const index = document.getElementById('element-index').value;
+        if (index === '') {
+            alert('Please enter an index.');
+            return null;
+        }
+        return parseInt(index);
+    }
+
+    document.querySelectorAll('.list-type-btn').forEach(btn => {
+        btn.addEventListener('click', function() {
+            linkedList.init(this.dataset.type);
+        });
+    });
+
+    // Event listeners for buttons
+    document.getElementById('insert-head-btn').addEventListener('click', function() {
+        const value = readValue();
+        if (value !== null) {
+            linkedList.run({ operation: 'insert_head', value: value }, () => `Inserted ${value} at head`);
+        }
+    });
+
+    document.getElementById('insert-tail-btn').addEventListener('click', function() {
+        const value = readValue();
+        if (value !== null) {
+            linkedList.run({ operation: 'insert_tail', value: value }, () => `Inserted ${value} at tail`);
+        }
+    });
+
+    document.getElementById('insert-at-btn').addEventListener('click', function() {
+        const value = readValue();
+        const index = readIndex();
+        if (value !== null && index !== null) {
+            linkedList.run({ operation: 'insert_at', value: value, index: index }, () => `Inserted ${value} at index ${index}`);
+        }
+    });
+
+    document.getElementById('find-btn').addEventListener('click', function() {
+        const value = readValue();
+        if (value !== null) {
+            linkedList.run({ operation: 'find', value: value },
+                index => index >= 0 ? `Found ${value} at index ${index}` : `${value} is not in the list`);
+        }
+    });
+
+    document.getElementById('remove-head-btn').addEventListener('click', function() {
+        linkedList.run({ operation: 'remove_head' }, value => `Removed ${value} from head`);
+    });
+
+    document.getElementById('remove-tail-btn').addEventListener('click', function() {
+        linkedList.run({ operation: 'remove_tail' }, value => `Removed ${value} from tail`);
+    });
+
+    document.getElementById('remove-at-btn').addEventListener('click', function() {
+        const index = readIndex();
+        if (index !== null) {
+            linkedList.run({ operation: 'remove_at', index: index }, value => `Removed ${value} at index ${index}`);
+        }
+    });
+
+    document.getElementById('remove-value-btn').addEventListener('click', function() {
+        const value = readValue();
+        if (value !== null) {
+            linkedList.run({ operation: 'remove_value', value: value }, index => `Removed ${value} at index ${index}`);
+        }
+    });
+
+    document.getElementById('reverse-btn').addEventListener('click', function() {
+        linkedList.run({ operation: 'reverse' }, () => 'Reversed list');
+    });
+
+    document.getElementById('clear-btn').addEventListener('click', function() {
+        linkedList.run({ operation: 'clear' }, () => 'Cleared list');
+    });
+
+    document.getElementById('merge-btn').addEventListener('click', function() {
+        const values = document.getElementById('merge-values').value
+            .split(',')
+            .map(value => value.trim())
+            .filter(value => value !== '')
+            .map(Number);
+        const ordered = document.getElementById('merge-ordered').checked;
+        linkedList.run({ operation: 'merge', values: values, ordered: ordered },
+            size => `Merged ${values.join(', ')}${ordered ? ' in sorted order' : ''}, size is now ${size}`);
+    });
+
+    // Initialize with singly linked list
+    linkedList.init('singly');
+});
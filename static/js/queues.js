@@ -6,6 +6,9 @@ document.addEventListener('DOMContentLoaded', function() {
         front: 0,
         rear: -1,
         count: 0,
+        version: -1, // server version of the elements we hold, -1 forces a snapshot
+        watching: null, // watch id when following someone else's shared queue
+        source: null,
         type: 'linear', // 'linear', 'circular', 'deque', 'priority'
         
         init: function(type) {
@@ -14,6 +17,7 @@ document.addEventListener('DOMContentLoaded', function() {
             this.front = 0;
             this.rear = -1;
             this.count = 0;
+            this.version = -1;
             
             // Clear operation history when changing queue type
             this.clearOperationHistory();
@@ -21,6 +25,11 @@ document.addEventListener('DOMContentLoaded', function() {
             // Update UI based on queue type
             this.updateUIForQueueType();
             this.updateVisualization();
+            if (this.watching) {
+                this.watch(this.watching);
+            } else {
+                this.getAllElements();
+            }
             this.logOperation(`Initialized ${type} queue`);
         },
         
@@ -31,25 +40,25 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         },
         
-        enqueue: function(value, priority = null) {
-            fetch('/api/queue', {
+        // Run one mutating operation and refresh the view from the changes in
+        // the same response, saving the follow-up get_all round trip
+        mutate: function(operation, onSuccess) {
+            fetch('/api/queue/batch', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    operation: 'enqueue',
-                    value: Number(value),
-                    priority: priority,
-                    queue_type: this.type
+                    queue_type: this.type,
+                    operations: [operation],
+                    since: this.version
                 })
             })
             .then(response => response.json())
             .then(data => {
                 if (data.result === 'success') {
-                    // Refresh the queue visualization
-                    this.getAllElements();
-                    this.logOperation(`Enqueued ${value}${priority ? ' with priority ' + priority : ''}`);
+                    this.applySync(data.sync);
+                    onSuccess(data.data[0].data);
                 } else {
                     alert(`Error: ${data.message}`);
                 }
@@ -59,82 +68,34 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         },
         
+        enqueue: function(value, priority = null) {
+            this.mutate({
+                operation: 'enqueue',
+                value: Number(value),
+                priority: priority
+            }, () => {
+                this.logOperation(`Enqueued ${value}${priority ? ' with priority ' + priority : ''}`);
+            });
+        },
+        
         dequeue: function() {
-            fetch('/api/queue', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    operation: 'dequeue',
-                    queue_type: this.type
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.result === 'success') {
-                    // Refresh the queue visualization
-                    this.getAllElements();
-                    this.logOperation(`Dequeued ${data.data}`);
-                } else {
-                    alert(`Error: ${data.message}`);
-                }
-            })
-            .catch(error => {
-                alert(`Error: ${error.message}`);
+            this.mutate({ operation: 'dequeue' }, result => {
+                this.logOperation(`Dequeued ${result}`);
             });
         },
         
         enqueueFront: function(value) {
-            fetch('/api/queue', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    operation: 'enqueue_front',
-                    value: Number(value),
-                    queue_type: this.type
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.result === 'success') {
-                    // Refresh the queue visualization
-                    this.getAllElements();
-                    this.logOperation(`Enqueued ${value} at front`);
-                } else {
-                    alert(`Error: ${data.message}`);
-                }
-            })
-            .catch(error => {
-                alert(`Error: ${error.message}`);
+            this.mutate({
+                operation: 'enqueue_front',
+                value: Number(value)
+            }, () => {
+                this.logOperation(`Enqueued ${value} at front`);
             });
         },
         
         dequeueRear: function() {
-            fetch('/api/queue', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    operation: 'dequeue_rear',
-                    queue_type: this.type
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.result === 'success') {
-                    // Refresh the queue visualization
-                    this.getAllElements();
-                    this.logOperation(`Dequeued ${data.data} from rear`);
-                } else {
-                    alert(`Error: ${data.message}`);
-                }
-            })
-            .catch(error => {
-                alert(`Error: ${error.message}`);
+            this.mutate({ operation: 'dequeue_rear' }, result => {
+                this.logOperation(`Dequeued ${result} from rear`);
             });
         },
         
@@ -163,28 +124,8 @@ document.addEventListener('DOMContentLoaded', function() {
         },
         
         clear: function() {
-            fetch('/api/queue', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    operation: 'clear',
-                    queue_type: this.type
-                })
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.result === 'success') {
-                    // Refresh the queue visualization
-                    this.getAllElements();
-                    this.logOperation('Cleared queue');
-                } else {
-                    alert(`Error: ${data.message}`);
-                }
-            })
-            .catch(error => {
-                alert(`Error: ${error.message}`);
+            this.mutate({ operation: 'clear' }, () => {
+                this.logOperation('Cleared queue');
             });
         },
         
@@ -260,6 +201,46 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         },
         
+        share: function() {
+            fetch('/api/share', { method: 'POST' })
+            .then(response => response.json())
+            .then(data => {
+                if (data.result === 'success') {
+                    const url = `${location.origin}/queues?watch=${data.data.watch_id}&type=${this.type}`;
+                    document.getElementById('share-link').textContent = url;
+                    this.logOperation(`Sharing live view at ${url}`);
+                } else {
+                    alert(`Error: ${data.message}`);
+                }
+            })
+            .catch(error => {
+                alert(`Error: ${error.message}`);
+            });
+        },
+        
+        // Follow a shared queue through server-sent events instead of polling
+        watch: function(watchId) {
+            if (this.source) {
+                this.source.close();
+            }
+            
+            // Viewers only watch, hide the controls that would change their own queue
+            document.querySelector('.queue-operations').style.display = 'none';
+            document.getElementById('share-link').textContent = 'Watching a shared queue';
+            
+            this.source = new EventSource(`/api/stream/${watchId}/${this.type}`);
+            const onSync = event => {
+                const sync = JSON.parse(event.data);
+                if (sync.changes) {
+                    // Skip anything already covered by the snapshot we hold
+                    sync.changes = sync.changes.filter(change => change.version > this.version);
+                }
+                this.applySync(sync);
+            };
+            this.source.addEventListener('snapshot', onSync);
+            this.source.addEventListener('changes', onSync);
+        },
+        
         getAllElements: function() {
             fetch('/api/queue', {
                 method: 'POST',
@@ -267,17 +248,15 @@ document.addEventListener('DOMContentLoaded', function() {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    operation: 'get_all',
+                    operation: 'get_changes',
+                    since: this.version,
                     queue_type: this.type
                 })
             })
             .then(response => response.json())
             .then(data => {
                 if (data.result === 'success') {
-                    this.elements = data.data;
-                    this.count = this.elements.length;
-                    this.rear = this.count - 1;
-                    this.updateVisualization();
+                    this.applySync(data.data);
                 } else {
                     console.error('Error getting queue elements:', data.message);
                 }
@@ -287,6 +266,64 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         },
         
+        // Apply a delta (or full snapshot) from the server to the local elements
+        applySync: function(sync) {
+            if (sync.snapshot) {
+                this.elements = sync.snapshot;
+            } else {
+                sync.changes.forEach(change => this.applyChange(change));
+            }
+            this.version = sync.version;
+            this.setElements(this.elements);
+        },
+        
+        applyChange: function(change) {
+            switch (change.op) {
+                case 'enqueue':
+                    if (change.id !== undefined) {
+                        this.insertByPriority({ value: change.value, priority: change.priority, id: change.id });
+                    } else {
+                        this.elements.push(change.value);
+                    }
+                    break;
+                case 'dequeue':
+                    this.elements.shift();
+                    break;
+                case 'enqueue_front':
+                    this.elements.unshift(change.value);
+                    break;
+                case 'dequeue_rear':
+                    this.elements.pop();
+                    break;
+                case 'update_priority': {
+                    const index = this.elements.findIndex(element => element.id === change.id);
+                    const element = this.elements.splice(index, 1)[0];
+                    element.priority = change.priority;
+                    this.insertByPriority(element);
+                    break;
+                }
+                case 'clear':
+                    this.elements = [];
+                    break;
+            }
+        },
+        
+        // Keep priority elements ordered by (priority, id) like the server heap
+        insertByPriority: function(element) {
+            let index = this.elements.findIndex(other =>
+                other.priority > element.priority ||
+                (other.priority === element.priority && other.id > element.id));
+            if (index === -1) index = this.elements.length;
+            this.elements.splice(index, 0, element);
+        },
+        
+        setElements: function(elements) {
+            this.elements = elements;
+            this.count = this.elements.length;
+            this.rear = this.count - 1;
+            this.updateVisualization();
+        },
+        
         updateVisualization: function() {
             // Skip visualization update for priority queue
             if (this.type === 'priority') {
@@ -469,15 +506,50 @@ document.addEventListener('DOMContentLoaded', function() {
             });
         },
         
+        importProcesses: function() {
+            const fileInput = document.getElementById('process-import');
+            if (!fileInput.files.length) {
+                alert('Please choose a file to import.');
+                return;
+            }
+            
+            const formData = new FormData();
+            formData.append('file', fileInput.files[0]);
+            
+            fetch('/api/priority_scheduler/import', {
+                method: 'POST',
+                body: formData
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.result === 'success') {
+                    alert(data.message);
+                    fileInput.value = '';
+                    
+                    // Refresh process table
+                    this.getProcesses();
+                } else {
+                    alert(`Error: ${data.message}`);
+                }
+            })
+            .catch(error => {
+                alert(`Error: ${error.message}`);
+            });
+        },
+        
         calculateSchedule: function() {
+            // Kept so later pages of the execution steps come from the same schedule
+            this.scheduleRequest = {
+                action: 'calculate_schedule',
+                policy: document.getElementById('scheduling-policy').value,
+                quantum: parseInt(document.getElementById('time-quantum').value) || 2
+            };
             fetch('/api/priority_scheduler', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({
-                    action: 'calculate_schedule'
-                })
+                body: JSON.stringify(this.scheduleRequest)
             })
             .then(response => response.json())
             .then(data => {
@@ -580,7 +652,7 @@ document.addEventListener('DOMContentLoaded', function() {
             this.renderGanttChart(data.gantt_chart);
             
             // Show execution steps
-            this.showExecutionSteps(data.execution_steps);
+            this.showExecutionSteps(data.execution_steps, data.trace_window);
         },
         
         calculateAverages: function(avgWaitingTime, avgTurnaroundTime) {
@@ -640,9 +712,20 @@ document.addEventListener('DOMContentLoaded', function() {
             ganttContainer.appendChild(segmentsContainer);
         },
         
-        showExecutionSteps: function(steps) {
+        showExecutionSteps: function(steps, traceWindow) {
             const stepsContainer = document.getElementById('execution-steps-container');
             stepsContainer.innerHTML = '';
+            this.appendExecutionSteps(steps, traceWindow);
+            stepsContainer.scrollTop = stepsContainer.scrollHeight;
+        },
+        
+        // The server returns one window of steps at a time, trace_window.total says how many there are
+        appendExecutionSteps: function(steps, traceWindow) {
+            const stepsContainer = document.getElementById('execution-steps-container');
+            const moreElement = document.getElementById('steps-more');
+            if (moreElement) {
+                moreElement.remove();
+            }
             
             steps.forEach(step => {
                 const stepElement = document.createElement('div');
@@ -651,12 +734,47 @@ document.addEventListener('DOMContentLoaded', function() {
                 stepsContainer.appendChild(stepElement);
             });
             
-            stepsContainer.scrollTop = stepsContainer.scrollHeight;
+            const shown = traceWindow.offset + steps.length;
+            if (shown < traceWindow.total) {
+                const more = document.createElement('div');
+                more.id = 'steps-more';
+                more.className = 'step';
+                more.textContent = `Showing ${shown} of ${traceWindow.total} steps `;
+                const button = document.createElement('button');
+                button.className = 'btn-operation secondary';
+                button.textContent = 'Show more steps';
+                button.addEventListener('click', () => this.loadMoreSteps(shown));
+                more.appendChild(button);
+                stepsContainer.appendChild(more);
+            }
+        },
+        
+        loadMoreSteps: function(offset) {
+            fetch('/api/priority_scheduler', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify(Object.assign({}, this.scheduleRequest, { offset: offset }))
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.result === 'success') {
+                    this.appendExecutionSteps(data.data.execution_steps, data.data.trace_window);
+                } else {
+                    alert(`Error: ${data.message}`);
+                }
+            })
+            .catch(error => {
+                alert(`Error: ${error.message}`);
+            });
         }
     };
     
-    // Initialize the queue visualization
-    queue.init('linear');
+    // Initialize the queue visualization, following a shared queue if the link says so
+    const params = new URLSearchParams(location.search);
+    queue.watching = params.get('watch');
+    queue.init(params.get('type') || 'linear');
     
     // Event listeners for queue type tabs
     document.querySelectorAll('.queue-type-btn').forEach(btn => {
@@ -715,11 +833,19 @@ document.addEventListener('DOMContentLoaded', function() {
         queue.isFull();
     });
     
+    document.getElementById('share-btn').addEventListener('click', function() {
+        queue.share();
+    });
+    
     // Priority scheduler event listeners
     document.getElementById('add-process-btn').addEventListener('click', function() {
         queue.addProcess();
     });
     
+    document.getElementById('import-processes-btn').addEventListener('click', function() {
+        queue.importProcesses();
+    });
+    
     document.getElementById('calculate-btn').addEventListener('click', function() {
         queue.calculateSchedule();
     });
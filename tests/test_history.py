@@ -0,0 +1,218 @@
+import json
+
+import pytest
+
+from utils.history import History, PersistentDeque, PersistentStack, PersistentTreap
+from utils.queue import Queue
+from utils.stack import Stack
+
+
+def test_persistent_stack_versions_are_independent():
+    empty = PersistentStack()
+    one = empty.push(1)
+    two = one.push(2)
+    assert two.pop().to_list() == [1]
+    assert one.to_list() == [1]
+    assert empty.to_list() == []
+    assert PersistentStack.from_list([1, 2, 3]).push(4).to_list() == [1, 2, 3, 4]
+
+
+def test_persistent_deque_matches_a_list():
+    version = PersistentDeque.from_list([1, 2, 3])
+    versions = [version]
+    expected = [[1, 2, 3]]
+    version = version.push_back(4)
+    versions.append(version)
+    expected.append([1, 2, 3, 4])
+    version = version.pop_front()
+    versions.append(version)
+    expected.append([2, 3, 4])
+    version = version.push_front(0)
+    versions.append(version)
+    expected.append([0, 2, 3, 4])
+    version = version.pop_back().pop_back()
+    versions.append(version)
+    expected.append([0, 2])
+    assert [v.to_list() for v in versions] == expected
+
+
+def test_persistent_treap_orders_by_priority_then_id():
+    treap = PersistentTreap()
+    for value, priority, element_id in [('a', 3, 1), ('b', 1, 2), ('c', 3, 0), ('d', 2, 3)]:
+        treap = treap.insert(value, priority, element_id)
+    assert [item[0] for item in treap.items()] == ['b', 'd', 'c', 'a']
+    assert [item[0] for item in treap.pop_min().items()] == ['d', 'c', 'a']
+
+
+def test_stack_undo_redo_and_jump():
+    stack = Stack(capacity=None)
+    for value in (1, 2, 3):
+        stack.push(value)
+    stack.pop()
+    assert stack.to_list() == [1, 2]
+
+    stack.undo()
+    assert stack.to_list() == [1, 2, 3]
+    stack.undo()
+    stack.undo()
+    assert stack.to_list() == [1]
+    stack.redo()
+    assert stack.to_list() == [1, 2]
+
+    stack.jump(0)
+    assert stack.to_list() == []
+    stack.jump(4)
+    assert stack.to_list() == [1, 2]
+    with pytest.raises(Exception, match="Nothing to redo"):
+        stack.redo()
+    with pytest.raises(Exception, match="Step must be between 0 and 4"):
+        stack.jump(5)
+
+
+def test_new_step_drops_undone_steps():
+    stack = Stack(capacity=None)
+    stack.push(1)
+    stack.push(2)
+    stack.undo()
+    stack.push(3)
+    assert stack.to_list() == [1, 3]
+    history = stack.get_history()
+    assert (history['step'], history['last_step']) == (2, 2)
+    assert [entry['op'] for entry in history['operations']] == [['push', 1], ['push', 3]]
+
+
+def test_undo_restores_the_configuration():
+    stack = Stack(capacity=5)
+    stack.push(1)
+    stack.configure(10, 'int')
+    stack.push(2)
+    stack.jump(1)
+    assert stack.get_config() == {'capacity': 5, 'element_type': None}
+    stack.redo()
+    assert stack.get_config() == {'capacity': 10, 'element_type': 'int'}
+
+
+def test_queue_history_follows_every_queue_type():
+    for queue_type in ('linear', 'circular', 'deque'):
+        queue = Queue(capacity=None, queue_type=queue_type)
+        queue.enqueue(1)
+        queue.enqueue(2)
+        queue.dequeue()
+        queue.undo()
+        assert queue.to_list() == [1, 2], queue_type
+        queue.jump(1)
+        assert queue.to_list() == [1], queue_type
+
+    queue = Queue(capacity=None, queue_type='priority')
+    queue.enqueue('low', 5)
+    queue.enqueue('high', 1)
+    queue.dequeue()
+    queue.undo()
+    assert [element['value'] for element in queue.to_list()] == ['high', 'low']
+
+
+def test_trimming_keeps_the_last_limit_steps_reachable():
+    stack = Stack(capacity=None, history_limit=8)
+    for value in range(30):
+        stack.push(value)
+    history = stack.get_history()
+    assert history['last_step'] == 30
+    assert history['last_step'] - history['first_step'] >= 8
+    # Steps are trimmed in chunks, never more than a quarter of the limit late
+    assert history['last_step'] - history['first_step'] <= 8 + 8 // 4
+
+    first_step = history['first_step']
+    stack.jump(first_step)
+    assert stack.to_list() == list(range(first_step))
+    with pytest.raises(Exception, match="Step must be between"):
+        stack.jump(first_step - 1)
+    with pytest.raises(Exception, match="Nothing to undo"):
+        stack.undo()
+
+
+def test_zero_limit_turns_history_off():
+    stack = Stack(capacity=None, history_limit=0)
+    stack.push(1)
+    with pytest.raises(Exception, match="Nothing to undo"):
+        stack.undo()
+
+
+def test_history_replays_operations_through_apply():
+    history = History(lambda data, op: data + [op], [], ('config',), limit=3)
+    for op in 'abcde':
+        history.record(op, ('config',))
+    assert history.current() == (list('abcde'), ('config',))
+    assert history.jump(history.first_step)[0] == list('abcde')[:history.first_step]
+
+
+def reload(structure):
+    """Round-trip a structure through its state, as the shared backends do every request"""
+    return type(structure).from_state(json.loads(json.dumps(structure.to_state())))
+
+
+def test_loaded_history_records_without_replaying():
+    stack = Stack(capacity=None)
+    for value in range(5):
+        stack.push(value)
+    stack = reload(stack)
+    assert stack.history.pending is not None
+
+    stack.push(5)
+    stack = reload(stack)
+    stack.push(6)
+    # Still only the logged operations, nothing was replayed
+    assert stack.history.pending is not None
+    assert stack.get_history()['last_step'] == 7
+
+    stack.undo()
+    assert stack.history.pending is None
+    assert stack.to_list() == [0, 1, 2, 3, 4, 5]
+    stack.jump(2)
+    assert stack.to_list() == [0, 1]
+
+
+def test_loaded_history_drops_undone_steps():
+    stack = Stack(capacity=None)
+    for value in range(3):
+        stack.push(value)
+    stack.jump(1)
+    stack = reload(stack)
+    stack.push(9)
+    assert stack.history.pending is not None
+    stack = reload(stack)
+    history = stack.get_history()
+    assert (history['step'], history['last_step']) == (2, 2)
+    stack.undo()
+    assert stack.to_list() == [0]
+    stack.redo()
+    assert stack.to_list() == [0, 9]
+
+
+def test_loaded_history_trims_like_a_live_one():
+    live = Stack(capacity=None, history_limit=8)
+    loaded = Stack(capacity=None, history_limit=8)
+    for value in range(40):
+        live.push(value)
+        loaded.push(value)
+        loaded = reload(loaded)
+    assert loaded.get_history() == live.get_history()
+    first_step = live.get_history()['first_step']
+    live.jump(first_step)
+    loaded.jump(first_step)
+    assert loaded.to_list() == live.to_list() == list(range(first_step))
+
+
+def test_loaded_queue_history_keeps_configurations():
+    queue = Queue(capacity=5, queue_type='deque')
+    queue.enqueue(1)
+    queue.configure(10, 'int')
+    queue.enqueue_front(2)
+    queue = reload(queue)
+    queue.enqueue(3)
+    queue = reload(queue)
+    queue.jump(1)
+    assert queue.get_config()['capacity'] == 5
+    assert queue.to_list() == [1]
+    queue.jump(4)
+    assert queue.get_config() == {'capacity': 10, 'element_type': 'int', 'growable': False}
+    assert queue.to_list() == [2, 1, 3]
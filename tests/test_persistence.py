@@ -0,0 +1,162 @@
+import json
+import os
+import subprocess
+import sys
+from array import array
+
+import pytest
+
+from utils.persistence import Journal, ScenarioLibrary, decode, encode, load_snapshot, save_snapshot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATE = {
+    'ints': list(range(-5, 100)),
+    'floats': [i / 3 for i in range(40)],
+    'short': [1, 2, 3],
+    'huge': [2 ** 70] * 20,
+    'mixed': [1, 2.5, 'three', None, True] * 4,
+    'empty': {},
+    'empty_list': [],
+    'nested': {'inner': [[i, i + 1] for i in range(20)], 'deep': {'values': list(range(30))}},
+    'rows': [{'id': i, 'burst': i * 2, 'name': f"P{i}", 'weights': list(range(i, i + 16))} for i in range(25)],
+    'ragged': [{'a': 1}, {'b': 2}],
+    'unicode': "naïve → ✓",
+}
+
+
+def test_encode_decode_round_trip():
+    assert decode(encode(STATE)) == STATE
+    assert decode(encode([])) == []
+    assert decode(encode(list(range(100)))) == list(range(100))
+
+
+def test_number_lists_are_stored_as_raw_sections():
+    data = encode({'values': list(range(10000))})
+    assert len(data) < 10000 * 8 + 200
+    assert decode(encode({'values': array('q', range(20))})) == {'values': list(range(20))}
+
+
+def test_decode_rejects_bad_snapshots():
+    data = encode({'values': list(range(100))})
+    with pytest.raises(ValueError, match="truncated"):
+        decode(data[:8])
+    with pytest.raises(ValueError, match="truncated"):
+        decode(data[:-8])
+    with pytest.raises(ValueError, match="Unsupported snapshot format"):
+        decode(b'XXXX' + data[4:])
+
+
+@pytest.mark.parametrize('mmap_threshold', [0, 1024 * 1024])
+def test_save_and_load_snapshot(tmp_path, mmap_threshold):
+    path = str(tmp_path / 'state' / 'checkpoint.dsas')
+    save_snapshot(path, STATE)
+    assert load_snapshot(path, mmap_threshold) == STATE
+    save_snapshot(path, {'replaced': True})
+    assert load_snapshot(path, mmap_threshold) == {'replaced': True}
+    assert os.listdir(tmp_path / 'state') == ['checkpoint.dsas']
+
+
+def test_journal_replays_records_in_order(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    journal = Journal(path)
+    for number in range(5):
+        journal.append({'n': number})
+    journal.close()
+
+    reopened = Journal(path)
+    assert reopened.count == 5
+    assert [record['n'] for record in reopened.records()] == list(range(5))
+    reopened.truncate()
+    assert reopened.count == 0
+    assert list(reopened.records()) == []
+    reopened.append({'n': 'after'})
+    reopened.close()
+    assert list(Journal(path).records()) == [{'n': 'after'}]
+
+
+def test_journal_stops_at_a_torn_line(tmp_path):
+    path = str(tmp_path / 'journal.log')
+    journal = Journal(path)
+    journal.append({'n': 1})
+    journal.append({'n': 2})
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"n": 3, "o": [[')
+    assert list(Journal(path).records()) == [{'n': 1}, {'n': 2}]
+
+
+def test_scenario_library_caps(tmp_path):
+    library = ScenarioLibrary(str(tmp_path), max_scenarios=2, max_bytes=4096)
+    library.save('one', 'stack', {'elements': [1, 2, 3], 'history': ['dropped']})
+    library.save('two', 'stack', {'elements': []})
+    assert library.load('one') == ('stack', {'elements': [1, 2, 3]})
+    library.save('one', 'stack', {'elements': [4]})  # replacing does not count
+    with pytest.raises(Exception, match="at most 2 scenarios"):
+        library.save('three', 'stack', {'elements': []})
+    library.delete('two')
+    with pytest.raises(Exception, match="at most 4096 bytes"):
+        library.save('three', 'stack', {'elements': [str(i) for i in range(1000)]})
+    assert [scenario['name'] for scenario in library.list()] == ['one']
+    with pytest.raises(Exception, match="Scenario names"):
+        library.save('../escape', 'stack', {})
+
+
+# Runs requests against a fresh app process, which exits without a clean shutdown
+CLIENT = """
+import json, os, sys
+from app import app
+client = app.test_client()
+results = []
+for path, body in json.loads(sys.argv[1]):
+    response = client.post(path, json=body, headers={'X-Session-Id': 'recovery'})
+    results.append(response.get_json())
+print(json.dumps(results))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+
+def run_app(tmp_path, requests, **env):
+    environment = dict(os.environ, DSA_STATE_BACKEND='memory', DSA_JOURNAL_PATH=str(tmp_path / 'journal.log'),
+                       DSA_CHECKPOINT_PATH=str(tmp_path / 'checkpoint.dsas'), **env)
+    output = subprocess.run([sys.executable, '-c', CLIENT, json.dumps(requests)], cwd=ROOT, env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def stack_contents(tmp_path, **env):
+    return run_app(tmp_path, [['/api/stack', {'operation': 'get_all'}]], **env)[0]['data']
+
+
+def test_journal_recovers_state_after_a_crash(tmp_path):
+    results = run_app(tmp_path, [['/api/stack', {'operation': 'push', 'value': value}] for value in (1, 2, 3)]
+                      + [['/api/stack', {'operation': 'pop'}],
+                         ['/api/queue', {'operation': 'enqueue', 'value': 'a', 'queue_type': 'circular'}]])
+    assert all(result['result'] == 'success' for result in results)
+    assert not os.path.exists(tmp_path / 'checkpoint.dsas')
+
+    assert stack_contents(tmp_path) == [1, 2]
+    # Startup folded the journal into a checkpoint
+    assert os.path.getsize(tmp_path / 'journal.log') == 0
+    assert load_snapshot(str(tmp_path / 'checkpoint.dsas'))
+    assert stack_contents(tmp_path) == [1, 2]
+    queue = run_app(tmp_path, [['/api/queue', {'operation': 'get_all', 'queue_type': 'circular'}]])[0]
+    assert queue['data'] == ['a']
+
+
+def test_recovery_replays_the_journal_on_top_of_a_checkpoint(tmp_path):
+    run_app(tmp_path, [['/api/stack', {'operation': 'push', 'value': value}] for value in range(5)],
+            DSA_JOURNAL_CHECKPOINT_EVERY='3')
+    # A checkpoint after three pushes, the last two are only in the journal
+    assert len(list(Journal(str(tmp_path / 'journal.log')).records())) == 2
+    assert stack_contents(tmp_path) == [0, 1, 2, 3, 4]
+
+
+def test_recovery_skips_a_torn_last_record(tmp_path):
+    run_app(tmp_path, [['/api/stack', {'operation': 'push', 'value': value}] for value in (1, 2)])
+    with open(tmp_path / 'journal.log', 'a', encoding='utf-8') as f:
+        f.write('{"s":"recovery","n":"stack","o":[["stack",{"operation":"push","val')
+    assert stack_contents(tmp_path) == [1, 2]
+    run_app(tmp_path, [['/api/stack', {'operation': 'push', 'value': 3}]])
+    assert stack_contents(tmp_path) == [1, 2, 3]
@@ -0,0 +1,200 @@
+import random
+import time
+from collections import deque
+
+import pytest
+
+from utils.scheduler import POLICIES, describe_trace, iter_schedule, schedule
+
+# Keys the reference picks the next process by, the first item decides preemption
+KEYS = {
+    'fcfs': lambda p, remaining: (p['arrival_time'],),
+    'sjf': lambda p, remaining: (p['burst_time'], p['arrival_time']),
+    'srtf': lambda p, remaining: (remaining, p['arrival_time']),
+    'priority': lambda p, remaining: (p['priority'], p['arrival_time']),
+    'priority_preemptive': lambda p, remaining: (p['priority'], p['arrival_time']),
+}
+PREEMPTIVE = {'srtf', 'priority_preemptive'}
+
+
+def reference(processes, policy, quantum):
+    """Tick-by-tick simulation: completion times and the Gantt chart as (id, start, end)"""
+    n = len(processes)
+    remaining = [p['burst_time'] for p in processes]
+    completion = [0] * n
+    arrived = [False] * n
+    ticks = []  # process index per time unit, None when idle
+    time_now = 0
+
+    def admit():
+        new = []
+        for index in sorted(range(n), key=lambda i: processes[i]['arrival_time']):
+            if not arrived[index] and processes[index]['arrival_time'] <= time_now:
+                arrived[index] = True
+                new.append(index)
+        return new
+
+    def tick(index):
+        nonlocal time_now
+        ticks.append(index)
+        time_now += 1
+        remaining[index] -= 1
+        if remaining[index] == 0:
+            completion[index] = time_now
+
+    def idle():
+        nonlocal time_now
+        ticks.append(None)
+        time_now += 1
+
+    if policy in KEYS:
+        key = KEYS[policy]
+        ready = []
+        running = None
+        while any(remaining):
+            ready += admit()
+            candidates = [i for i in ready if remaining[i]]
+            full_key = lambda i: key(processes[i], remaining[i]) + (i,)
+            if running is None and candidates:
+                running = min(candidates, key=full_key)
+            elif running is not None and policy in PREEMPTIVE:
+                others = [i for i in candidates if i != running]
+                if others:
+                    best = min(others, key=full_key)
+                    if full_key(best)[0] < full_key(running)[0]:
+                        running = best
+            if running is None:
+                idle()
+                continue
+            tick(running)
+            if remaining[running] == 0:
+                ready.remove(running)
+                running = None
+
+    elif policy == 'round_robin':
+        ready = deque()
+        while any(remaining):
+            ready.extend(admit())
+            if not ready:
+                idle()
+                continue
+            index = ready.popleft()
+            for _ in range(min(quantum, remaining[index])):
+                tick(index)
+            ready.extend(admit())
+            if remaining[index]:
+                ready.append(index)
+
+    else:  # mlfq: quanta q and 2q, then first come first serve; arrivals preempt lower levels
+        quanta = [quantum, 2 * quantum, None]
+        queues = [deque(), deque(), deque()]
+        while any(remaining):
+            queues[0].extend(admit())
+            level = next((level for level, queue in enumerate(queues) if queue), None)
+            if level is None:
+                idle()
+                continue
+            index = queues[level].popleft()
+            used = 0
+            while remaining[index]:
+                tick(index)
+                used += 1
+                if not remaining[index]:
+                    break
+                if used == quanta[level]:
+                    queues[level + 1].append(index)
+                    break
+                new = admit()
+                queues[0].extend(new)
+                if level > 0 and new:
+                    queues[level].appendleft(index)
+                    break
+
+    # Merge runs of the same process into Gantt segments, idle ticks break them
+    gantt = []
+    for start, index in enumerate(ticks):
+        if index is None:
+            continue
+        process_id = processes[index]['id']
+        if gantt and gantt[-1][0] == process_id and gantt[-1][2] == start:
+            gantt[-1][2] = start + 1
+        else:
+            gantt.append([process_id, start, start + 1])
+    return completion, [tuple(segment) for segment in gantt]
+
+
+def random_processes(rng, count):
+    return [{'id': f"P{i}", 'arrival_time': rng.randint(0, 20), 'burst_time': rng.randint(1, 12),
+             'priority': rng.randint(1, 4)} for i in range(count)]
+
+
+@pytest.mark.parametrize('policy', POLICIES)
+def test_policies_match_the_reference(policy):
+    rng = random.Random(policy)
+    for _ in range(300):
+        processes = random_processes(rng, rng.randint(1, 7))
+        quantum = rng.randint(1, 4)
+        result = schedule(processes, policy, quantum)
+        completion, gantt = reference(processes, policy, quantum)
+        assert result['completion_times'] == completion, (processes, quantum)
+        assert [(s['process'], s['start_time'], s['end_time']) for s in result['gantt_chart']] == gantt
+        assert result['total_time'] == max(completion)
+
+
+@pytest.mark.parametrize('policy', POLICIES)
+def test_streamed_schedule_matches_schedule(policy):
+    rng = random.Random(1)
+    processes = random_processes(rng, 6)
+    result = schedule(processes, policy, 2)
+    events = iter_schedule(processes, policy, 2)
+    trace, gantt = [], []
+    while True:
+        try:
+            kind, payload = next(events)
+        except StopIteration as stop:
+            completion_times, total_time = stop.value
+            break
+        (trace if kind == 'event' else gantt).append(payload)
+    assert trace == result['trace']
+    assert gantt == result['gantt_chart']
+    assert (completion_times, total_time) == (result['completion_times'], result['total_time'])
+
+
+def test_round_robin_runs_a_lone_process_in_one_step():
+    processes = [{'id': 'A', 'arrival_time': 0, 'burst_time': 10 ** 7, 'priority': 1}]
+    started = time.perf_counter()
+    result = schedule(processes, 'round_robin', 1, max_slices=None)
+    assert time.perf_counter() - started < 1
+    assert result['completion_times'] == [10 ** 7]
+    assert len(result['trace']) == 3  # start, run, done
+
+
+def test_round_robin_lone_process_yields_at_the_next_quantum_boundary():
+    processes = [{'id': 'A', 'arrival_time': 0, 'burst_time': 20, 'priority': 1},
+                 {'id': 'B', 'arrival_time': 7, 'burst_time': 2, 'priority': 1}]
+    result = schedule(processes, 'round_robin', 3)
+    # B arrives during A's third quantum, which A finishes before B runs
+    assert [(s['process'], s['start_time'], s['end_time']) for s in result['gantt_chart']] == [
+        ('A', 0, 9), ('B', 9, 11), ('A', 11, 22)]
+    steps = describe_trace(result['trace'], processes, 'round_robin')
+    assert "Time 9: A quantum expired, moved to back of queue (Remaining: 11)" in steps
+
+
+def test_round_robin_slice_limit():
+    processes = [{'id': 'A', 'arrival_time': 0, 'burst_time': 10, 'priority': 1},
+                 {'id': 'B', 'arrival_time': 0, 'burst_time': 11, 'priority': 1}]
+    schedule(processes, 'round_robin', 1, max_slices=21)
+    with pytest.raises(ValueError, match="more than 20 time slices"):
+        schedule(processes, 'round_robin', 1, max_slices=20)
+    with pytest.raises(ValueError, match="more than 20 time slices"):
+        next(iter_schedule(processes, 'round_robin', 1, max_slices=20))
+    # Other policies slice each process a bounded number of times
+    schedule(processes, 'srtf', 1, max_slices=1)
+
+
+def test_invalid_policy_and_quantum():
+    processes = [{'id': 'A', 'arrival_time': 0, 'burst_time': 1, 'priority': 1}]
+    with pytest.raises(ValueError, match="Unknown scheduling policy"):
+        schedule(processes, 'lottery')
+    with pytest.raises(ValueError, match="at least 1"):
+        schedule(processes, 'round_robin', 0)
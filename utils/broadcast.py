@@ -0,0 +1,132 @@
+#broadcast.py
+import hashlib
+import threading
+import time
+from collections import deque
+
+
+class Subscriber:
+    """One viewer's bounded event buffer
+
+    The publisher never waits on a slow viewer: when the buffer is full
+    the backlog is dropped and the viewer is told to resync from a fresh
+    snapshot instead.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.buffer = deque()
+        self.overflowed = False
+        self.condition = threading.Condition()
+
+    def offer(self, event):
+        with self.condition:
+            if event is None or len(self.buffer) >= self.maxsize:
+                self.buffer.clear()
+                self.overflowed = True
+            else:
+                self.buffer.append(event)
+            self.condition.notify()
+
+    def drain(self, timeout=None):
+        """Wait for events and take all of them, an empty list means the wait timed out"""
+        with self.condition:
+            if not self.buffer and not self.overflowed:
+                self.condition.wait(timeout)
+            if self.overflowed:
+                self.overflowed = False
+                return [{'type': 'resync'}]
+            events = list(self.buffer)
+            self.buffer.clear()
+            return events
+
+
+class Broadcaster:
+    """Fans structure changes out to viewers watching a shared session
+
+    Viewers subscribe with a watch id derived from the session id, so
+    they can follow a structure without being able to change it. A share
+    nobody is watching is forgotten after share_ttl seconds, which leaves
+    time to open a new link or reconnect after a dropped stream.
+    """
+
+    def __init__(self, max_subscribers=1000, buffer_size=256, share_ttl=600):
+        self.max_subscribers = max_subscribers
+        self.buffer_size = buffer_size
+        self.share_ttl = share_ttl
+        self.shared = {}    # session_id -> watch_id
+        self.watched = {}   # watch_id -> session_id
+        self.idle = {}      # watch_id -> when its last viewer left (or it was shared), oldest first
+        self.channels = {}  # watch_id -> {name: set of subscribers}
+        self.streams = 0    # subscribers across every channel
+        self.lock = threading.Lock()
+
+    def _expire_idle(self):
+        deadline = time.monotonic() - self.share_ttl
+        while self.idle:
+            watch_id, since = next(iter(self.idle.items()))
+            if since > deadline:
+                break
+            del self.idle[watch_id]
+            del self.shared[self.watched.pop(watch_id)]
+
+    def _mark_idle(self, watch_id):
+        self.idle.pop(watch_id, None)
+        self.idle[watch_id] = time.monotonic()
+
+    def share(self, session_id):
+        """Get the watch id for a session, making it visible to viewers"""
+        with self.lock:
+            self._expire_idle()
+            watch_id = self.shared.get(session_id)
+            if watch_id is None:
+                watch_id = hashlib.sha256(f"watch:{session_id}".encode()).hexdigest()[:24]
+                self.shared[session_id] = watch_id
+                self.watched[watch_id] = session_id
+            if watch_id not in self.channels:
+                self._mark_idle(watch_id)
+            return watch_id
+
+    def session_for(self, watch_id):
+        return self.watched.get(watch_id)
+
+    def subscribe(self, watch_id, name):
+        with self.lock:
+            if watch_id not in self.watched:
+                raise Exception("Unknown shared structure")
+            # Each stream holds a server thread, so the cap covers the whole process
+            if self.streams >= self.max_subscribers:
+                raise Exception("Too many live viewers on this server, try again later")
+            subscriber = Subscriber(self.buffer_size)
+            self.channels.setdefault(watch_id, {}).setdefault(name, set()).add(subscriber)
+            self.streams += 1
+            self.idle.pop(watch_id, None)
+            return subscriber
+
+    def unsubscribe(self, watch_id, name, subscriber):
+        with self.lock:
+            names = self.channels.get(watch_id)
+            subscribers = names.get(name) if names is not None else None
+            if subscribers is not None and subscriber in subscribers:
+                subscribers.remove(subscriber)
+                self.streams -= 1
+                if not subscribers:
+                    del names[name]
+                    if not names:
+                        # Last viewer gone, the share itself expires unless one comes back
+                        del self.channels[watch_id]
+                        self._mark_idle(watch_id)
+            self._expire_idle()
+
+    def publish(self, session_id, name, version, changes):
+        """Send new changes to every viewer, changes=None asks them to resync"""
+        watch_id = self.shared.get(session_id)
+        if watch_id is None:
+            return 0
+        with self.lock:
+            subscribers = list(self.channels.get(watch_id, {}).get(name, ()))
+
+        event = None if changes is None else {'type': 'changes', 'version': version, 'changes': changes}
+        for subscriber in subscribers:
+            subscriber.offer(event)
+        return len(subscribers)
@@ -0,0 +1,60 @@
+#change_log.py
+from collections import deque
+
+# How many recent operations a structure remembers for delta sync
+CHANGE_LOG_SIZE = 256
+
+
+class ChangeLog:
+    """Monotonic version counter with a bounded log of recent operations"""
+
+    __slots__ = ('version', 'entries')
+
+    def __init__(self, size=CHANGE_LOG_SIZE):
+        self.version = 0
+        self.entries = deque(maxlen=size)
+
+    def record(self, op, **fields):
+        """Bump the version and remember the operation that caused it"""
+        self.version += 1
+        fields['version'] = self.version
+        fields['op'] = op
+        self.entries.append(fields)
+        return self.version
+
+    def restart(self):
+        """Bump the version and forget the log, so every client resyncs from a snapshot"""
+        self.version += 1
+        self.entries.clear()
+        return self.version
+
+    def since(self, version):
+        """Get the operations after a version, or None if they are no longer logged"""
+        if version == self.version:
+            return []
+        if version > self.version or not self.entries or version < self.entries[0]['version'] - 1:
+            return None
+
+        # Walk back from the newest entry, only the requested tail is copied
+        changes = []
+        for entry in reversed(self.entries):
+            if entry['version'] <= version:
+                break
+            changes.append(entry)
+        changes.reverse()
+        return changes
+
+    def to_state(self):
+        return {'version': self.version, 'entries': list(self.entries)}
+
+    def load_state(self, state):
+        self.version = state['version']
+        self.entries = deque(state['entries'], maxlen=self.entries.maxlen)
+
+
+def sync_payload(structure, since):
+    """Build the delta response for a client at a version, falling back to a snapshot"""
+    changes = structure.changes.since(int(since)) if since is not None else None
+    if changes is None:
+        return {'version': structure.changes.version, 'snapshot': structure.to_list()}
+    return {'version': structure.changes.version, 'changes': changes}
@@ -0,0 +1,422 @@
+#expression.py
+import math
+import operator
+from functools import lru_cache
+
+# Number of compiled expressions kept for reuse across requests
+EXPRESSION_CACHE_SIZE = 1024
+
+# Integer powers and products whose result could exceed this many bits are
+# computed as floats, so no single expression can build an unbounded int
+MAX_INT_BITS = 8192
+
+
+class ExpressionError(ValueError):
+    """Invalid expression, with the position of the offending character when known"""
+
+    def __init__(self, message, position=None):
+        if position is not None:
+            message = f"{message} at position {position}"
+        super().__init__(message)
+        self.position = position
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _power(base, exponent):
+    # Estimated from the operands, before anything is computed
+    if _is_int(base) and _is_int(exponent) and base.bit_length() * abs(exponent) > MAX_INT_BITS:
+        exponent = float(exponent)
+    try:
+        result = base ** exponent
+    except OverflowError:
+        raise ValueError("Number too large")
+    if isinstance(result, complex):
+        raise ValueError("Result is not a real number")
+    return result
+
+
+def _multiply(left, right):
+    if _is_int(left) and _is_int(right) and left.bit_length() + right.bit_length() > MAX_INT_BITS:
+        try:
+            return float(left) * float(right)
+        except OverflowError:
+            raise ValueError("Number too large")
+    return left * right
+
+
+# Binary operators: symbol -> (precedence, right associative, function)
+BINARY_OPERATORS = {
+    '+': (1, False, operator.add),
+    '-': (1, False, operator.sub),
+    '*': (2, False, _multiply),
+    '/': (2, False, operator.truediv),
+    '%': (2, False, operator.mod),
+    '^': (4, True, _power),
+}
+# Prefix operators bind tighter than * but looser than ^, so -2^2 is -(2^2)
+UNARY_OPERATORS = {'neg': (3, operator.neg), 'pos': (3, operator.pos)}
+UNARY_SYMBOLS = {'-': 'neg', '+': 'pos'}
+
+# Built-in functions: name -> (function, allowed argument counts, None for any)
+FUNCTIONS = {
+    'sqrt': (math.sqrt, (1,)),
+    'abs': (abs, (1,)),
+    'sin': (math.sin, (1,)),
+    'cos': (math.cos, (1,)),
+    'tan': (math.tan, (1,)),
+    'exp': (math.exp, (1,)),
+    'ln': (math.log, (1,)),
+    'log': (lambda x, base=10: math.log(x, base), (1, 2)),
+    'floor': (math.floor, (1,)),
+    'ceil': (math.ceil, (1,)),
+    'round': (round, (1, 2)),
+    'pow': (_power, (2,)),
+    'min': (min, None),
+    'max': (max, None),
+}
+CONSTANTS = {'pi': math.pi, 'e': math.e}
+
+# Token kinds
+NUMBER = 'number'
+NAME = 'name'
+OPERATOR = 'operator'
+LPAREN = '('
+RPAREN = ')'
+COMMA = ','
+
+# Opcodes of compiled programs
+PUSH = 0
+LOAD = 1
+UNARY = 2
+BINARY = 3
+CALL = 4
+
+
+def normalize(expression):
+    """Trim surrounding whitespace so trivially different requests share one cache entry"""
+    return expression.strip()
+
+
+def tokenize(expression):
+    """Split an infix expression into (kind, value, position) tokens in one pass"""
+    tokens = []
+    i = 0
+    length = len(expression)
+    while i < length:
+        char = expression[i]
+        if char.isspace():
+            i += 1
+        elif '0' <= char <= '9' or char == '.':
+            start = i
+            while i < length and ('0' <= expression[i] <= '9' or expression[i] == '.'):
+                i += 1
+            text = expression[start:i]
+            try:
+                value = float(text) if '.' in text else int(text)
+            except ValueError:
+                raise ExpressionError(f"Invalid number '{text}'", start)
+            tokens.append((NUMBER, value, start))
+        elif char.isalpha() or char == '_':
+            start = i
+            while i < length and (expression[i].isalnum() or expression[i] == '_'):
+                i += 1
+            tokens.append((NAME, expression[start:i], start))
+        elif char in BINARY_OPERATORS:
+            tokens.append((OPERATOR, char, i))
+            i += 1
+        elif char in '(),':
+            tokens.append((char, char, i))
+            i += 1
+        else:
+            raise ExpressionError(f"Unknown operator: {char}", i)
+    return tokens
+
+
+def to_postfix(tokens):
+    """Reorder infix tokens into postfix instructions with the shunting-yard algorithm
+
+    Returns (opcode, argument, position) instructions. Unary operators are
+    recognised by position, function calls record their argument count.
+    """
+    output = []
+    ops = []          # (kind, value, position), kind is OPERATOR, 'unary', LPAREN or 'call'
+    arg_counts = []   # argument counters of the open function calls
+    previous = None   # kind of the previous token, to tell unary from binary +/-
+
+    for index, (kind, value, position) in enumerate(tokens):
+        if kind == NUMBER:
+            output.append((PUSH, value, position))
+        elif kind == NAME:
+            if index + 1 < len(tokens) and tokens[index + 1][0] == LPAREN:
+                if value not in FUNCTIONS:
+                    raise ExpressionError(f"Unknown function '{value}'", position)
+                ops.append(('call', value, position))
+            else:
+                output.append((LOAD, value, position))
+        elif kind == OPERATOR:
+            if value in UNARY_SYMBOLS and previous in (None, OPERATOR, LPAREN, COMMA):
+                # Prefix operators have no left operand, so nothing is popped
+                ops.append(('unary', UNARY_SYMBOLS[value], position))
+            else:
+                if previous in (None, OPERATOR, LPAREN, COMMA):
+                    raise ExpressionError(f"Missing operand before '{value}'", position)
+                precedence, right_associative, _ = BINARY_OPERATORS[value]
+                while ops and ops[-1][0] in (OPERATOR, 'unary'):
+                    top_precedence = (BINARY_OPERATORS[ops[-1][1]][0] if ops[-1][0] == OPERATOR
+                                      else UNARY_OPERATORS[ops[-1][1]][0])
+                    if top_precedence > precedence or (top_precedence == precedence and not right_associative):
+                        output.append(_instruction(ops.pop(), arg_counts))
+                    else:
+                        break
+                ops.append((OPERATOR, value, position))
+        elif kind == LPAREN:
+            if ops and ops[-1][0] == 'call' and previous == NAME:
+                arg_counts.append(0 if index + 1 < len(tokens) and tokens[index + 1][0] == RPAREN else 1)
+            ops.append((LPAREN, value, position))
+        elif kind == COMMA:
+            if previous in (LPAREN, COMMA):
+                raise ExpressionError("Missing argument before ','", position)
+            while ops and ops[-1][0] != LPAREN:
+                output.append(_instruction(ops.pop(), arg_counts))
+            if len(ops) < 2 or ops[-2][0] != 'call':
+                raise ExpressionError("Unexpected ','", position)
+            arg_counts[-1] += 1
+        else:  # RPAREN
+            if previous == COMMA:
+                raise ExpressionError("Missing argument before ')'", position)
+            while ops and ops[-1][0] != LPAREN:
+                output.append(_instruction(ops.pop(), arg_counts))
+            if not ops:
+                raise ExpressionError("Unmatched ')'", position)
+            ops.pop()  # Remove '(' from stack
+            if ops and ops[-1][0] == 'call':
+                output.append(_instruction(ops.pop(), arg_counts))
+        previous = kind
+
+    while ops:
+        if ops[-1][0] == LPAREN:
+            raise ExpressionError("Unmatched '('", ops[-1][2])
+        output.append(_instruction(ops.pop(), arg_counts))
+    return output
+
+
+def _instruction(op, arg_counts):
+    kind, value, position = op
+    if kind == OPERATOR:
+        return (BINARY, value, position)
+    if kind == 'unary':
+        return (UNARY, value, position)
+    return (CALL, (value, arg_counts.pop()), position)
+
+
+def _validate(code, expression_length):
+    """Check operand counts statically so evaluation never underflows"""
+    depth = 0
+    for opcode, argument, position in code:
+        if opcode in (PUSH, LOAD):
+            depth += 1
+        elif opcode == UNARY:
+            if depth < 1:
+                raise ExpressionError("Missing operand", position)
+        elif opcode == BINARY:
+            if depth < 2:
+                raise ExpressionError(f"Missing operand for '{argument}'", position)
+            depth -= 1
+        else:
+            name, count = argument
+            allowed = FUNCTIONS[name][1]
+            if (allowed is None and count < 1) or (allowed is not None and count not in allowed):
+                raise ExpressionError(f"Wrong number of arguments for {name}()", position)
+            if depth < count:
+                raise ExpressionError(f"Missing argument for {name}()", position)
+            depth -= count - 1
+    if depth < 1:
+        raise ExpressionError("Empty expression", expression_length)
+    if depth > 1:
+        raise ExpressionError("Missing operator", expression_length)
+
+
+class Program:
+    """A compiled expression: its postfix form and the bytecode that evaluates it"""
+
+    __slots__ = ('postfix', 'code', 'names')
+
+    def __init__(self, code):
+        self.code = code
+        self.postfix = ' '.join(self._describe(opcode, argument) for opcode, argument, _ in code)
+        self.names = sorted({argument for opcode, argument, _ in code if opcode == LOAD})
+
+    @staticmethod
+    def _describe(opcode, argument):
+        if opcode == CALL:
+            return argument[0]
+        return str(argument)
+
+    def _lookup(self, name, variables, position):
+        if variables and name in variables:
+            value = variables[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ExpressionError(f"Variable '{name}' must be a number", position)
+            return value
+        if name in CONSTANTS:
+            return CONSTANTS[name]
+        raise ExpressionError(f"Unbound variable '{name}'", position)
+
+    def run(self, record_trace=False, variables=None):
+        """Evaluate the program, optionally recording a compact trace
+
+        Each trace event is the instruction with the value it pushed:
+        [PUSH, value], [LOAD, name, value], [UNARY, op, result],
+        [BINARY, op, result] or [CALL, name, argument count, result]. The
+        operands an instruction pops are implied by its opcode, so a
+        client can replay the stack without per-step copies.
+        """
+        stack = []
+        trace = [] if record_trace else None
+
+        for opcode, argument, position in self.code:
+            try:
+                if opcode == PUSH:
+                    stack.append(argument)
+                elif opcode == LOAD:
+                    stack.append(self._lookup(argument, variables, position))
+                elif opcode == UNARY:
+                    stack.append(UNARY_OPERATORS[argument][1](stack.pop()))
+                elif opcode == BINARY:
+                    operand2 = stack.pop()
+                    stack.append(BINARY_OPERATORS[argument][2](stack.pop(), operand2))
+                else:
+                    name, count = argument
+                    arguments = stack[len(stack) - count:]
+                    del stack[len(stack) - count:]
+                    stack.append(FUNCTIONS[name][0](*arguments))
+            except ExpressionError:
+                raise
+            except (ArithmeticError, ValueError, TypeError) as e:
+                # TypeError comes from built-ins given unsuitable arguments, e.g. round(2.5, 1.5)
+                raise ExpressionError(str(e), position)
+
+            if record_trace:
+                if opcode == PUSH:
+                    trace.append([PUSH, argument])
+                elif opcode == CALL:
+                    trace.append([CALL, argument[0], argument[1], stack[-1]])
+                else:
+                    trace.append([opcode, argument, stack[-1]])
+
+        return stack.pop(), trace
+
+    def run_many(self, bindings):
+        """Evaluate the program for every set of variable bindings in one call
+
+        Instructions are applied column-wise across all bindings, so the
+        interpreter loop runs once per instruction rather than once per
+        instruction per row. If any row fails, rows are evaluated one by
+        one to report the failures individually. Returns (results, errors).
+        """
+        rows = len(bindings)
+        try:
+            columns = []
+            for opcode, argument, position in self.code:
+                if opcode == PUSH:
+                    columns.append([argument] * rows)
+                elif opcode == LOAD:
+                    columns.append([self._lookup(argument, row, position) for row in bindings])
+                elif opcode == UNARY:
+                    columns.append(list(map(UNARY_OPERATORS[argument][1], columns.pop())))
+                elif opcode == BINARY:
+                    right = columns.pop()
+                    left = columns.pop()
+                    columns.append(list(map(BINARY_OPERATORS[argument][2], left, right)))
+                else:
+                    name, count = argument
+                    arguments = columns[len(columns) - count:]
+                    del columns[len(columns) - count:]
+                    columns.append(list(map(FUNCTIONS[name][0], *arguments)))
+            return columns.pop(), []
+        except (ArithmeticError, ValueError, TypeError):
+            pass
+
+        results = []
+        errors = []
+        for index, row in enumerate(bindings):
+            try:
+                results.append(self.run(variables=row)[0])
+            except ExpressionError as e:
+                results.append(None)
+                errors.append({'index': index, 'message': str(e), 'position': e.position})
+        return results, errors
+
+
+def describe_trace(trace, offset=0, limit=None):
+    """Replay a trace into {'action', 'stack'} steps for a window of it
+
+    The stack is replayed from the start, but sentences and stack copies
+    are only made for the events inside the window.
+    """
+    end = len(trace) if limit is None else offset + limit
+    stack = []
+    steps = []
+    for index, event in enumerate(trace[:end]):
+        opcode = event[0]
+        if opcode == PUSH:
+            popped = []
+            action = f"Push operand {event[1]}"
+        elif opcode == LOAD:
+            popped = []
+            action = f"Push variable {event[1]} = {event[2]}"
+        elif opcode == UNARY:
+            popped = stack[-1:]
+            action = f"Apply unary {'-' if event[1] == 'neg' else '+'} on {popped[0]} = {event[2]}"
+        elif opcode == BINARY:
+            popped = stack[-2:]
+            action = f"Apply {event[1]} on last two operands: {popped[0]} {event[1]} {popped[1]} = {event[2]}"
+        else:
+            popped = stack[len(stack) - event[2]:]
+            action = f"Call {event[1]}({', '.join(str(a) for a in popped)}) = {event[3]}"
+
+        del stack[len(stack) - len(popped):]
+        stack.append(event[-1])
+        if index >= offset:
+            steps.append({'action': action, 'stack': stack.copy()})
+    return steps
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def _compile(normalized):
+    code = to_postfix(tokenize(normalized))
+    _validate(code, len(normalized))
+    return Program(code)
+
+
+def compile_expression(expression):
+    """Compile an infix expression, reusing the cached program when seen before"""
+    if not isinstance(expression, str):
+        raise ExpressionError("Expression must be a string")
+    return _compile(normalize(expression))
+
+
+def infix_to_postfix(expression):
+    """Convert infix expression to postfix notation"""
+    return compile_expression(expression).postfix
+
+
+def evaluate_postfix(expression):
+    """Evaluate a space separated postfix expression and return the result and steps"""
+    code = []
+    for token in expression.split():
+        if token in BINARY_OPERATORS:
+            code.append((BINARY, token, None))
+        elif token in UNARY_OPERATORS:
+            code.append((UNARY, token, None))
+        else:
+            try:
+                code.append((PUSH, float(token) if '.' in token else int(token), None))
+            except ValueError:
+                raise ExpressionError(f"Unknown operator: {token}")
+    _validate(code, None)
+    result, trace = Program(code).run(record_trace=True)
+    return result, describe_trace(trace)
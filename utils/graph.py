@@ -0,0 +1,345 @@
+#graph.py
+import heapq
+from array import array
+from collections import deque
+
+INFINITY = float('inf')
+ALGORITHMS = ('bfs', 'dfs', 'dijkstra', 'topological_sort', 'connected_components')
+
+# Compact trace opcodes, every event is [opcode, operands...] of node ids
+VISIT = 0      # [VISIT, node]
+DISCOVER = 1   # [DISCOVER, from, to]
+RELAX = 2      # [RELAX, from, to, new distance]
+ASSIGN = 3     # [ASSIGN, node, component]
+
+
+class GraphBuilder:
+    """Mutable graph that collects nodes and edges before freezing them into CSR form
+
+    Node labels are mapped to dense ids once; edges are kept in typed
+    arrays of ids and weights, so there is no per-edge Python object.
+    """
+
+    def __init__(self, directed=False, max_nodes=None):
+        self.directed = directed
+        self.max_nodes = max_nodes
+        self.labels = []
+        self.ids = {}
+        self.sources = array('l')
+        self.targets = array('l')
+        self.weights = array('d')
+
+    def add_node(self, label):
+        """Get the id of a node, adding it if it is new"""
+        node = self.ids.get(label)
+        if node is None:
+            node = len(self.labels)
+            if self.max_nodes is not None and node >= self.max_nodes:
+                raise Exception(f"A graph can have at most {self.max_nodes} nodes")
+            self.ids[label] = node
+            self.labels.append(label)
+        return node
+
+    def add_edge(self, source, target, weight=1):
+        self.sources.append(self.add_node(source))
+        self.targets.append(self.add_node(target))
+        self.weights.append(weight)
+
+    def add_edges(self, edges):
+        """Add (source, target) or (source, target, weight) edges"""
+        for number, edge in enumerate(edges, start=1):
+            try:
+                self.add_edge(*edge)
+            except (TypeError, ValueError):
+                raise Exception(f"Edge {number} must be [source, target] or [source, target, weight]")
+
+    def add_edge_columns(self, sources, targets, weights=None):
+        """Add edges given as parallel source, target and optional weight lists"""
+        if len(sources) != len(targets) or (weights is not None and len(weights) != len(sources)):
+            raise Exception("sources, targets and weights must have the same length")
+        try:
+            weights = array('d', weights) if weights is not None else array('d', [1.0]) * len(sources)
+        except TypeError:
+            raise Exception("Edge weights must be numbers")
+        add_node = self.add_node
+        self.sources.extend(add_node(source) for source in sources)
+        self.targets.extend(add_node(target) for target in targets)
+        self.weights.extend(weights)
+
+    def edge_count(self):
+        return len(self.sources)
+
+    def build(self):
+        """Freeze into a CSRGraph, undirected edges are stored in both directions"""
+        n = len(self.labels)
+        pairs = [(self.sources, self.targets)]
+        if not self.directed:
+            pairs.append((self.targets, self.sources))
+
+        # Count out-degrees, then prefix sums give each node's slice of the edge arrays
+        offsets = array('l', [0]) * (n + 1)
+        for sources, _ in pairs:
+            for source in sources:
+                offsets[source + 1] += 1
+        for node in range(n):
+            offsets[node + 1] += offsets[node]
+
+        size = offsets[n]
+        targets = array('l', [0]) * size
+        weights = array('d', [0.0]) * size
+        cursor = array('l', offsets)
+        for sources, destinations in pairs:
+            for source, target, weight in zip(sources, destinations, self.weights):
+                position = cursor[source]
+                targets[position] = target
+                weights[position] = weight
+                cursor[source] = position + 1
+
+        return CSRGraph(self.labels, self.ids, offsets, targets, weights, self.directed, len(self.sources))
+
+
+class CSRGraph:
+    """Immutable graph in compressed sparse row form
+
+    The neighbours of node u are targets[offsets[u]:offsets[u + 1]], with
+    the matching edge weights at the same positions in weights.
+    """
+
+    def __init__(self, labels, ids, offsets, targets, weights, directed, edge_count):
+        self.labels = labels
+        self.ids = ids
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+        self.edge_count = edge_count
+
+    def node_count(self):
+        return len(self.labels)
+
+    def node_id(self, label):
+        node = self.ids.get(label)
+        if node is None:
+            raise Exception(f"Unknown node: {label}")
+        return node
+
+    def neighbors(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+
+def bfs(graph, source, trace=None):
+    """Breadth-first search, returns the visit order and hop distances (-1 if unreached)"""
+    offsets, targets = graph.offsets, graph.targets
+    distances = array('l', [-1]) * graph.node_count()
+    distances[source] = 0
+    order = []
+    pending = deque([source])
+
+    while pending:
+        node = pending.popleft()
+        order.append(node)
+        if trace is not None:
+            trace.append([VISIT, node])
+        for position in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[position]
+            if distances[neighbor] < 0:
+                distances[neighbor] = distances[node] + 1
+                pending.append(neighbor)
+                if trace is not None:
+                    trace.append([DISCOVER, node, neighbor])
+    return order, distances
+
+
+def dfs(graph, source, trace=None):
+    """Depth-first search with an explicit stack, visiting in recursive DFS order"""
+    offsets, targets = graph.offsets, graph.targets
+    visited = bytearray(graph.node_count())
+    cursor = array('l', offsets)  # next edge to try for each node
+    visited[source] = 1
+    order = [source]
+    stack = [source]
+    if trace is not None:
+        trace.append([VISIT, source])
+
+    while stack:
+        node = stack[-1]
+        if cursor[node] == offsets[node + 1]:
+            stack.pop()
+            continue
+        neighbor = targets[cursor[node]]
+        cursor[node] += 1
+        if not visited[neighbor]:
+            visited[neighbor] = 1
+            order.append(neighbor)
+            stack.append(neighbor)
+            if trace is not None:
+                trace.append([DISCOVER, node, neighbor])
+                trace.append([VISIT, neighbor])
+    return order
+
+
+def dijkstra(graph, source, target=None, trace=None):
+    """Heap-based Dijkstra, returns distances (inf if unreached), predecessors and settled flags
+
+    Stops early once the target is settled, so only settled nodes are
+    sure to hold their shortest distance. Stale heap entries are skipped
+    instead of decreasing keys in place.
+    """
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    n = graph.node_count()
+    distances = array('d', [INFINITY]) * n
+    previous = array('l', [-1]) * n
+    settled = bytearray(n)
+    distances[source] = 0.0
+    heap = [(0.0, source)]
+
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        if trace is not None:
+            trace.append([VISIT, node])
+        if node == target:
+            break
+        for position in range(offsets[node], offsets[node + 1]):
+            weight = weights[position]
+            if weight < 0:
+                raise Exception("Dijkstra's algorithm needs non-negative edge weights")
+            neighbor = targets[position]
+            candidate = distance + weight
+            if candidate < distances[neighbor]:
+                distances[neighbor] = candidate
+                previous[neighbor] = node
+                heapq.heappush(heap, (candidate, neighbor))
+                if trace is not None:
+                    trace.append([RELAX, node, neighbor, candidate])
+    return distances, previous, settled
+
+
+def topological_sort(graph, trace=None):
+    """Kahn's algorithm over in-degrees, raises if the graph has a cycle"""
+    if not graph.directed:
+        raise Exception("Topological sort needs a directed graph")
+    offsets, targets = graph.offsets, graph.targets
+    n = graph.node_count()
+    in_degree = array('l', [0]) * n
+    for target in targets:
+        in_degree[target] += 1
+
+    ready = deque(node for node in range(n) if in_degree[node] == 0)
+    order = []
+    while ready:
+        node = ready.popleft()
+        order.append(node)
+        if trace is not None:
+            trace.append([VISIT, node])
+        for position in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[position]
+            in_degree[neighbor] -= 1
+            if in_degree[neighbor] == 0:
+                ready.append(neighbor)
+                if trace is not None:
+                    trace.append([DISCOVER, node, neighbor])
+
+    if len(order) < n:
+        raise Exception("Graph has a cycle")
+    return order
+
+
+def connected_components(graph, trace=None):
+    """Label every node with its component, weakly connected for directed graphs
+
+    Union-find over the edge arrays, so directed graphs need no reverse
+    adjacency. Components are numbered in order of their smallest node id.
+    """
+    offsets, targets = graph.offsets, graph.targets
+    n = graph.node_count()
+    parent = array('l', range(n))
+
+    def find(node):
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:  # path compression
+            parent[node], node = root, parent[node]
+        return root
+
+    for node in range(n):
+        for position in range(offsets[node], offsets[node + 1]):
+            a = find(node)
+            b = find(targets[position])
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+    components = array('l', [-1]) * n
+    count = 0
+    for node in range(n):
+        root = find(node)
+        if components[root] < 0:
+            components[root] = count
+            count += 1
+        components[node] = components[root]
+        if trace is not None:
+            trace.append([ASSIGN, node, components[node]])
+    return components, count
+
+
+def describe_event(graph, event):
+    """Render one compact trace event as a sentence"""
+    labels = graph.labels
+    opcode = event[0]
+    if opcode == VISIT:
+        return f"Visit {labels[event[1]]}"
+    if opcode == DISCOVER:
+        return f"Discover {labels[event[2]]} from {labels[event[1]]}"
+    if opcode == RELAX:
+        return f"Relax edge {labels[event[1]]} → {labels[event[2]]}, distance is now {event[3]:g}"
+    return f"{labels[event[1]]} is in component {event[2]}"
+
+
+def run_algorithm(graph, algorithm, source=None, target=None, trace=None):
+    """Run an algorithm by name and return its results keyed by node label"""
+    labels = graph.labels
+
+    if algorithm in ('bfs', 'dfs', 'dijkstra'):
+        if source is None:
+            raise Exception("A source node is required")
+        source_id = graph.node_id(source)
+
+    if algorithm == 'bfs':
+        order, distances = bfs(graph, source_id, trace)
+        return {
+            'order': [labels[node] for node in order],
+            'distances': {labels[node]: distances[node] for node in order}
+        }
+    elif algorithm == 'dfs':
+        return {'order': [labels[node] for node in dfs(graph, source_id, trace)]}
+    elif algorithm == 'dijkstra':
+        target_id = None if target is None else graph.node_id(target)
+        distances, previous, settled = dijkstra(graph, source_id, target_id, trace)
+        # After an early stop the unsettled distances are only upper bounds
+        result = {'distances': {labels[node]: distance for node, distance in enumerate(distances)
+                                if settled[node]}}
+        if target_id is not None:
+            path = []
+            if distances[target_id] != INFINITY:
+                node = target_id
+                while node != -1:
+                    path.append(labels[node])
+                    node = previous[node]
+                path.reverse()
+            result['path'] = path
+            result['distance'] = None if distances[target_id] == INFINITY else distances[target_id]
+        return result
+    elif algorithm == 'topological_sort':
+        return {'order': [labels[node] for node in topological_sort(graph, trace)]}
+    elif algorithm == 'connected_components':
+        components, count = connected_components(graph, trace)
+        members = [[] for _ in range(count)]
+        for node, component in enumerate(components):
+            members[component].append(labels[node])
+        return {'count': count, 'components': members}
+    else:
+        raise Exception("Invalid algorithm")
+
@@ -0,0 +1,345 @@
+#history.py
+
+# Persistent (immutable, structure-sharing) containers behind the undo history.
+# Every operation makes a new version that shares all but O(1) nodes with the
+# previous one (O(log n) for the priority treap), so keeping every version
+# costs about as much as keeping the operations themselves.
+# Cons cells are (value, rest) tuples, with None for the empty list.
+
+# Steps a structure keeps by default, 0 turns history off
+HISTORY_LIMIT = 1000
+
+
+def _cons_list(values):
+    """Build a cons list whose head is values[0]"""
+    node = None
+    for value in reversed(values):
+        node = (value, node)
+    return node
+
+
+def _iter_cons(node):
+    while node is not None:
+        yield node[0]
+        node = node[1]
+
+
+class PersistentStack:
+    __slots__ = ('top', 'size')
+
+    def __init__(self, top=None, size=0):
+        self.top = top
+        self.size = size
+
+    @classmethod
+    def from_list(cls, values):
+        """Build from values listed bottom to top"""
+        return cls(_cons_list(list(reversed(values))), len(values))
+
+    def push(self, value):
+        return PersistentStack((value, self.top), self.size + 1)
+
+    def pop(self):
+        return PersistentStack(self.top[1], self.size - 1)
+
+    def to_list(self):
+        values = list(_iter_cons(self.top))
+        values.reverse()
+        return values
+
+
+class PersistentDeque:
+    """Two cons lists, the front (first value at the head) and the rear (last value at the head)
+
+    Popping from an empty side moves half of the other side across, so
+    both ends stay amortized O(1).
+    """
+
+    __slots__ = ('front', 'front_size', 'rear', 'rear_size')
+
+    def __init__(self, front=None, front_size=0, rear=None, rear_size=0):
+        self.front = front
+        self.front_size = front_size
+        self.rear = rear
+        self.rear_size = rear_size
+
+    @classmethod
+    def from_list(cls, values):
+        """Build from values listed front to rear"""
+        return cls(_cons_list(values), len(values))
+
+    @property
+    def size(self):
+        return self.front_size + self.rear_size
+
+    def push_back(self, value):
+        return PersistentDeque(self.front, self.front_size, (value, self.rear), self.rear_size + 1)
+
+    def push_front(self, value):
+        return PersistentDeque((value, self.front), self.front_size + 1, self.rear, self.rear_size)
+
+    def _rebalanced(self):
+        values = self.to_list()
+        middle = len(values) // 2
+        return PersistentDeque(_cons_list(values[:middle]), middle,
+                               _cons_list(values[middle:][::-1]), len(values) - middle)
+
+    def pop_front(self):
+        deque = self if self.front is not None else self._rebalanced()
+        if deque.front is None:  # a single value, left on the rear side
+            return PersistentDeque()
+        return PersistentDeque(deque.front[1], deque.front_size - 1, deque.rear, deque.rear_size)
+
+    def pop_back(self):
+        deque = self if self.rear is not None else self._rebalanced()
+        return PersistentDeque(deque.front, deque.front_size, deque.rear[1], deque.rear_size - 1)
+
+    def to_list(self):
+        rear = list(_iter_cons(self.rear))
+        rear.reverse()
+        return list(_iter_cons(self.front)) + rear
+
+
+def _weight(key):
+    # Deterministic heap weights, so replaying operations rebuilds identical treaps
+    return hash(key[1]) * 2654435761 & 0xFFFFFFFF
+
+
+class PersistentTreap:
+    """Priority queue as a treap ordered by (priority, id), changed by path copying
+
+    Nodes are (key, weight, value, left, right) tuples, with keys unique
+    because ids are.
+    """
+
+    __slots__ = ('root', 'size')
+
+    def __init__(self, root=None, size=0):
+        self.root = root
+        self.size = size
+
+    @classmethod
+    def from_items(cls, items):
+        """Build from (value, priority, id) items"""
+        treap = cls()
+        for value, priority, element_id in items:
+            treap = treap.insert(value, priority, element_id)
+        return treap
+
+    @staticmethod
+    def _split(node, key):
+        """Split into the nodes with keys below key and the rest"""
+        if node is None:
+            return None, None
+        node_key, weight, value, left, right = node
+        if node_key < key:
+            low, high = PersistentTreap._split(right, key)
+            return (node_key, weight, value, left, low), high
+        low, high = PersistentTreap._split(left, key)
+        return low, (node_key, weight, value, high, right)
+
+    @staticmethod
+    def _merge(low, high):
+        if low is None:
+            return high
+        if high is None:
+            return low
+        if low[1] >= high[1]:
+            return (low[0], low[1], low[2], low[3], PersistentTreap._merge(low[4], high))
+        return (high[0], high[1], high[2], PersistentTreap._merge(low, high[3]), high[4])
+
+    def insert(self, value, priority, element_id):
+        key = (priority, element_id)
+        low, high = self._split(self.root, key)
+        node = (key, _weight(key), value, None, None)
+        return PersistentTreap(self._merge(self._merge(low, node), high), self.size + 1)
+
+    @staticmethod
+    def _remove(node, key):
+        """Get the subtree without key and the removed value"""
+        node_key, weight, value, left, right = node
+        if key == node_key:
+            return PersistentTreap._merge(left, right), value
+        if key < node_key:
+            left, removed = PersistentTreap._remove(left, key)
+            return (node_key, weight, value, left, right), removed
+        right, removed = PersistentTreap._remove(right, key)
+        return (node_key, weight, value, left, right), removed
+
+    def remove(self, priority, element_id):
+        """Get the treap without an element, and the element's value"""
+        root, value = self._remove(self.root, (priority, element_id))
+        return PersistentTreap(root, self.size - 1), value
+
+    @staticmethod
+    def _pop_min(node):
+        # Only the left spine is copied
+        if node[3] is None:
+            return node[4]
+        return (node[0], node[1], node[2], PersistentTreap._pop_min(node[3]), node[4])
+
+    def pop_min(self):
+        return PersistentTreap(self._pop_min(self.root), self.size - 1)
+
+    def items(self):
+        """Get (value, priority, id) items in dequeue order"""
+        items = []
+        pending = []
+        node = self.root
+        while pending or node is not None:
+            while node is not None:
+                pending.append(node)
+                node = node[3]
+            node = pending.pop()
+            items.append((node[2], node[0][0], node[0][1]))
+            node = node[4]
+        return items
+
+
+class History:
+    """Every version of a structure's contents, with a cursor for undo, redo and jumps
+
+    Steps are numbered from the structure's creation; once more than
+    limit steps are kept the oldest are dropped. apply(data, op) makes
+    the next version's data from the previous one.
+
+    A history loaded from a state stays as that state's operations until
+    a version is needed (an undo, redo or jump, or trimming old steps), so
+    requests that only record new steps never replay the old ones.
+    """
+
+    __slots__ = ('apply', 'limit', 'versions', 'ops', 'cursor', 'first_step', 'pending')
+
+    def __init__(self, apply, data, config, limit=HISTORY_LIMIT):
+        self.apply = apply
+        self.limit = limit
+        self.versions = [(data, config)]
+        self.ops = [None]
+        self.cursor = 0
+        self.first_step = 0
+        # (from_list, base values, base config, configs) of a loaded history not yet replayed
+        self.pending = None
+
+    @property
+    def step(self):
+        return self.first_step + self.cursor
+
+    @property
+    def last_step(self):
+        return self.first_step + len(self.ops) - 1
+
+    def _replay(self):
+        """Rebuild every version of a loaded history"""
+        from_list, base, config, configs = self.pending
+        data = from_list(base)
+        self.versions = [(data, config)]
+        for op, config in zip(self.ops[1:], configs):
+            data = self.apply(data, op)
+            self.versions.append((data, config))
+        self.pending = None
+
+    def current(self):
+        if self.pending is not None:
+            self._replay()
+        return self.versions[self.cursor]
+
+    def record(self, op, config):
+        """Add the version made by op, dropping any steps that were undone"""
+        if not self.limit:
+            return
+        if self.pending is not None:
+            if self.cursor + 1 - self.limit <= self.limit // 4:
+                # No trimming due, just log the step
+                configs = self.pending[3]
+                del self.ops[self.cursor + 1:]
+                del configs[self.cursor:]
+                self.ops.append(op)
+                configs.append(config)
+                self.cursor += 1
+                return
+            self._replay()
+        previous_data, previous_config = self.versions[self.cursor]
+        data = self.apply(previous_data, op)
+        if config == previous_config:
+            config = previous_config  # share one tuple while the configuration is unchanged
+        if self.cursor + 1 < len(self.versions):
+            del self.versions[self.cursor + 1:]
+            del self.ops[self.cursor + 1:]
+        self.versions.append((data, config))
+        self.ops.append(op)
+        self.cursor += 1
+        # Trim in chunks so dropping old steps stays amortized O(1)
+        excess = len(self.versions) - 1 - self.limit
+        if excess > self.limit // 4:
+            del self.versions[:excess]
+            del self.ops[:excess]
+            self.ops[0] = None
+            self.cursor -= excess
+            self.first_step += excess
+
+    def jump(self, step):
+        """Move the cursor to a step and return that version"""
+        try:
+            step = int(step)
+        except (TypeError, ValueError):
+            raise Exception("Step must be an integer")
+        if not self.first_step <= step <= self.last_step:
+            raise Exception(f"Step must be between {self.first_step} and {self.last_step}")
+        self.cursor = step - self.first_step
+        return self.current()
+
+    def undo(self):
+        if self.step == self.first_step:
+            raise Exception("Nothing to undo")
+        return self.jump(self.step - 1)
+
+    def redo(self):
+        if self.step == self.last_step:
+            raise Exception("Nothing to redo")
+        return self.jump(self.step + 1)
+
+    def position(self):
+        return {'step': self.step, 'first_step': self.first_step, 'last_step': self.last_step}
+
+    def describe(self, offset=0, limit=None):
+        """Get the position and the operations of the steps from offset (at most limit of them)"""
+        start = max(offset - self.first_step, 1)
+        end = len(self.ops) if limit is None else min(len(self.ops), start + limit)
+        position = self.position()
+        position['operations'] = [{'step': self.first_step + index, 'op': self.ops[index]}
+                                  for index in range(start, end)]
+        return position
+
+    def to_state(self, to_list):
+        """Get the first kept version (through to_list) and the operations after it"""
+        if self.pending is not None:
+            _, base, config, configs = self.pending
+            return {
+                'limit': self.limit,
+                'first_step': self.first_step,
+                'cursor': self.cursor,
+                'base': base,
+                'config': list(config),
+                'ops': self.ops[1:],
+                'configs': [list(config) for config in configs]
+            }
+        data, config = self.versions[0]
+        return {
+            'limit': self.limit,
+            'first_step': self.first_step,
+            'cursor': self.cursor,
+            'base': to_list(data),
+            'config': list(config),
+            'ops': self.ops[1:],
+            'configs': [list(config) for _, config in self.versions[1:]]
+        }
+
+    def load_state(self, state, from_list):
+        """Load the logged operations, the versions are replayed when first needed"""
+        self.limit = state['limit']
+        self.versions = None
+        self.ops = [None] + state['ops']
+        self.pending = (from_list, state['base'], tuple(state['config']),
+                        [tuple(config) for config in state['configs']])
+        self.cursor = state['cursor']
+        self.first_step = state['first_step']
@@ -0,0 +1,377 @@
+#linked_list.py
+import threading
+from array import array
+
+from utils.change_log import ChangeLog
+from utils.locking import synchronized
+from utils.typed_buffer import check_capacity
+
+NIL = -1
+LIST_TYPES = ('singly', 'doubly', 'circular')
+
+
+class LinkedList:
+    """Singly, doubly or circular linked list on an array-backed node pool
+
+    A node is a slot in parallel arrays (values, next links and, for doubly
+    and circular lists, prev links) rather than an object. Removed slots
+    are chained into a free list through their next links and reused by
+    later inserts. A circular list is doubly linked, with the tail linking
+    back to the head. Links are kept in typed arrays of slot numbers, and
+    capacity=None leaves the pool unbounded.
+    """
+
+    __slots__ = ('capacity', 'list_type', 'values', 'next_links', 'prev_links',
+                 'free', 'head', 'tail', 'length', 'changes', 'lock')
+
+    def __init__(self, capacity=10, list_type='singly'):
+        if list_type not in LIST_TYPES:
+            raise Exception("Invalid list type")
+        self.lock = threading.RLock()
+        self.capacity = check_capacity(capacity)
+        self.list_type = list_type
+        self.values = []
+        self.next_links = array('l')
+        self.prev_links = None if list_type == 'singly' else array('l')
+        self.free = NIL
+        self.head = NIL
+        self.tail = NIL
+        self.length = 0
+        self.changes = ChangeLog()
+
+    def _allocate(self, value):
+        """Take a slot from the free list, growing the pool only when it is empty"""
+        if self.free != NIL:
+            node = self.free
+            self.free = self.next_links[node]
+            self.values[node] = value
+        else:
+            node = len(self.values)
+            self.values.append(value)
+            self.next_links.append(NIL)
+            if self.prev_links is not None:
+                self.prev_links.append(NIL)
+        return node
+
+    def _release(self, node):
+        self.values[node] = None
+        self.next_links[node] = self.free
+        if self.prev_links is not None:
+            self.prev_links[node] = NIL
+        self.free = node
+
+    def _close_ring(self):
+        if self.list_type == 'circular' and self.length:
+            self.next_links[self.tail] = self.head
+            self.prev_links[self.head] = self.tail
+
+    def _nodes(self):
+        """Yield the node slots in list order, counted so circular lists stop after one lap"""
+        node = self.head
+        for _ in range(self.length):
+            yield node
+            node = self.next_links[node]
+
+    def _successor(self, node):
+        return NIL if node == self.tail else self.next_links[node]
+
+    def _node_at(self, index):
+        # Doubly linked lists walk from whichever end is closer
+        if self.prev_links is not None and index > self.length // 2:
+            node = self.tail
+            for _ in range(self.length - 1 - index):
+                node = self.prev_links[node]
+            return node
+        node = self.head
+        for _ in range(index):
+            node = self.next_links[node]
+        return node
+
+    def _check_index(self, index, upper):
+        try:
+            index = int(index)
+        except (TypeError, ValueError):
+            raise Exception("Index must be an integer")
+        if index < 0 or index > upper:
+            raise Exception("Index out of range")
+        return index
+
+    def _link_after(self, previous, value):
+        """Insert a value after a node, or at the head when previous is NIL"""
+        if self.is_full():
+            raise Exception("Linked list overflow")
+        node = self._allocate(value)
+        following = self.head if previous == NIL else self._successor(previous)
+        self.next_links[node] = following
+        if previous == NIL:
+            self.head = node
+        else:
+            self.next_links[previous] = node
+        if self.prev_links is not None:
+            self.prev_links[node] = previous
+            if following != NIL:
+                self.prev_links[following] = node
+        if previous == self.tail:
+            self.tail = node
+        self.length += 1
+        self._close_ring()
+
+    def _unlink(self, previous, node):
+        """Remove a node given its predecessor (NIL for the head) and return its value"""
+        following = self._successor(node)
+        if previous == NIL:
+            self.head = following
+        else:
+            self.next_links[previous] = following
+        if node == self.tail:
+            self.tail = previous
+        if self.prev_links is not None and following != NIL:
+            self.prev_links[following] = previous
+        self.length -= 1
+        if self.length == 0:
+            self.head = self.tail = NIL
+        elif self.prev_links is not None:
+            self.prev_links[self.head] = NIL
+            self.next_links[self.tail] = NIL
+        self._close_ring()
+        value = self.values[node]
+        self._release(node)
+        return value
+
+    def _predecessor(self, node, index):
+        if node == self.head:
+            return NIL
+        if self.prev_links is not None:
+            return self.prev_links[node]
+        return self._node_at(index - 1)
+
+    @synchronized
+    def insert_head(self, value):
+        self._link_after(NIL, value)
+        self.changes.record('insert', index=0, value=value)
+        return True
+
+    @synchronized
+    def insert_tail(self, value):
+        self._link_after(self.tail, value)
+        self.changes.record('insert', index=self.length - 1, value=value)
+        return True
+
+    @synchronized
+    def insert_at(self, index, value):
+        index = self._check_index(index, self.length)
+        self._link_after(NIL if index == 0 else self._node_at(index - 1), value)
+        self.changes.record('insert', index=index, value=value)
+        return True
+
+    @synchronized
+    def remove_head(self):
+        if self.is_empty():
+            raise Exception("Linked list underflow")
+        value = self._unlink(NIL, self.head)
+        self.changes.record('remove', index=0)
+        return value
+
+    @synchronized
+    def remove_tail(self):
+        """Remove the last node, O(1) except for singly linked lists which walk to it"""
+        if self.is_empty():
+            raise Exception("Linked list underflow")
+        index = self.length - 1
+        value = self._unlink(self._predecessor(self.tail, index), self.tail)
+        self.changes.record('remove', index=index)
+        return value
+
+    @synchronized
+    def remove_at(self, index):
+        if self.is_empty():
+            raise Exception("Linked list underflow")
+        index = self._check_index(index, self.length - 1)
+        previous = NIL if index == 0 else self._node_at(index - 1)
+        value = self._unlink(previous, self.head if previous == NIL else self.next_links[previous])
+        self.changes.record('remove', index=index)
+        return value
+
+    @synchronized
+    def remove_value(self, value):
+        """Remove the first node holding value and return its index"""
+        previous = NIL
+        for index, node in enumerate(self._nodes()):
+            if self.values[node] == value:
+                self._unlink(previous, node)
+                self.changes.record('remove', index=index)
+                return index
+            previous = node
+        raise Exception("Value not found")
+
+    @synchronized
+    def find(self, value):
+        """Get the index of the first node holding value, or -1"""
+        for index, node in enumerate(self._nodes()):
+            if self.values[node] == value:
+                return index
+        return -1
+
+    @synchronized
+    def get(self, index):
+        index = self._check_index(index, self.length - 1)
+        return self.values[self._node_at(index)]
+
+    @synchronized
+    def reverse(self):
+        """Reverse the list in place by flipping every link"""
+        previous = NIL
+        node = self.head
+        for _ in range(self.length):
+            following = self.next_links[node]
+            self.next_links[node] = previous
+            if self.prev_links is not None:
+                self.prev_links[node] = following
+            previous = node
+            node = following
+        self.head, self.tail = self.tail, self.head
+        if self.length:
+            self.next_links[self.tail] = NIL
+            if self.prev_links is not None:
+                self.prev_links[self.head] = NIL
+        self._close_ring()
+        self.changes.record('reverse')
+        return True
+
+    @synchronized
+    def merge(self, values, ordered=False):
+        """Append values, or merge them into place when both lists are sorted"""
+        values = list(values)
+        if self.capacity is not None and self.length + len(values) > self.capacity:
+            raise Exception("Linked list overflow")
+
+        if not ordered:
+            for value in values:
+                self._link_after(self.tail, value)
+            self.changes.record('merge', values=values, ordered=False)
+            return self.length
+
+        # Decide the merged order first so a failed comparison changes nothing
+        existing = list(self._nodes())
+        order = []
+        i = j = 0
+        try:
+            while i < len(existing) and j < len(values):
+                if values[j] < self.values[existing[i]]:
+                    order.append((None, values[j]))
+                    j += 1
+                else:
+                    order.append((existing[i], None))
+                    i += 1
+        except TypeError:
+            raise Exception("Values must be comparable to merge in order")
+        order.extend((node, None) for node in existing[i:])
+        order.extend((None, value) for value in values[j:])
+
+        # Relink the existing nodes and new ones in merged order
+        nodes = [self._allocate(value) if node is None else node for node, value in order]
+        for position, node in enumerate(nodes):
+            self.next_links[node] = nodes[position + 1] if position + 1 < len(nodes) else NIL
+            if self.prev_links is not None:
+                self.prev_links[node] = nodes[position - 1] if position else NIL
+        if nodes:
+            self.head = nodes[0]
+            self.tail = nodes[-1]
+        self.length = len(nodes)
+        self._close_ring()
+        self.changes.record('merge', values=values, ordered=True)
+        return self.length
+
+    @synchronized
+    def peek(self):
+        if self.is_empty():
+            return None
+        return self.values[self.head]
+
+    def size(self):
+        return self.length
+
+    def is_empty(self):
+        return self.length == 0
+
+    def is_full(self):
+        return self.capacity is not None and self.length >= self.capacity
+
+    @synchronized
+    def clear(self):
+        self.values = []
+        self.next_links = array('l')
+        self.prev_links = None if self.list_type == 'singly' else array('l')
+        self.free = NIL
+        self.head = NIL
+        self.tail = NIL
+        self.length = 0
+        self.changes.record('clear')
+
+    @synchronized
+    def configure(self, capacity):
+        """Change the capacity, None for unbounded"""
+        capacity = check_capacity(capacity)
+        if capacity is not None and self.length > capacity:
+            raise Exception("Capacity is smaller than the current size")
+        self.capacity = capacity
+        self.changes.record('configure', capacity=capacity)
+        return self.get_config()
+
+    @synchronized
+    def get_config(self):
+        return {'capacity': self.capacity}
+
+    @synchronized
+    def to_list(self):
+        return [self.values[node] for node in self._nodes()]
+
+    @synchronized
+    def get_nodes(self):
+        """Get the nodes in list order with their pool slots and links, for drawing"""
+        nodes = []
+        for node in self._nodes():
+            entry = {'node': node, 'value': self.values[node], 'next': self.next_links[node]}
+            if self.prev_links is not None:
+                entry['prev'] = self.prev_links[node]
+            nodes.append(entry)
+        return nodes
+
+    @synchronized
+    def to_state(self):
+        """Get a plain snapshot of the list, pool layout included, for serialization"""
+        return {
+            'type': 'linked_list',
+            'capacity': self.capacity,
+            'list_type': self.list_type,
+            'values': list(self.values),
+            'next_links': list(self.next_links),
+            'prev_links': None if self.prev_links is None else list(self.prev_links),
+            'free': self.free,
+            'head': self.head,
+            'tail': self.tail,
+            'length': self.length,
+            'changes': self.changes.to_state()
+        }
+
+    @synchronized
+    def load_state(self, state):
+        """Replace the contents of this list with a snapshot"""
+        self.capacity = state['capacity']
+        self.list_type = state['list_type']
+        self.values = list(state['values'])
+        self.next_links = array('l', state['next_links'])
+        self.prev_links = None if state['prev_links'] is None else array('l', state['prev_links'])
+        self.free = state['free']
+        self.head = state['head']
+        self.tail = state['tail']
+        self.length = state['length']
+        if 'changes' in state:
+            self.changes.load_state(state['changes'])
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a list from a snapshot made by to_state"""
+        linked_list = cls(capacity=state['capacity'], list_type=state['list_type'])
+        linked_list.load_state(state)
+        return linked_list
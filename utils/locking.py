@@ -0,0 +1,18 @@
+#locking.py
+import functools
+
+
+def synchronized(method):
+    """Run a method while holding its instance's lock
+
+    Structures mark every method that changes them, or reads more than one
+    field, so check-then-act steps such as a capacity check before a push
+    cannot interleave; single-field reads like size() stay lock-free. The
+    lock is reentrant, so synchronized methods can call each other and
+    callers can hold it across several calls to make them one atomic step.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
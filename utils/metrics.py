@@ -0,0 +1,197 @@
+#metrics.py
+import sys
+import threading
+from collections import Counter
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Upper bounds of the size histogram buckets, in elements or processes
+SIZE_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+HELP = {
+    'dsa_request_duration_seconds': ('histogram', 'Request latency by route and operation'),
+    'dsa_operation_errors_total': ('counter', 'Failed operations by structure and kind'),
+    'dsa_structure_size': ('histogram', 'Structure sizes seen at the end of requests'),
+    'dsa_scheduler_processes': ('histogram', 'Processes per schedule calculation'),
+    'dsa_profiler_samples_total': ('counter', 'Stack samples taken by the sampling profiler'),
+    'dsa_metrics_dropped_total': ('counter', 'Observations dropped because the series limit was reached'),
+}
+
+
+def classify_error(message):
+    """Bucket an error message into overflow, underflow or other"""
+    message = message.lower()
+    if 'overflow' in message:
+        return 'overflow'
+    if 'underflow' in message:
+        return 'underflow'
+    return 'other'
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in pairs)
+
+
+class Metrics:
+    """In-process metrics registry rendered as Prometheus text
+
+    Every recording method returns straight away while disabled, so the
+    instrumentation left in the request path costs one attribute check.
+    Label values can come from requests, so the number of series is
+    capped and observations for new series past the cap are dropped.
+    """
+
+    def __init__(self, enabled=False, max_series=1000):
+        self.enabled = enabled
+        self.max_series = max_series
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.counters = Counter()  # (name, labels) -> value
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def _full(self):
+        return len(self.histograms) + len(self.counters) >= self.max_series
+
+    def observe(self, name, labels, value, bounds=LATENCY_BUCKETS):
+        if not self.enabled:
+            return
+        key = (name, tuple(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                if self._full():
+                    self.dropped += 1
+                    return
+                histogram = self.histograms[key] = Histogram(bounds)
+            histogram.observe(value)
+
+    def increment(self, name, labels, amount=1):
+        if not self.enabled:
+            return
+        key = (name, tuple(labels))
+        with self.lock:
+            if key not in self.counters and self._full():
+                self.dropped += 1
+                return
+            self.counters[key] += amount
+
+    def record_error(self, structure, error):
+        self.increment('dsa_operation_errors_total',
+                       (('structure', structure), ('kind', classify_error(str(error)))))
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.dropped = 0
+
+    def render(self):
+        """Render every series in the Prometheus text exposition format"""
+        with self.lock:
+            histograms = [(key, list(h.counts), h.sum, h.count, h.bounds) for key, h in self.histograms.items()]
+            counters = list(self.counters.items())
+            if self.dropped:
+                counters.append((('dsa_metrics_dropped_total', ()), self.dropped))
+
+        series = {}
+        for (name, labels), counts, total, count, bounds in histograms:
+            lines = series.setdefault(name, [])
+            cumulative = 0
+            for bound, bucket in zip(bounds, counts):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{{{_labels(labels + (('le', bound),))}}} {cumulative}")
+            lines.append(f"{name}_bucket{{{_labels(labels + (('le', '+Inf'),))}}} {count}")
+            lines.append(f"{name}_sum{{{_labels(labels)}}} {total}")
+            lines.append(f"{name}_count{{{_labels(labels)}}} {count}")
+        for (name, labels), value in counters:
+            series.setdefault(name, []).append(f"{name}{{{_labels(labels)}}} {value}")
+
+        output = []
+        for name in sorted(series):
+            kind, description = HELP.get(name, ('untyped', name))
+            output.append(f"# HELP {name} {description}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(series[name])
+        return '\n'.join(output) + '\n'
+
+
+class SamplingProfiler:
+    """Samples the stacks of request threads from a background thread
+
+    Counts are kept per collapsed stack ("module:function;..." from the
+    outermost frame), the input format of flame graph tools.
+    """
+
+    def __init__(self, metrics, interval=0.01, max_depth=32):
+        self.metrics = metrics
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopping = threading.Event()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, interval=None):
+        if interval:
+            self.interval = interval
+        if self.running:
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stopping.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+                    frame = frame.f_back
+                with self.lock:
+                    self.stacks[';'.join(reversed(stack))] += 1
+                self.metrics.increment('dsa_profiler_samples_total', ())
+
+    def collapsed(self):
+        """Get the samples as "stack count" lines, busiest first"""
+        with self.lock:
+            samples = self.stacks.most_common()
+        return ''.join(f"{stack} {count}\n" for stack, count in samples)
+
+    def reset(self):
+        with self.lock:
+            self.stacks.clear()
@@ -0,0 +1,318 @@
+#persistence.py
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+# Snapshot file layout, little-endian:
+#   magic (4 bytes) | format version (u8) | 3 padding bytes | header length (u64)
+#   | header JSON | padding to 8 bytes | packed number sections, each 8-byte aligned
+# The header holds the state with every packed list left out, plus a list of
+# holes saying where the sections (and column groups) go back in.
+MAGIC = b'DSAS'
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct('<4sB3xQ')
+# Shorter number lists stay in the JSON header
+MIN_SECTION_LENGTH = 16
+INT_MIN = -2 ** 63
+INT_MAX = 2 ** 63 - 1
+SCENARIO_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+SCENARIO_SUFFIX = '.dsas'
+
+
+def _section_typecode(values):
+    """Get 'q' or 'd' if a list can be stored as a raw int64 or float64 section"""
+    if isinstance(values, array):
+        return 'd' if values.typecode in 'fd' else 'q'
+    if len(values) < MIN_SECTION_LENGTH:
+        return None
+    first = type(values[0])
+    if first is int:
+        if all(type(value) is int and INT_MIN <= value <= INT_MAX for value in values):
+            return 'q'
+    elif first is float:
+        if all(type(value) is float for value in values):
+            return 'd'
+    return None
+
+
+def _columns(values):
+    """Get the shared keys if values is a list of dicts that can be stored column-wise"""
+    if len(values) < 2 or type(values[0]) is not dict or not values[0]:
+        return None
+    keys = tuple(values[0])
+    for value in values:
+        if type(value) is not dict or tuple(value) != keys:
+            return None
+    return keys
+
+
+class _Packer:
+    def __init__(self):
+        self.holes = []
+        self.chunks = []
+        self.size = 0
+
+    def pack(self, value, path):
+        if isinstance(value, dict):
+            return {key: self.pack(item, path + [key]) for key, item in value.items()}
+        if not isinstance(value, (list, tuple, array)):
+            return value
+
+        typecode = _section_typecode(value)
+        if typecode is not None:
+            data = array(typecode, value)
+            if sys.byteorder == 'big':
+                data.byteswap()
+            self.holes.append(['section', path, typecode, self.size, len(data)])
+            self.chunks.append(data.tobytes())
+            self.size += len(data) * data.itemsize
+            return None
+
+        keys = _columns(value)
+        if keys is not None:
+            # Children are packed (and their holes recorded) before the column hole itself
+            columns = {key: self.pack([item[key] for item in value], path + [key]) for key in keys}
+            self.holes.append(['columns', path, len(value)])
+            return columns
+
+        return [self.pack(item, path + [index]) for index, item in enumerate(value)]
+
+
+def encode(state):
+    """Serialize a state to the compact snapshot format"""
+    packer = _Packer()
+    root = packer.pack(state, [])
+    header = json.dumps({'root': root, 'holes': packer.holes}, separators=(',', ':')).encode('utf-8')
+    padding = -(PREAMBLE.size + len(header)) % 8
+    return b''.join([PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)), header, b'\0' * padding]
+                    + packer.chunks)
+
+
+def _assign(root, path, value):
+    if not path:
+        return value
+    parent = root
+    for key in path[:-1]:
+        parent = parent[key]
+    parent[path[-1]] = value
+    return root
+
+
+def decode(buffer):
+    """Rebuild a state from a snapshot held in any bytes-like buffer (mmap included)
+
+    Sections come back as plain lists, exactly as they were encoded, since
+    they may sit anywhere in the state, user values included.
+    """
+    view = memoryview(buffer)
+    try:
+        if len(view) < PREAMBLE.size:
+            raise ValueError("Snapshot is truncated")
+        magic, version, header_length = PREAMBLE.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Unsupported snapshot format")
+        header_end = PREAMBLE.size + header_length
+        header = json.loads(bytes(view[PREAMBLE.size:header_end]))
+        data_start = header_end + (-header_end % 8)
+
+        root = header['root']
+        for hole in header['holes']:
+            if hole[0] == 'section':
+                _, path, typecode, offset, count = hole
+                values = array(typecode)
+                start = data_start + offset
+                end = start + count * values.itemsize
+                if end > len(view):
+                    raise ValueError("Snapshot is truncated")
+                values.frombytes(view[start:end])
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                root = _assign(root, path, values.tolist())
+            else:
+                _, path, length = hole
+                columns = root
+                for key in path:
+                    columns = columns[key]
+                keys = list(columns)
+                rows = [dict(zip(keys, row)) for row in zip(*(columns[key] for key in keys))]
+                if len(rows) != length:
+                    raise ValueError("Snapshot columns are corrupt")
+                root = _assign(root, path, rows)
+        return root
+    finally:
+        view.release()
+
+
+def save_snapshot(path, state):
+    """Write a snapshot atomically, a crash leaves the previous file in place"""
+    _write_atomically(path, encode(state))
+
+
+def _write_atomically(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load_snapshot(path, mmap_threshold=1024 * 1024):
+    """Read a snapshot, memory-mapping files larger than mmap_threshold bytes
+
+    Mapped sections are copied straight from the page cache into their
+    arrays, without reading the whole file into one bytes object first.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < mmap_threshold:
+            return decode(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decode(mapped)
+
+
+class Journal:
+    """Append-only log of operations, one JSON record per line
+
+    Each request appends one record with all the operations it applied.
+    A crash can only tear the last line, which replay skips.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.file = open(path, 'a', encoding='utf-8')
+        self.count = sum(1 for _ in self.records())
+
+    def append(self, record):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.fileno())
+            self.count += 1
+
+    def records(self):
+        """Yield the logged records in order, stopping at a torn or corrupt line"""
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return
+
+    def truncate(self):
+        with self.lock:
+            self.file.truncate(0)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.count = 0
+
+    def close(self):
+        self.file.close()
+
+
+class CheckpointGate:
+    """Lets requests run side by side, but a checkpoint waits for them and runs alone
+
+    Checkpoints snapshot every structure and then truncate the journal, so
+    no operation may be half applied or half journaled while one runs.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.active = 0
+        self.checkpointing = False
+
+    @contextmanager
+    def shared(self):
+        with self.condition:
+            while self.checkpointing:
+                self.condition.wait()
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                if not self.active:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self.condition:
+            while self.checkpointing:
+                self.condition.wait()
+            self.checkpointing = True
+            while self.active:
+                self.condition.wait()
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.checkpointing = False
+                self.condition.notify_all()
+
+
+class ScenarioLibrary:
+    """Named structure snapshots on disk that any session can load
+
+    At most max_scenarios are kept, each at most max_bytes once encoded.
+    """
+
+    def __init__(self, directory, mmap_threshold=1024 * 1024, max_scenarios=100, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.mmap_threshold = mmap_threshold
+        self.max_scenarios = max_scenarios
+        self.max_bytes = max_bytes
+
+    def _path(self, name):
+        if not isinstance(name, str) or not SCENARIO_NAME.match(name):
+            raise Exception("Scenario names are 1-64 letters, digits, '-' or '_'")
+        return os.path.join(self.directory, name + SCENARIO_SUFFIX)
+
+    def save(self, name, structure_name, state):
+        path = self._path(name)
+        if not os.path.exists(path) and len(self.list()) >= self.max_scenarios:
+            raise Exception(f"There can be at most {self.max_scenarios} scenarios, delete one first")
+        state = {key: value for key, value in state.items() if key not in ('changes', 'history')}
+        data = encode({'structure': structure_name, 'saved_at': time.time(), 'state': state})
+        if len(data) > self.max_bytes:
+            raise Exception(f"Scenarios can be at most {self.max_bytes} bytes")
+        _write_atomically(path, data)
+
+    def load(self, name):
+        """Get the structure name and state of a scenario"""
+        path = self._path(name)
+        if not os.path.exists(path):
+            raise Exception(f"No scenario named {name}")
+        scenario = load_snapshot(path, self.mmap_threshold)
+        return scenario['structure'], scenario['state']
+
+    def delete(self, name):
+        path = self._path(name)
+        if not os.path.exists(path):
+            raise Exception(f"No scenario named {name}")
+        os.remove(path)
+
+    def list(self):
+        if not os.path.isdir(self.directory):
+            return []
+        scenarios = []
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(SCENARIO_SUFFIX):
+                path = os.path.join(self.directory, filename)
+                scenarios.append({'name': filename[:-len(SCENARIO_SUFFIX)], 'bytes': os.path.getsize(path),
+                                  'modified': os.path.getmtime(path)})
+        return scenarios
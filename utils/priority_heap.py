@@ -0,0 +1,115 @@
+#priority_heap.py
+class PriorityHeap:
+    """Indexed binary min-heap ordered by (priority, insertion sequence)
+
+    Each element gets a stable integer id (its sequence number) which is
+    used both to break ties in FIFO order and as the handle for
+    update_priority.
+    """
+
+    def __init__(self):
+        self.heap = []       # entries are [priority, id, value]
+        self.position = {}   # id -> index of the entry in self.heap
+        self.next_id = 0
+        self._sorted = None  # cached sorted view, dropped on every mutation
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def push(self, value, priority, element_id=None):
+        """Add a value and return its id, O(log n)"""
+        if element_id is None:
+            element_id = self.next_id
+        elif element_id in self.position:
+            raise ValueError(f"Duplicate element id: {element_id}")
+        self.next_id = max(self.next_id, element_id + 1)
+
+        self.heap.append([priority, element_id, value])
+        self.position[element_id] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+        self._sorted = None
+        return element_id
+
+    def pop(self):
+        """Remove and return the highest priority element, O(log n)"""
+        if not self.heap:
+            raise IndexError("pop from empty heap")
+        top = self.heap[0]
+        last = self.heap.pop()
+        del self.position[top[1]]
+        if self.heap:
+            self.heap[0] = last
+            self.position[last[1]] = 0
+            self._sift_down(0)
+        self._sorted = None
+        return self._as_dict(top)
+
+    def peek(self):
+        if not self.heap:
+            return None
+        return self._as_dict(self.heap[0])
+
+    def update_priority(self, element_id, priority):
+        """Change the priority of an element in place, O(log n)"""
+        index = self.position.get(element_id)
+        if index is None:
+            raise KeyError(f"No element with id {element_id}")
+        old_priority = self.heap[index][0]
+        self.heap[index][0] = priority
+        if priority < old_priority:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+        self._sorted = None
+        return self._as_dict(self.heap[self.position[element_id]])
+
+    def clear(self):
+        self.heap = []
+        self.position = {}
+        self._sorted = None
+
+    def to_list(self):
+        """Get the elements in dequeue order, sorted lazily and cached"""
+        if self._sorted is None:
+            self._sorted = [self._as_dict(entry) for entry in sorted(self.heap, key=lambda e: (e[0], e[1]))]
+        return list(self._sorted)
+
+    def _as_dict(self, entry):
+        return {'value': entry[2], 'priority': entry[0], 'id': entry[1]}
+
+    def _less(self, a, b):
+        return (a[0], a[1]) < (b[0], b[1])
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i][1]] = i
+        self.position[heap[j][1]] = j
+
+    def _sift_up(self, index):
+        heap = self.heap
+        while index > 0:
+            parent = (index - 1) >> 1
+            if not self._less(heap[index], heap[parent]):
+                break
+            self._swap(index, parent)
+            index = parent
+
+    def _sift_down(self, index):
+        heap = self.heap
+        size = len(heap)
+        while True:
+            smallest = index
+            left = 2 * index + 1
+            right = left + 1
+            if left < size and self._less(heap[left], heap[smallest]):
+                smallest = left
+            if right < size and self._less(heap[right], heap[smallest]):
+                smallest = right
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
@@ -0,0 +1,157 @@
+#process_import.py
+import csv
+import io
+import json
+
+CHUNK_SIZE = 64 * 1024
+FORMATS = ('json', 'csv', 'ndjson')
+
+
+def _text(stream):
+    """Wrap a binary stream (request body or upload) for incremental text reads"""
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+
+def iter_json_array(stream):
+    """Yield the objects of a JSON array without loading the whole document"""
+    text = _text(stream)
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    # What comes next: the opening '[', the first value or ']', a value after a
+    # comma, a ',' or ']' after a value, and then nothing but whitespace
+    expect = 'open'
+
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n':
+            position += 1
+
+        if position >= len(buffer):
+            if eof:
+                if expect == 'end':
+                    return
+                raise ValueError("Unexpected end of JSON array")
+            chunk = text.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer = chunk
+            position = 0
+            continue
+
+        char = buffer[position]
+        if expect == 'end':
+            raise ValueError("Unexpected data after the JSON array")
+        if expect == 'open':
+            if char != '[':
+                raise ValueError("Expected a JSON array of processes")
+            expect = 'first'
+            position += 1
+            continue
+        if expect == 'separator':
+            if char not in ',]':
+                raise ValueError("Expected ',' or ']' after a process")
+            expect = 'value' if char == ',' else 'end'
+            position += 1
+            continue
+        if char == ']' and expect == 'first':
+            expect = 'end'
+            position += 1
+            continue
+        if char in ',]':
+            raise ValueError(f"Expected a process before '{char}'")
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+            # A number running up to the end of the buffer may continue in the next chunk
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ValueError(f"Invalid JSON in the process list: {e.msg}")
+            complete = False
+        if not complete:
+            chunk = text.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        position = end
+        expect = 'separator'
+        yield item
+
+
+def iter_ndjson(stream):
+    """Yield one object per non-empty line"""
+    for line_number, line in enumerate(_text(stream), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}")
+
+
+def iter_csv(stream):
+    """Yield one dict per CSV row, using the header row as keys"""
+    reader = csv.DictReader(_text(stream))
+    for row in reader:
+        # DictReader fills the fields of a short row with None and keeps extra values under None
+        if None in row or None in row.values():
+            raise ValueError(f"Row on line {reader.line_num} does not match the header")
+        yield {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+
+PARSERS = {'json': iter_json_array, 'csv': iter_csv, 'ndjson': iter_ndjson}
+
+
+def detect_format(content_type=None, filename=None):
+    """Guess the upload format from a file name or Content-Type"""
+    if filename:
+        extension = filename.rsplit('.', 1)[-1].lower()
+        if extension in ('jsonl', 'ndjson'):
+            return 'ndjson'
+        if extension in FORMATS:
+            return extension
+    content_type = (content_type or '').lower()
+    if 'csv' in content_type:
+        return 'csv'
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return 'json'
+
+
+def _field(record, *keys, default=None):
+    """Get the first of keys that is set, missing, null and '' (empty CSV cells) counting as unset"""
+    for key in keys:
+        value = record.get(key)
+        if value is not None and value != '':
+            return value
+    return default
+
+
+def normalize_processes(records, max_processes=None):
+    """Turn raw records into process fields with defaults applied, failing past max_processes"""
+    for number, record in enumerate(records, start=1):
+        if max_processes is not None and number > max_processes:
+            raise ValueError(f"At most {max_processes} processes can be added at once")
+        if not isinstance(record, dict):
+            raise ValueError(f"Process {number} is not an object")
+        try:
+            process = {
+                'process_id': _field(record, 'process_id', 'id', default=f"P{number}"),
+                'arrival_time': int(_field(record, 'arrival_time', default=0)),
+                'burst_time': int(record['burst_time']),
+                'priority': int(_field(record, 'priority', default=5))
+            }
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Process {number} needs an integer burst_time, arrival_time and priority")
+        yield process
+
+
+def parse_processes(stream, fmt='json', max_processes=None):
+    """Parse an upload into process records as it is read, stopping past max_processes"""
+    if fmt not in PARSERS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    return normalize_processes(PARSERS[fmt](stream), max_processes)
@@ -1,78 +1,227 @@
 #queue.py
+import threading
+from collections import deque
+
+from utils.change_log import ChangeLog
+from utils.history import HISTORY_LIMIT, History, PersistentDeque, PersistentTreap
+from utils.locking import synchronized
+from utils.priority_heap import PriorityHeap
+from utils.scheduler import (MAX_SLICES, TraceNarrator, check_slices, describe_trace, iter_schedule, schedule,
+                             validate_policy)
+from utils.typed_buffer import check_capacity, check_element_type, coerce_value, new_buffer
+
+# Slots a ring starts with when the capacity is larger or unbounded
+INITIAL_RING_SIZE = 16
+
+
+def apply_history_operation(data, op):
+    """Make the next persistent version of a queue from an operation
+
+    Priority queues are versioned as a PersistentTreap, the other queue
+    types as a PersistentDeque.
+    """
+    name = op[0]
+    if name == 'enqueue':
+        if isinstance(data, PersistentTreap):
+            return data.insert(op[1], op[2], op[3])
+        return data.push_back(op[1])
+    if name == 'dequeue':
+        return data.pop_min() if isinstance(data, PersistentTreap) else data.pop_front()
+    if name == 'enqueue_front':
+        return data.push_front(op[1])
+    if name == 'dequeue_rear':
+        return data.pop_back()
+    if name == 'update_priority':
+        _, element_id, old_priority, priority = op
+        data, value = data.remove(old_priority, element_id)
+        return data.insert(value, priority, element_id)
+    if name == 'clear':
+        return type(data)()
+    # configure, converting the values to the new element type
+    if isinstance(data, PersistentTreap):
+        return data
+    return PersistentDeque.from_list([coerce_value(op[2], value) for value in data.to_list()])
+
+
+def history_to_list(data):
+    if isinstance(data, PersistentTreap):
+        return [list(item) for item in data.items()]
+    return data.to_list()
+
+
 class Queue:
-    def __init__(self, capacity=10, queue_type='linear'):
-        self.capacity = capacity
+    """Linear queue, circular queue, deque or priority queue
+
+    capacity=None makes the queue unbounded. Circular queues keep their
+    values in a ring that starts small and doubles up to the capacity.
+    With an element_type of 'int' or 'float', linear queues and deques use
+    the same ring layout over a typed array so values are stored unboxed.
+    Every change to the queued values is also recorded in a persistent
+    history, which undo, redo and jump restore from.
+    """
+
+    __slots__ = ('capacity', 'queue_type', 'growable', 'element_type', 'ring', 'elements',
+                 'front', 'rear', 'count', 'changes', 'history', 'processes', 'gantt_chart', 'current_time', 'lock')
+
+    def __init__(self, capacity=10, queue_type='linear', growable=False, element_type=None,
+                 history_limit=HISTORY_LIMIT):
+        self.lock = threading.RLock()
+        self.capacity = check_capacity(capacity)
         self.queue_type = queue_type
-        self.elements = []
+        # A growable queue doubles its capacity instead of overflowing
+        self.growable = growable
+        self.element_type = self._check_element_type(element_type)
+        self.ring = self._uses_ring()
+        self.elements = self._new_storage()
         self.front = 0
         self.rear = -1
         self.count = 0
+        self.changes = ChangeLog()
+        self.history = History(apply_history_operation, self._empty_version(), self._config(), history_limit)
         
         # For priority scheduling
         self.processes = []
         self.gantt_chart = []
         self.current_time = 0
-        
-        if queue_type == 'circular':
-            self.elements = [None] * capacity
     
-    def enqueue(self, value, priority=None):
+    def _config(self):
+        return (self.capacity, self.element_type)
+    
+    def _empty_version(self):
+        return PersistentTreap() if self.queue_type == 'priority' else PersistentDeque()
+    
+    def _history_from_list(self, values):
+        if self.queue_type == 'priority':
+            return PersistentTreap.from_items(values)
+        return PersistentDeque.from_list(values)
+    
+    def _check_element_type(self, element_type):
+        if element_type is not None and self.queue_type == 'priority':
+            raise Exception("Typed storage is not available for Priority Queue")
+        return check_element_type(element_type)
+    
+    def _uses_ring(self):
+        return self.queue_type == 'circular' or (self.element_type is not None and self.queue_type != 'priority')
+    
+    def _new_storage(self, values=()):
+        # Untyped linear queues and deques use a deque for O(1) operations at both ends
+        if self.ring:
+            values = list(values)
+            size = max(len(values), INITIAL_RING_SIZE if self.capacity is None else min(self.capacity, INITIAL_RING_SIZE))
+            return new_buffer(self.element_type, values, size)
+        if self.queue_type == 'priority':
+            return PriorityHeap()
+        return deque(values)
+    
+    def _reset_ring(self, values, size=None):
+        """Lay values out from slot 0 of a fresh ring"""
+        self.elements = self._new_storage(values) if size is None else new_buffer(self.element_type, values, size)
+        self.front = 0
+        self.rear = len(values) - 1
+    
+    def _grow(self):
+        """Double the capacity of a growable queue"""
+        self.capacity = max(1, self.capacity * 2)
+    
+    def _make_room(self, kind):
         if self.is_full():
-            raise Exception("Queue overflow")
+            if not self.growable:
+                raise Exception(f"{kind} overflow")
+            self._grow()
+        if self.ring and self.count == len(self.elements):
+            # The ring is full but the capacity allows more, double it
+            size = len(self.elements) * 2
+            if self.capacity is not None:
+                size = min(size, self.capacity)
+            self._reset_ring(self.to_list(), size)
+    
+    @synchronized
+    def enqueue(self, value, priority=None):
+        self._make_room('Queue')
+        value = coerce_value(self.element_type, value)
             
         if self.queue_type == 'priority':
-            # For priority queue, store both value and priority
-            element = {'value': value, 'priority': priority or 5}
-            
-            # Insert in priority order (lower number = higher priority)
-            inserted = False
-            for i in range(len(self.elements)):
-                if element['priority'] < self.elements[i]['priority']:
-                    self.elements.insert(i, element)
-                    inserted = True
-                    break
-            
-            if not inserted:
-                self.elements.append(element)
+            # Lower number = higher priority, ties are served in FIFO order
+            priority = priority or 5
+            element_id = self.elements.push(value, priority)
+            self.rear = len(self.elements) - 1
+            self.changes.record('enqueue', value=value, priority=priority, id=element_id)
+            self.history.record(['enqueue', value, priority, element_id], self._config())
                 
-        elif self.queue_type == 'circular':
+        elif self.ring:
             # Increment rear in circular fashion
-            self.rear = (self.rear + 1) % self.capacity
+            self.rear = (self.rear + 1) % len(self.elements)
             self.elements[self.rear] = value
+            self.changes.record('enqueue', value=value)
+            self.history.record(['enqueue', value], self._config())
         else:
             self.elements.append(value)
             self.rear = len(self.elements) - 1
+            self.changes.record('enqueue', value=value)
+            self.history.record(['enqueue', value], self._config())
             
         self.count += 1
         return True
     
+    @synchronized
     def dequeue(self):
         if self.is_empty():
             raise Exception("Queue underflow")
             
-        if self.queue_type == 'circular':
+        if self.ring:
             value = self.elements[self.front]
-            self.elements[self.front] = None  # Clear the slot
-            self.front = (self.front + 1) % self.capacity
+            if self.element_type is None:
+                self.elements[self.front] = None  # Clear the slot
+            self.front = (self.front + 1) % len(self.elements)
+        elif self.queue_type == 'priority':
+            value = self.elements.pop()
+            self.rear = len(self.elements) - 1
         else:
-            value = self.elements.pop(0)
-            self.rear = len(self.elements) - 1 if self.elements else -1
+            value = self.elements.popleft()
+            self.rear = len(self.elements) - 1
             
         self.count -= 1
+        self.changes.record('dequeue')
+        self.history.record(['dequeue'], self._config())
         return value
     
+    @synchronized
+    def enqueue_many(self, values, priority=None):
+        """Enqueue every value, or none of them if they do not all fit"""
+        values = [coerce_value(self.element_type, value) for value in values]
+        if not self.growable and self.capacity is not None and self.count + len(values) > self.capacity:
+            raise Exception("Queue overflow")
+        for value in values:
+            self.enqueue(value, priority)
+        return len(values)
+    
+    @synchronized
+    def dequeue_many(self, count):
+        """Dequeue count values, or none if fewer are queued"""
+        if count > self.count:
+            raise Exception("Queue underflow")
+        return [self.dequeue() for _ in range(count)]
+    
+    @synchronized
     def enqueue_front(self, value):
         if self.queue_type != 'deque':
             raise Exception("This operation is only available for Deque")
             
-        if self.is_full():
-            raise Exception("Deque overflow")
-            
-        self.elements.insert(0, value)
-        self.rear = len(self.elements) - 1
+        self._make_room('Deque')
+        value = coerce_value(self.element_type, value)
+        
+        if self.ring:
+            self.front = (self.front - 1) % len(self.elements)
+            self.elements[self.front] = value
+        else:
+            self.elements.appendleft(value)
+            self.rear = len(self.elements) - 1
         self.count += 1
+        self.changes.record('enqueue_front', value=value)
+        self.history.record(['enqueue_front', value], self._config())
         return True
     
+    @synchronized
     def dequeue_rear(self):
         if self.queue_type != 'deque':
             raise Exception("This operation is only available for Deque")
@@ -80,17 +229,26 @@ class Queue:
         if self.is_empty():
             raise Exception("Deque underflow")
             
-        value = self.elements.pop()
-        self.rear = len(self.elements) - 1 if self.elements else -1
+        if self.ring:
+            value = self.elements[self.rear]
+            self.rear = (self.rear - 1) % len(self.elements)
+        else:
+            value = self.elements.pop()
+            self.rear = len(self.elements) - 1 if self.elements else -1
         self.count -= 1
+        self.changes.record('dequeue_rear')
+        self.history.record(['dequeue_rear'], self._config())
         return value
     
+    @synchronized
     def peek(self):
         if self.is_empty():
             return None
             
-        if self.queue_type == 'circular':
+        if self.ring:
             return self.elements[self.front]
+        elif self.queue_type == 'priority':
+            return self.elements.peek()
         else:
             return self.elements[0]
     
@@ -101,38 +259,191 @@ class Queue:
         return self.count == 0
     
     def is_full(self):
-        return self.count >= self.capacity
+        return self.capacity is not None and self.count >= self.capacity
     
+    @synchronized
     def clear(self):
-        if self.queue_type == 'circular':
-            self.elements = [None] * self.capacity
-        else:
-            self.elements = []
+        self.elements = self._new_storage()
         
         self.front = 0
         self.rear = -1
         self.count = 0
+        self.changes.record('clear')
+        self.history.record(['clear'], self._config())
+    
+    @synchronized
+    def configure(self, capacity, element_type):
+        """Change the capacity and element type, converting the queued values"""
+        capacity = check_capacity(capacity)
+        element_type = self._check_element_type(element_type)
+        if capacity is not None and self.count > capacity:
+            raise Exception("Capacity is smaller than the current size")
+        if self.queue_type == 'priority':
+            values = None
+        else:
+            values = [coerce_value(element_type, value) for value in self.to_list()]
+        
+        self.capacity = capacity
+        self.element_type = element_type
+        self.ring = self._uses_ring()
+        if values is not None:
+            if self.ring:
+                self._reset_ring(values)
+            else:
+                self.elements = self._new_storage(values)
+                self.front = 0
+                self.rear = len(values) - 1
+        self.changes.record('configure', capacity=capacity, element_type=element_type)
+        self.history.record(['configure', capacity, element_type], self._config())
+        return self.get_config()
+    
+    @synchronized
+    def get_config(self):
+        return {'capacity': self.capacity, 'element_type': self.element_type, 'growable': self.growable}
+    
+    def _restore(self, version):
+        data, (capacity, element_type) = version
+        self.capacity = capacity
+        self.element_type = element_type
+        self.ring = self._uses_ring()
+        if self.queue_type == 'priority':
+            self.elements = PriorityHeap()
+            for value, priority, element_id in data.items():
+                self.elements.push(value, priority, element_id)
+            self.front = 0
+            self.rear = len(self.elements) - 1
+            self.count = len(self.elements)
+        else:
+            values = data.to_list()
+            if self.ring:
+                self._reset_ring(values)
+            else:
+                self.elements = self._new_storage(values)
+                self.front = 0
+                self.rear = len(values) - 1
+            self.count = len(values)
+        # Clients cannot replay a jump as a delta, make them resync
+        self.changes.restart()
+        return self.history.position()
+    
+    @synchronized
+    def undo(self):
+        return self._restore(self.history.undo())
+    
+    @synchronized
+    def redo(self):
+        return self._restore(self.history.redo())
+    
+    @synchronized
+    def jump(self, step):
+        """Restore the queued values as they were after a step of the history"""
+        return self._restore(self.history.jump(step))
+    
+    @synchronized
+    def get_history(self, offset=0, limit=None):
+        return self.history.describe(offset, limit)
     
+    @synchronized
     def to_list(self):
-        if self.queue_type == 'circular':
-            # For circular queue, return elements in order from front to rear
-            result = []
-            if not self.is_empty():
-                current = self.front
-                for i in range(self.count):
-                    result.append(self.elements[current])
-                    current = (current + 1) % self.capacity
-            return result
+        if self.ring:
+            # Values in order from front to rear, in at most two slices of the ring
+            end = self.front + self.count
+            if end <= len(self.elements):
+                return list(self.elements[self.front:end])
+            return list(self.elements[self.front:]) + list(self.elements[:end - len(self.elements)])
+        elif self.queue_type == 'priority':
+            return self.elements.to_list()
         else:
-            return self.elements.copy()
+            return list(self.elements)
 
+    @synchronized
+    def to_state(self):
+        """Get a plain snapshot of the queue for serialization"""
+        return {
+            'type': 'queue',
+            'capacity': self.capacity,
+            'queue_type': self.queue_type,
+            'growable': self.growable,
+            'element_type': self.element_type,
+            'elements': list(self.elements),
+            'front': self.front,
+            'rear': self.rear,
+            'count': self.count,
+            'processes': [dict(p) for p in self.processes],
+            'gantt_chart': [dict(segment) for segment in self.gantt_chart],
+            'current_time': self.current_time,
+            'changes': self.changes.to_state(),
+            'history': self.history.to_state(history_to_list)
+        }
+
+    @synchronized
+    def load_state(self, state):
+        """Replace the contents of this queue with a snapshot"""
+        self.capacity = state['capacity']
+        self.queue_type = state['queue_type']
+        self.growable = state.get('growable', False)
+        self.element_type = state.get('element_type')
+        self.ring = self._uses_ring()
+        if self.ring:
+            # The snapshot holds the raw ring, front and rear index into it
+            self.elements = new_buffer(self.element_type, state['elements'])
+        elif self.queue_type == 'priority':
+            self.elements = self._new_storage()
+            for element in state['elements']:
+                self.elements.push(element['value'], element['priority'], element.get('id'))
+        else:
+            self.elements = self._new_storage(state['elements'])
+        self.front = state['front']
+        self.rear = state['rear']
+        self.count = state['count']
+        self.processes = [dict(p) for p in state['processes']]
+        self.gantt_chart = [dict(segment) for segment in state['gantt_chart']]
+        self.current_time = state['current_time']
+        if 'changes' in state:
+            self.changes.load_state(state['changes'])
+        if 'history' in state:
+            self.history.load_state(state['history'], self._history_from_list)
+        else:
+            # Older snapshots and scenarios start a new history from their contents
+            values = self.to_list()
+            if self.queue_type == 'priority':
+                values = [(element['value'], element['priority'], element['id']) for element in values]
+            self.history = History(apply_history_operation, self._history_from_list(values),
+                                   self._config(), self.history.limit)
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a queue from a snapshot made by to_state"""
+        queue = cls(capacity=state['capacity'], queue_type=state['queue_type'],
+                    element_type=state.get('element_type'))
+        queue.load_state(state)
+        return queue
+
+    @synchronized
+    def update_priority(self, element_id, priority):
+        """Change the priority of a queued element (priority queue only)"""
+        if self.queue_type != 'priority':
+            raise Exception("This operation is only available for Priority Queue")
+        if element_id is None or priority is None:
+            raise Exception("Element id and priority are required")
+        try:
+            element_id = int(element_id)
+            old_priority = self.elements.heap[self.elements.position[element_id]][0]
+            element = self.elements.update_priority(element_id, priority)
+        except KeyError:
+            raise Exception(f"No element with id {element_id}")
+        self.changes.record('update_priority', id=element['id'], priority=priority)
+        self.history.record(['update_priority', element_id, old_priority, priority], self._config())
+        return element
+
+    @synchronized
     def get_circular_state(self):
         """Get current state of circular queue for debugging"""
         if self.queue_type != 'circular':
             return None
         
         return {
-            'elements': self.elements,
+            'elements': list(self.elements),
             'front': self.front,
             'rear': self.rear,
             'count': self.count,
@@ -140,6 +451,7 @@ class Queue:
         }
 
     # Priority Scheduling Methods
+    @synchronized
     def add_process(self, process_id, arrival_time, burst_time, priority):
         """Add a process to the scheduler"""
         process = {
@@ -156,98 +468,143 @@ class Queue:
         self.processes.append(process)
         return process
 
+    @synchronized
+    def add_processes(self, records):
+        """Add many processes at once, all or nothing"""
+        new_processes = [
+            {
+                'id': record['process_id'],
+                'arrival_time': int(record['arrival_time']),
+                'burst_time': int(record['burst_time']),
+                'priority': int(record['priority']),
+                'remaining_time': int(record['burst_time']),
+                'completion_time': 0,
+                'waiting_time': 0,
+                'turnaround_time': 0,
+                'executed': False
+            }
+            for record in records
+        ]
+        self.processes.extend(new_processes)
+        return len(new_processes)
+
     def calculate_priority_schedule(self):
         """Calculate priority scheduling (non-preemptive)"""
+        return self.calculate_schedule('priority')
+
+    @synchronized
+    def calculate_schedule(self, policy='priority', quantum=2, trace='text', offset=0, limit=None,
+                           max_slices=MAX_SLICES):
+        """Calculate the schedule of the added processes under a policy
+
+        Only the trace window from offset (at most limit events) is returned,
+        as sentences or as compact events when trace is 'compact'.
+        """
         if not self.processes:
             raise Exception("No processes to schedule")
         
-        # Reset previous calculation
-        self.current_time = 0
-        self.gantt_chart = []
-        processes = [p.copy() for p in self.processes]  # Deep copy
-        
-        # Initialize processes
-        for p in processes:
-            p['remaining_time'] = p['burst_time']
-            p['completion_time'] = 0
-            p['waiting_time'] = 0
-            p['turnaround_time'] = 0
-            p['executed'] = False
-        
-        completed = 0
-        total_processes = len(processes)
-        execution_steps = []
+        try:
+            result = schedule(self.processes, policy, quantum, max_slices)
+        except ValueError as e:
+            raise Exception(str(e))
+        self.gantt_chart = result['gantt_chart']
+        self.current_time = result['total_time']
         
-        execution_steps.append("Starting Priority Scheduling Algorithm (Non-Preemptive)...")
+        # Write results back by position, no per-process id lookups needed
+        total_waiting_time = 0
+        total_turnaround_time = 0
+        for process, completion_time in zip(self.processes, result['completion_times']):
+            turnaround_time = completion_time - process['arrival_time']
+            waiting_time = turnaround_time - process['burst_time']
+            process['completion_time'] = completion_time
+            process['turnaround_time'] = turnaround_time
+            process['waiting_time'] = waiting_time
+            process['executed'] = True
+            total_waiting_time += waiting_time
+            total_turnaround_time += turnaround_time
         
-        while completed < total_processes:
-            # Find processes that have arrived and not completed
-            available_processes = [
-                p for p in processes 
-                if p['arrival_time'] <= self.current_time and p['remaining_time'] > 0
-            ]
-            
-            if not available_processes:
-                # No process available, advance time
-                self.current_time += 1
-                execution_steps.append(f"Time {self.current_time}: No process available")
-                continue
-            
-            # Find process with highest priority (lowest number)
-            next_process = min(available_processes, key=lambda x: (x['priority'], x['arrival_time']))
-            
-            # Execute the process completely (non-preemptive)
-            execution_steps.append(f"Time {self.current_time}: Executing {next_process['id']} "
-                                  f"(Priority: {next_process['priority']}, Burst Time: {next_process['burst_time']})")
-            
-            # Add to Gantt chart
-            self.gantt_chart.append({
-                'process': next_process['id'],
-                'start_time': self.current_time,
-                'end_time': self.current_time + next_process['burst_time'],
-                'priority': next_process['priority']
-            })
-            
-            # Update time and process completion
-            self.current_time += next_process['burst_time']
-            next_process['completion_time'] = self.current_time
-            next_process['turnaround_time'] = next_process['completion_time'] - next_process['arrival_time']
-            next_process['waiting_time'] = next_process['turnaround_time'] - next_process['burst_time']
-            next_process['remaining_time'] = 0
-            next_process['executed'] = True
-            completed += 1
-            
-            execution_steps.append(f"Time {self.current_time}: {next_process['id']} completed "
-                                  f"(CT: {next_process['completion_time']}, "
-                                  f"TAT: {next_process['turnaround_time']}, "
-                                  f"WT: {next_process['waiting_time']})")
+        summary = {
+            'processes': self.processes,
+            'gantt_chart': self.gantt_chart,
+            'avg_waiting_time': total_waiting_time / len(self.processes),
+            'avg_turnaround_time': total_turnaround_time / len(self.processes),
+            'total_time': self.current_time,
+            'policy': policy,
+            'trace_window': {'offset': offset, 'total': len(result['trace'])}
+        }
         
-        # Update the original processes with calculated times
-        for p in processes:
-            original_process = next((op for op in self.processes if op['id'] == p['id']), None)
-            if original_process:
-                original_process['completion_time'] = p['completion_time']
-                original_process['turnaround_time'] = p['turnaround_time']
-                original_process['waiting_time'] = p['waiting_time']
-                original_process['executed'] = True
+        # Sentences are only formatted for the requested window of the trace
+        if trace == 'compact':
+            end = len(result['trace']) if limit is None else offset + limit
+            summary['trace'] = result['trace'][offset:end]
+        else:
+            summary['execution_steps'] = describe_trace(result['trace'], self.processes, policy, offset, limit)
+        return summary
+
+    @synchronized
+    def iter_schedule(self, policy='priority', quantum=2, trace='text', max_slices=MAX_SLICES):
+        """Stream a schedule as step (or compact trace), segment, process and summary events
+
+        Neither the steps nor the Gantt chart are kept in memory and the
+        stored processes are left untouched.
+        """
+        if not self.processes:
+            raise Exception("No processes to schedule")
+        try:
+            quantum = validate_policy(policy, quantum)
+            check_slices(self.processes, policy, quantum, max_slices)
+        except ValueError as e:
+            raise Exception(str(e))
+        return self._schedule_events(list(self.processes), policy, quantum, trace == 'compact', max_slices)
+
+    def _schedule_events(self, processes, policy, quantum, compact, max_slices):
+        events = iter_schedule(processes, policy, quantum, max_slices)
+        narrator = TraceNarrator(processes, policy)
+        while True:
+            try:
+                kind, payload = next(events)
+            except StopIteration as stop:
+                completion_times, total_time = stop.value
+                break
+            if kind == 'event':
+                if compact:
+                    yield {'type': 'trace', 'event': payload}
+                else:
+                    yield {'type': 'step', 'text': narrator.describe(payload)}
+            else:
+                yield dict(payload, type='segment')
         
-        # Calculate averages
-        avg_waiting_time = sum(p['waiting_time'] for p in self.processes) / len(self.processes)
-        avg_turnaround_time = sum(p['turnaround_time'] for p in self.processes) / len(self.processes)
+        total_waiting_time = 0
+        total_turnaround_time = 0
+        for process, completion_time in zip(processes, completion_times):
+            turnaround_time = completion_time - process['arrival_time']
+            waiting_time = turnaround_time - process['burst_time']
+            total_waiting_time += waiting_time
+            total_turnaround_time += turnaround_time
+            yield {
+                'type': 'process',
+                'id': process['id'],
+                'arrival_time': process['arrival_time'],
+                'burst_time': process['burst_time'],
+                'priority': process['priority'],
+                'completion_time': completion_time,
+                'waiting_time': waiting_time,
+                'turnaround_time': turnaround_time
+            }
         
-        return {
-            'processes': self.processes,
-            'gantt_chart': self.gantt_chart,
-            'execution_steps': execution_steps,
-            'avg_waiting_time': avg_waiting_time,
-            'avg_turnaround_time': avg_turnaround_time,
-            'total_time': self.current_time
+        yield {
+            'type': 'summary',
+            'avg_waiting_time': total_waiting_time / len(processes),
+            'avg_turnaround_time': total_turnaround_time / len(processes),
+            'total_time': total_time,
+            'policy': policy
         }
 
     def get_processes(self):
         """Get all processes"""
         return self.processes
 
+    @synchronized
     def reset_scheduler(self):
         """Reset the scheduler"""
         self.processes = []
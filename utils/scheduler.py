@@ -0,0 +1,356 @@
+#scheduler.py
+import heapq
+from collections import deque
+
+POLICY_TITLES = {
+    'fcfs': 'First Come First Serve (FCFS) Scheduling Algorithm',
+    'sjf': 'Shortest Job First (SJF) Scheduling Algorithm (Non-Preemptive)',
+    'srtf': 'Shortest Remaining Time First (SRTF) Scheduling Algorithm (Preemptive)',
+    'priority': 'Priority Scheduling Algorithm (Non-Preemptive)',
+    'priority_preemptive': 'Priority Scheduling Algorithm (Preemptive)',
+    'round_robin': 'Round Robin Scheduling Algorithm',
+    'mlfq': 'Multilevel Feedback Queue Scheduling Algorithm',
+}
+POLICIES = tuple(POLICY_TITLES)
+
+# Compact trace opcodes. Every event is [opcode, time delta since the previous
+# event, operands...] and is only turned into a sentence when asked for.
+START = 0     # [START, 0]
+IDLE = 1      # [IDLE, dt, idle duration]
+RUN = 2       # [RUN, dt, process index, remaining before the slice]
+DONE = 3      # [DONE, dt, process index]
+PREEMPT = 4   # [PREEMPT, dt, process index, remaining, reason, reason arguments...]
+
+PREEMPT_REASONS = (
+    "preempted",
+    "quantum expired, moved to back of queue",
+    "used its quantum, demoted to level {}",
+    "preempted by a higher level arrival",
+)
+PREEMPTED, QUANTUM_EXPIRED, DEMOTED, HIGHER_LEVEL_ARRIVAL = range(len(PREEMPT_REASONS))
+
+# Most time slices a round robin schedule may take, bounding its run time and trace size
+MAX_SLICES = 1000000
+
+
+class Timeline:
+    """Event core shared by every policy: arrivals, clock, Gantt chart and trace
+
+    Arrivals are sorted once and consumed through a cursor, idle gaps are
+    skipped in a single jump and consecutive slices of the same process
+    are merged into one Gantt segment. Trace events and closed segments go
+    to the on_event/on_segment sinks, which collect into lists unless replaced.
+    """
+
+    def __init__(self, processes, on_event=None, on_segment=None):
+        self.processes = processes
+        self.total = len(processes)
+        self.arrivals = sorted(range(self.total), key=lambda i: processes[i]['arrival_time'])
+        self.next_arrival = 0
+        self.current_time = 0
+        self.remaining = [p['burst_time'] for p in processes]
+        self.completion_times = [0] * self.total
+        self.completed = 0
+        self.gantt_chart = []
+        self.trace = []
+        self.on_event = on_event or self.trace.append
+        self.on_segment = on_segment or self.gantt_chart.append
+        self.segment = None  # open Gantt segment, emitted once closed
+        self.segment_index = None
+        self.traced_time = 0  # time of the last trace event, for the deltas
+        self.on_event([START, 0])
+
+    def emit(self, opcode, *operands):
+        self.on_event([opcode, self.current_time - self.traced_time, *operands])
+        self.traced_time = self.current_time
+
+    def admit(self):
+        """Yield the positions of processes that have arrived by the current time"""
+        arrivals = self.arrivals
+        processes = self.processes
+        while (self.next_arrival < self.total
+               and processes[arrivals[self.next_arrival]]['arrival_time'] <= self.current_time):
+            self.next_arrival += 1
+            yield arrivals[self.next_arrival - 1]
+
+    def next_arrival_time(self):
+        if self.next_arrival < self.total:
+            return self.processes[self.arrivals[self.next_arrival]]['arrival_time']
+        return None
+
+    def idle(self):
+        """Jump straight to the next arrival instead of ticking through the gap"""
+        idle_until = self.next_arrival_time()
+        self.emit(IDLE, idle_until - self.current_time)
+        self.current_time = idle_until
+
+    def run(self, index, duration):
+        """Run a process for a slice of time and complete it if nothing remains"""
+        process = self.processes[index]
+        start_time = self.current_time
+        end_time = start_time + duration
+
+        if self.segment_index == index and self.segment['end_time'] == start_time:
+            self.segment['end_time'] = end_time
+        else:
+            self.close_segment()
+            self.emit(RUN, index, self.remaining[index])
+            self.segment = {
+                'process': process['id'],
+                'start_time': start_time,
+                'end_time': end_time,
+                'priority': process['priority']
+            }
+            self.segment_index = index
+
+        self.current_time = end_time
+        self.remaining[index] -= duration
+        if self.remaining[index] == 0:
+            self.complete(index)
+
+    def complete(self, index):
+        self.completion_times[index] = self.current_time
+        self.completed += 1
+        self.emit(DONE, index)
+
+    def preempt(self, index, reason, *arguments):
+        self.emit(PREEMPT, index, self.remaining[index], reason, *arguments)
+
+    def close_segment(self):
+        if self.segment is not None:
+            self.on_segment(self.segment)
+            self.segment = None
+            self.segment_index = None
+
+    def result(self):
+        self.close_segment()
+        return {
+            'completion_times': self.completion_times,
+            'gantt_chart': self.gantt_chart,
+            'trace': self.trace,
+            'total_time': self.current_time
+        }
+
+
+class TraceNarrator:
+    """Turns compact trace events back into the execution step sentences"""
+
+    def __init__(self, processes, policy, time=0):
+        self.processes = processes
+        self.title = POLICY_TITLES[policy]
+        self.time = time
+
+    def describe(self, event):
+        opcode = event[0]
+        self.time += event[1]
+        if opcode == START:
+            return f"Starting {self.title}..."
+        if opcode == IDLE:
+            return f"Time {self.time}: No process available, CPU idle until {self.time + event[2]}"
+
+        process = self.processes[event[2]]
+        if opcode == RUN:
+            remaining = event[3]
+            detail = f", Remaining: {remaining}" if remaining != process['burst_time'] else ""
+            return (f"Time {self.time}: Executing {process['id']} "
+                    f"(Priority: {process['priority']}, Burst Time: {process['burst_time']}{detail})")
+        if opcode == DONE:
+            turnaround_time = self.time - process['arrival_time']
+            return (f"Time {self.time}: {process['id']} completed "
+                    f"(CT: {self.time}, "
+                    f"TAT: {turnaround_time}, "
+                    f"WT: {turnaround_time - process['burst_time']})")
+        reason = PREEMPT_REASONS[event[4]].format(*event[5:])
+        return f"Time {self.time}: {process['id']} {reason} (Remaining: {event[3]})"
+
+
+def describe_trace(trace, processes, policy, offset=0, limit=None):
+    """Render the sentences for a window of a trace, nothing outside it is formatted"""
+    end = len(trace) if limit is None else offset + limit
+    # The clock at the window start is the sum of the deltas before it
+    narrator = TraceNarrator(processes, policy, sum(event[1] for event in trace[:offset]))
+    return [narrator.describe(event) for event in trace[offset:end]]
+
+
+# Policy loops are generators that yield once per event so callers can
+# drain the timeline sinks incrementally while the simulation runs
+
+def _run_heap_policy(timeline, key, preemptive):
+    """Ready processes wait in a heap ordered by key(timeline, index)"""
+    ready = []
+    running = None
+
+    while timeline.completed < timeline.total:
+        yield
+        for index in timeline.admit():
+            heapq.heappush(ready, key(timeline, index) + (index,))
+
+        if running is None:
+            if not ready:
+                timeline.idle()
+                continue
+            running = heapq.heappop(ready)[-1]
+        elif preemptive and ready and ready[0][0] < key(timeline, running)[0]:
+            # Only a strictly better primary key preempts, ties keep the CPU
+            timeline.preempt(running, PREEMPTED)
+            heapq.heappush(ready, key(timeline, running) + (running,))
+            running = heapq.heappop(ready)[-1]
+
+        duration = timeline.remaining[running]
+        if preemptive:
+            # Run until the next arrival at most, then reconsider
+            next_time = timeline.next_arrival_time()
+            if next_time is not None:
+                duration = min(duration, next_time - timeline.current_time)
+
+        timeline.run(running, duration)
+        if timeline.remaining[running] == 0:
+            running = None
+
+
+def _run_round_robin(timeline, quantum):
+    ready = deque()
+
+    while timeline.completed < timeline.total:
+        yield
+        ready.extend(timeline.admit())
+        if not ready:
+            timeline.idle()
+            continue
+
+        index = ready.popleft()
+        slice_time = min(quantum, timeline.remaining[index])
+        if not ready:
+            # Alone on the CPU it keeps getting quanta, so run them all at once,
+            # up to the end of the quantum the next arrival falls in
+            next_time = timeline.next_arrival_time()
+            if next_time is None:
+                slice_time = timeline.remaining[index]
+            else:
+                quanta = -(-(next_time - timeline.current_time) // quantum)
+                slice_time = min(quanta * quantum, timeline.remaining[index])
+        timeline.run(index, slice_time)
+
+        # Processes that arrived during the slice queue up ahead of the preempted one
+        ready.extend(timeline.admit())
+        if timeline.remaining[index] > 0:
+            if ready:
+                timeline.preempt(index, QUANTUM_EXPIRED)
+            ready.append(index)
+
+
+def _run_mlfq(timeline, quantum, levels=3):
+    # Quantum doubles per level, the last level runs first come first serve
+    quanta = [quantum * 2 ** level for level in range(levels - 1)] + [None]
+    queues = [deque() for _ in range(levels)]
+
+    while timeline.completed < timeline.total:
+        yield
+        queues[0].extend(timeline.admit())
+
+        level = next((i for i, q in enumerate(queues) if q), None)
+        if level is None:
+            timeline.idle()
+            continue
+
+        index = queues[level].popleft()
+        slice_time = timeline.remaining[index]
+        if quanta[level] is not None:
+            slice_time = min(slice_time, quanta[level])
+        if level > 0:
+            # New arrivals enter the top level and preempt lower levels
+            next_time = timeline.next_arrival_time()
+            if next_time is not None:
+                slice_time = min(slice_time, next_time - timeline.current_time)
+
+        timeline.run(index, slice_time)
+        if timeline.remaining[index] == 0:
+            continue
+
+        if slice_time == quanta[level]:
+            timeline.preempt(index, DEMOTED, level + 1)
+            queues[level + 1].append(index)
+        else:
+            timeline.preempt(index, HIGHER_LEVEL_ARRIVAL)
+            queues[level].appendleft(index)
+
+
+# Heap keys per policy; the process position is appended as the final tie-breaker
+HEAP_POLICIES = {
+    'fcfs': (lambda t, i: (t.processes[i]['arrival_time'],), False),
+    'sjf': (lambda t, i: (t.processes[i]['burst_time'], t.processes[i]['arrival_time']), False),
+    'srtf': (lambda t, i: (t.remaining[i], t.processes[i]['arrival_time']), True),
+    'priority': (lambda t, i: (t.processes[i]['priority'], t.processes[i]['arrival_time']), False),
+    'priority_preemptive': (lambda t, i: (t.processes[i]['priority'], t.processes[i]['arrival_time']), True),
+}
+
+
+def _simulate(timeline, policy, quantum):
+    if policy in HEAP_POLICIES:
+        key, preemptive = HEAP_POLICIES[policy]
+        return _run_heap_policy(timeline, key, preemptive)
+    if policy == 'round_robin':
+        return _run_round_robin(timeline, quantum)
+    return _run_mlfq(timeline, quantum)
+
+
+def validate_policy(policy, quantum):
+    """Check the policy name and return the quantum as an int"""
+    if policy not in POLICY_TITLES:
+        raise ValueError(f"Unknown scheduling policy: {policy}")
+    quantum = int(quantum)
+    if quantum < 1:
+        raise ValueError("Time quantum must be at least 1")
+    return quantum
+
+
+def check_slices(processes, policy, quantum, max_slices=MAX_SLICES):
+    """Reject a round robin schedule that could take more than max_slices time slices
+
+    The other policies slice each process a bounded number of times (once
+    per level or per arrival), so only round robin is counted.
+    """
+    if policy != 'round_robin' or max_slices is None:
+        return
+    slices = 0
+    for process in processes:
+        slices += -(-process['burst_time'] // quantum)
+        if slices > max_slices:
+            raise ValueError(f"Round robin would take more than {max_slices} time slices, "
+                             f"use a larger quantum or shorter bursts")
+
+
+def schedule(processes, policy='priority', quantum=2, max_slices=MAX_SLICES):
+    """Simulate a CPU scheduling policy over processes
+
+    Returns per-process completion times indexed like ``processes`` along
+    with the merged Gantt chart, compact trace and total time.
+    """
+    quantum = validate_policy(policy, quantum)
+    check_slices(processes, policy, quantum, max_slices)
+    timeline = Timeline(processes)
+    for _ in _simulate(timeline, policy, quantum):
+        pass
+    return timeline.result()
+
+
+def iter_schedule(processes, policy='priority', quantum=2, max_slices=MAX_SLICES):
+    """Simulate a policy and yield ('event', list) and ('segment', dict) events as they happen
+
+    Nothing but the per-process completion times is retained, so memory
+    stays flat however long the schedule is. The generator returns the
+    completion times and total time when exhausted.
+    """
+    quantum = validate_policy(policy, quantum)
+    check_slices(processes, policy, quantum, max_slices)
+    pending = deque()
+    timeline = Timeline(processes,
+                        on_event=lambda event: pending.append(('event', event)),
+                        on_segment=lambda segment: pending.append(('segment', segment)))
+    for _ in _simulate(timeline, policy, quantum):
+        while pending:
+            yield pending.popleft()
+    timeline.close_segment()
+    while pending:
+        yield pending.popleft()
+    return timeline.completion_times, timeline.current_time
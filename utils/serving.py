@@ -0,0 +1,127 @@
+#serving.py
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from array import array
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.security import safe_join
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, responses fall back to the standard json module
+    orjson = None
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 512
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson, keeping the standard provider's output format
+
+    Keys are sorted like the default provider's. Values orjson rejects
+    (ints beyond 64 bits, for one) go through the standard encoder instead.
+    """
+
+    OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    @staticmethod
+    def default(value):
+        if isinstance(value, array):
+            return value.tolist()
+        return DefaultJSONProvider.default(value)
+
+    def _encode(self, obj):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+        except TypeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            encoded = self._encode(obj)
+            if encoded is not None:
+                return encoded.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        # Pretty printing (debug mode) is left to the standard encoder
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        encoded = self._encode(self._prepare_response_obj(args, kwargs))
+        if encoded is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(encoded + b'\n', mimetype=self.mimetype)
+
+
+class CachedBody:
+    """A response body with its gzipped copy and ETag, computed once"""
+
+    __slots__ = ('body', 'gzipped', 'etag', 'mimetype', 'stamp')
+
+    def __init__(self, body, mimetype, stamp=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.stamp = stamp
+        self.etag = hashlib.sha1(body).hexdigest()
+        # mtime=0 keeps the gzipped bytes (and so their ETag) stable across restarts
+        self.gzipped = gzip.compress(body, 9, mtime=0) if len(body) >= GZIP_MIN_SIZE else None
+
+
+class AssetCache:
+    """Static files held in memory, precompressed, and reloaded when they change on disk"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, filename):
+        """Get the cached body of a file, or None if there is no such file"""
+        path = safe_join(self.directory, filename)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(path)
+        if entry is None or entry.stamp != stamp:
+            with open(path, 'rb') as f:
+                body = f.read()
+            mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            entry = CachedBody(body, mimetype, stamp)
+            with self.lock:
+                self.entries[path] = entry
+        return entry
+
+    def precompress(self):
+        """Load and compress every file up front, so no request pays for it"""
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                self.get(os.path.relpath(os.path.join(root, filename), self.directory))
+
+
+class PageCache:
+    """Rendered pages, keyed by template and anything else the rendering depends on"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, key, render):
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = CachedBody(render().encode('utf-8'), 'text/html')
+            with self.lock:
+                self.entries[key] = entry
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,60 @@
+#session_registry.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionRegistry:
+    """Per-session data structure instances with LRU/TTL eviction"""
+
+    def __init__(self, factory, max_sessions=10000, ttl=1800, clock=time.monotonic):
+        # factory() builds the dict of structures for a new session
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self.sessions = OrderedDict()  # session_id -> (last_access, structures)
+        self.lock = threading.Lock()
+
+    def get(self, session_id):
+        """Get the structures of a session, creating them if needed"""
+        now = self.clock()
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is not None and now - entry[0] <= self.ttl:
+                structures = entry[1]
+            else:
+                structures = self.factory()
+            self.sessions[session_id] = (now, structures)
+            # Recreated expired entries move too, eviction relies on LRU order
+            self.sessions.move_to_end(session_id)
+            self._evict(now)
+            return structures
+
+    def drop(self, session_id):
+        """Discard a session and all of its structures"""
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def evict_expired(self):
+        """Remove idle sessions whose TTL has elapsed"""
+        with self.lock:
+            return self._evict(self.clock())
+
+    def _evict(self, now):
+        # Oldest entries sit at the front, so stop at the first live one
+        evicted = 0
+        while self.sessions:
+            session_id, (last_access, _) = next(iter(self.sessions.items()))
+            if len(self.sessions) > self.max_sessions or now - last_access > self.ttl:
+                del self.sessions[session_id]
+                evicted += 1
+            else:
+                break
+        return evicted
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self.sessions
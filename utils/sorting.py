@@ -0,0 +1,333 @@
+#sorting.py
+import bisect
+import random
+import time
+from array import array
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, the fast mode falls back to array and the builtin sort
+    numpy = None
+
+# Compact trace opcodes, every event is [opcode, operands...] of array positions
+COMPARE = 0   # [COMPARE, i, j]
+SWAP = 1      # [SWAP, i, j]
+WRITE = 2     # [WRITE, i, value]
+PROBE = 3     # [PROBE, low, index, high]
+
+
+class OperationCounter:
+    """Counts comparisons, swaps and writes, and records them when tracing"""
+
+    __slots__ = ('comparisons', 'swaps', 'writes', 'trace')
+
+    def __init__(self, trace=None):
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.trace = trace
+
+    def less(self, values, i, j):
+        self.comparisons += 1
+        if self.trace is not None:
+            self.trace.append([COMPARE, i, j])
+        return values[i] < values[j]
+
+    def less_value(self, a, b, i, j):
+        """Compare two values held outside the array, reported at their positions i and j"""
+        self.comparisons += 1
+        if self.trace is not None:
+            self.trace.append([COMPARE, i, j])
+        return a < b
+
+    def swap(self, values, i, j):
+        self.swaps += 1
+        if self.trace is not None:
+            self.trace.append([SWAP, i, j])
+        values[i], values[j] = values[j], values[i]
+
+    def write(self, values, i, value):
+        self.writes += 1
+        if self.trace is not None:
+            self.trace.append([WRITE, i, value])
+        values[i] = value
+
+    def probe(self, low, index, high):
+        self.comparisons += 1
+        if self.trace is not None:
+            self.trace.append([PROBE, low, index, high])
+
+    def to_dict(self):
+        return {'comparisons': self.comparisons, 'swaps': self.swaps, 'writes': self.writes}
+
+
+def quick_sort(values, counter):
+    """Quicksort with three-way partitioning, so runs of equal values stay linear
+
+    Uses an explicit stack and handles the smaller side first, keeping
+    the stack depth logarithmic.
+    """
+    pending = [(0, len(values) - 1)]
+    while pending:
+        low, high = pending.pop()
+        if low >= high:
+            continue
+        middle = (low + high) // 2
+        if middle != low:
+            counter.swap(values, low, middle)  # middle element as the pivot
+
+        # values[low:lt] < pivot, values[lt:i] == pivot, values[gt + 1:high + 1] > pivot
+        lt, i, gt = low, low + 1, high
+        while i <= gt:
+            if counter.less(values, i, lt):
+                counter.swap(values, lt, i)
+                lt += 1
+                i += 1
+            elif counter.less(values, lt, i):
+                if i != gt:
+                    counter.swap(values, i, gt)
+                gt -= 1
+            else:
+                i += 1
+
+        if lt - low < high - gt:
+            pending.append((gt + 1, high))
+            pending.append((low, lt - 1))
+        else:
+            pending.append((low, lt - 1))
+            pending.append((gt + 1, high))
+
+
+def merge_sort(values, counter):
+    """Bottom-up merge sort, merging runs of doubling width"""
+    n = len(values)
+    width = 1
+    while width < n:
+        for low in range(0, n, 2 * width):
+            middle = min(low + width, n)
+            high = min(low + 2 * width, n)
+            if middle >= high:
+                continue
+            left = values[low:middle]
+            right = values[middle:high]
+            i = j = 0
+            position = low
+            while i < len(left) and j < len(right):
+                # Taking from the right only when strictly smaller keeps the sort stable
+                if counter.less_value(right[j], left[i], middle + j, low + i):
+                    counter.write(values, position, right[j])
+                    j += 1
+                else:
+                    counter.write(values, position, left[i])
+                    i += 1
+                position += 1
+            for value in left[i:] + right[j:]:
+                counter.write(values, position, value)
+                position += 1
+        width *= 2
+
+
+def heap_sort(values, counter):
+    """Build a max heap in place, then repeatedly move the maximum to the end"""
+    n = len(values)
+
+    def sift_down(root, end):
+        while 2 * root + 1 < end:
+            child = 2 * root + 1
+            if child + 1 < end and counter.less(values, child, child + 1):
+                child += 1
+            if not counter.less(values, root, child):
+                return
+            counter.swap(values, root, child)
+            root = child
+
+    for start in range(n // 2 - 1, -1, -1):
+        sift_down(start, n)
+    for end in range(n - 1, 0, -1):
+        counter.swap(values, 0, end)
+        sift_down(0, end)
+
+
+def radix_sort(values, counter, base=10):
+    """LSD radix sort on integers, shifted by the minimum so negatives work"""
+    if not values:
+        return
+    if not all(isinstance(value, int) for value in values):
+        raise Exception("Radix sort needs integer values")
+    smallest = min(values)
+    largest = max(values) - smallest
+    place = 1
+    while place <= largest:
+        buckets = [[] for _ in range(base)]
+        for value in values:
+            buckets[(value - smallest) // place % base].append(value)
+        position = 0
+        for bucket in buckets:
+            for value in bucket:
+                counter.write(values, position, value)
+                position += 1
+        place *= base
+
+
+def insertion_sort(values, counter):
+    for i in range(1, len(values)):
+        j = i
+        while j > 0 and counter.less(values, j, j - 1):
+            counter.swap(values, j, j - 1)
+            j -= 1
+
+
+def binary_search(values, target, counter):
+    """Get the index of target in sorted values, or -1"""
+    low, high = 0, len(values) - 1
+    while low <= high:
+        middle = (low + high) // 2
+        counter.probe(low, middle, high)
+        if values[middle] == target:
+            return middle
+        if values[middle] < target:
+            low = middle + 1
+        else:
+            high = middle - 1
+    return -1
+
+
+def linear_search(values, target, counter):
+    for index, value in enumerate(values):
+        counter.probe(index, index, index)
+        if value == target:
+            return index
+    return -1
+
+
+SORTS = {
+    'quick_sort': quick_sort,
+    'merge_sort': merge_sort,
+    'heap_sort': heap_sort,
+    'radix_sort': radix_sort,
+    'insertion_sort': insertion_sort,
+}
+SEARCHES = {'binary_search': binary_search, 'linear_search': linear_search}
+
+
+def is_sorted(values):
+    return all(values[i] <= values[i + 1] for i in range(len(values) - 1))
+
+
+def run_counted(algorithm, values, target=None, trace=None):
+    """Run the instrumented algorithm on a copy of values and count its operations"""
+    values = list(values)
+    counter = OperationCounter(trace)
+    started = time.perf_counter()
+    try:
+        if algorithm in SORTS:
+            SORTS[algorithm](values, counter)
+            result = {'values': values}
+        else:
+            if algorithm == 'binary_search' and not is_sorted(values):
+                raise Exception("Binary search needs sorted values")
+            result = {'index': SEARCHES[algorithm](values, target, counter)}
+    except TypeError:
+        raise Exception("Values must be comparable numbers")
+    result['wall_time_ms'] = (time.perf_counter() - started) * 1000
+    result.update(counter.to_dict())
+    return result
+
+
+def generate_values(size, seed=None, max_value=1000000):
+    """Random integers for benchmarks, as a NumPy array when available"""
+    if numpy is not None:
+        return numpy.random.default_rng(seed).integers(0, max_value, size, dtype=numpy.int64)
+    rng = random.Random(seed)
+    return array('q', (rng.randrange(max_value) for _ in range(size)))
+
+
+def _numpy_radix_sort(values):
+    # One stable pass per byte over non-negative shifted keys
+    keys = values - values.min() if len(values) else values
+    order = numpy.arange(len(values))
+    largest = int(keys.max()) if len(keys) else 0
+    shift = 0
+    while largest >> shift:
+        digits = (keys[order] >> shift) & 0xFF
+        order = order[numpy.argsort(digits, kind='stable')]
+        shift += 8
+    return values[order]
+
+
+NUMPY_SORT_KINDS = {
+    'quick_sort': 'quicksort',
+    'merge_sort': 'stable',
+    'heap_sort': 'heapsort',
+    'insertion_sort': 'stable',
+}
+
+
+def run_fast(algorithm, values, target=None):
+    """Run the fastest available implementation, timing it but counting nothing
+
+    With NumPy, sorts use the matching numpy.sort kind (radix sort is
+    vectorised per byte) and searches run on the array. Without it, values
+    sit in an array buffer and the builtin sort and bisect are used.
+    """
+    if numpy is not None:
+        data = values if isinstance(values, numpy.ndarray) else numpy.asarray(values)
+        if data.dtype.kind not in 'iuf':
+            raise Exception("Values must be numbers")
+        if algorithm == 'binary_search' and not numpy.all(data[:-1] <= data[1:]):
+            raise Exception("Binary search needs sorted values")
+        started = time.perf_counter()
+        if algorithm == 'radix_sort':
+            if data.dtype.kind not in 'iu':
+                raise Exception("Radix sort needs integer values")
+            result = {'values': _numpy_radix_sort(data)}
+        elif algorithm in SORTS:
+            result = {'values': numpy.sort(data, kind=NUMPY_SORT_KINDS[algorithm])}
+        elif algorithm == 'binary_search':
+            index = int(numpy.searchsorted(data, target))
+            result = {'index': index if index < len(data) and data[index] == target else -1}
+        else:
+            matches = numpy.flatnonzero(data == target)
+            result = {'index': int(matches[0]) if len(matches) else -1}
+        engine = 'numpy'
+    else:
+        data = values
+        if not isinstance(data, array):
+            typecode = 'q' if all(isinstance(value, int) for value in values) else 'd'
+            try:
+                data = array(typecode, values)
+            except (TypeError, OverflowError):
+                raise Exception("Values must be numbers")
+        if algorithm == 'binary_search' and not is_sorted(data):
+            raise Exception("Binary search needs sorted values")
+        started = time.perf_counter()
+        if algorithm in SORTS:
+            if algorithm == 'radix_sort' and data.typecode != 'q':
+                raise Exception("Radix sort needs integer values")
+            result = {'values': array(data.typecode, sorted(data))}
+        elif algorithm == 'binary_search':
+            index = bisect.bisect_left(data, target)
+            result = {'index': index if index < len(data) and data[index] == target else -1}
+        else:
+            try:
+                result = {'index': data.index(target)}
+            except ValueError:
+                result = {'index': -1}
+        engine = 'builtin'
+    result['wall_time_ms'] = (time.perf_counter() - started) * 1000
+    result['engine'] = engine
+    return result
+
+
+def describe_event(event):
+    """Render one compact trace event as a sentence"""
+    opcode = event[0]
+    if opcode == COMPARE:
+        return f"Compare positions {event[1]} and {event[2]}"
+    if opcode == SWAP:
+        return f"Swap positions {event[1]} and {event[2]}"
+    if opcode == WRITE:
+        return f"Write {event[2]} to position {event[1]}"
+    if event[1] == event[3]:
+        return f"Check position {event[2]}"
+    return f"Check middle position {event[2]} of {event[1]}..{event[3]}"
@@ -1,19 +1,82 @@
+import threading
+
+from utils.change_log import ChangeLog
+from utils.history import HISTORY_LIMIT, History, PersistentStack
+from utils.locking import synchronized
+from utils.typed_buffer import check_capacity, check_element_type, coerce_value, new_buffer
+
+
+def apply_history_operation(data, op):
+    """Make the next persistent version of a stack from an operation"""
+    name = op[0]
+    if name == 'push':
+        return data.push(op[1])
+    if name == 'pop':
+        return data.pop()
+    if name == 'clear':
+        return PersistentStack()
+    # configure, converting the values to the new element type
+    return PersistentStack.from_list([coerce_value(op[2], value) for value in data.to_list()])
+
+
 class Stack:
-    def __init__(self, capacity=10):
-        self.capacity = capacity
-        self.elements = []
+    """Stack with an optional capacity (None is unbounded)
+
+    With an element_type of 'int' or 'float' the values live unboxed in
+    a typed array instead of a list. Every change is also recorded in a
+    persistent history, which undo, redo and jump restore from.
+    """
+
+    __slots__ = ('capacity', 'element_type', 'elements', 'changes', 'history', 'lock')
+
+    def __init__(self, capacity=10, element_type=None, history_limit=HISTORY_LIMIT):
+        self.lock = threading.RLock()
+        self.capacity = check_capacity(capacity)
+        self.element_type = check_element_type(element_type)
+        self.elements = new_buffer(element_type)
+        self.changes = ChangeLog()
+        self.history = History(apply_history_operation, PersistentStack(), self._config(), history_limit)
+    
+    def _config(self):
+        return (self.capacity, self.element_type)
     
+    @synchronized
     def push(self, value):
         if self.is_full():
             raise Exception("Stack overflow")
+        value = coerce_value(self.element_type, value)
         self.elements.append(value)
+        self.changes.record('push', value=value)
+        self.history.record(['push', value], self._config())
         return True
     
+    @synchronized
     def pop(self):
         if self.is_empty():
             raise Exception("Stack underflow")
-        return self.elements.pop()
+        value = self.elements.pop()
+        self.changes.record('pop')
+        self.history.record(['pop'], self._config())
+        return value
+    
+    @synchronized
+    def push_many(self, values):
+        """Push every value, or none of them if they do not all fit"""
+        values = [coerce_value(self.element_type, value) for value in values]
+        if self.capacity is not None and len(self.elements) + len(values) > self.capacity:
+            raise Exception("Stack overflow")
+        for value in values:
+            self.push(value)
+        return len(values)
+    
+    @synchronized
+    def pop_many(self, count):
+        """Pop count values (top first), or none if fewer are stored"""
+        if count > len(self.elements):
+            raise Exception("Stack underflow")
+        return [self.pop() for _ in range(count)]
     
+    @synchronized
     def peek(self):
         if self.is_empty():
             return None
@@ -26,10 +89,93 @@ class Stack:
         return len(self.elements) == 0
     
     def is_full(self):
-        return len(self.elements) >= self.capacity
+        return self.capacity is not None and len(self.elements) >= self.capacity
     
+    @synchronized
     def clear(self):
-        self.elements = []
+        self.elements = new_buffer(self.element_type)
+        self.changes.record('clear')
+        self.history.record(['clear'], self._config())
+    
+    @synchronized
+    def configure(self, capacity, element_type):
+        """Change the capacity and element type, converting the current values"""
+        capacity = check_capacity(capacity)
+        element_type = check_element_type(element_type)
+        if capacity is not None and len(self.elements) > capacity:
+            raise Exception("Capacity is smaller than the current size")
+        elements = new_buffer(element_type, (coerce_value(element_type, value) for value in self.elements))
+        self.capacity = capacity
+        self.element_type = element_type
+        self.elements = elements
+        self.changes.record('configure', capacity=capacity, element_type=element_type)
+        self.history.record(['configure', capacity, element_type], self._config())
+        return self.get_config()
+    
+    @synchronized
+    def get_config(self):
+        return {'capacity': self.capacity, 'element_type': self.element_type}
+    
+    def _restore(self, version):
+        data, (capacity, element_type) = version
+        self.capacity = capacity
+        self.element_type = element_type
+        self.elements = new_buffer(element_type, data.to_list())
+        # Clients cannot replay a jump as a delta, make them resync
+        self.changes.restart()
+        return self.history.position()
+    
+    @synchronized
+    def undo(self):
+        return self._restore(self.history.undo())
+    
+    @synchronized
+    def redo(self):
+        return self._restore(self.history.redo())
+    
+    @synchronized
+    def jump(self, step):
+        """Restore the stack as it was after a step of its history"""
+        return self._restore(self.history.jump(step))
+    
+    @synchronized
+    def get_history(self, offset=0, limit=None):
+        return self.history.describe(offset, limit)
     
+    @synchronized
     def to_list(self):
-        return self.elements.copy()
\ No newline at end of file
+        return list(self.elements)
+
+    @synchronized
+    def to_state(self):
+        """Get a plain snapshot of the stack for serialization"""
+        return {
+            'type': 'stack',
+            'capacity': self.capacity,
+            'element_type': self.element_type,
+            'elements': list(self.elements),
+            'changes': self.changes.to_state(),
+            'history': self.history.to_state(PersistentStack.to_list)
+        }
+
+    @synchronized
+    def load_state(self, state):
+        """Replace the contents of this stack with a snapshot"""
+        self.capacity = state['capacity']
+        self.element_type = state.get('element_type')
+        self.elements = new_buffer(self.element_type, state['elements'])
+        if 'changes' in state:
+            self.changes.load_state(state['changes'])
+        if 'history' in state:
+            self.history.load_state(state['history'], PersistentStack.from_list)
+        else:
+            # Older snapshots and scenarios start a new history from their contents
+            self.history = History(apply_history_operation, PersistentStack.from_list(self.to_list()),
+                                   self._config(), self.history.limit)
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a stack from a snapshot made by to_state"""
+        stack = cls(capacity=state['capacity'], element_type=state.get('element_type'))
+        stack.load_state(state)
+        return stack
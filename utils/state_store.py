@@ -0,0 +1,348 @@
+#state_store.py
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+
+from utils.linked_list import LinkedList
+from utils.queue import Queue
+from utils.session_registry import SessionRegistry
+from utils.stack import Stack
+
+try:
+    import redis
+except ImportError:  # redis is optional, LocalRedis is used instead
+    redis = None
+
+# Snapshot format: one version byte followed by zlib-compressed compact JSON
+SNAPSHOT_VERSION = 1
+STRUCTURE_TYPES = {'stack': Stack, 'queue': Queue, 'linked_list': LinkedList}
+
+
+def dumps(structure):
+    """Serialize a structure snapshot to compact bytes"""
+    payload = json.dumps(structure.to_state(), separators=(',', ':')).encode('utf-8')
+    return bytes([SNAPSHOT_VERSION]) + zlib.compress(payload)
+
+
+def loads(blob):
+    """Rebuild a structure from bytes produced by dumps"""
+    if not blob or blob[0] != SNAPSHOT_VERSION:
+        raise ValueError("Unsupported snapshot format")
+    state = json.loads(zlib.decompress(blob[1:]))
+    return STRUCTURE_TYPES[state['type']].from_state(state)
+
+
+class MemoryStateStore:
+    """Keeps live structures in process memory (single worker only)"""
+
+    def __init__(self, builders, max_sessions=10000, ttl=1800):
+        # builders maps each structure name to a callable creating an empty one
+        self.builders = builders
+        self.registry = SessionRegistry(dict, max_sessions=max_sessions, ttl=ttl)
+
+    @contextmanager
+    def open(self, session_id, name, read_only=False):
+        structures = self.registry.get(session_id)
+        structure = structures.get(name)
+        if structure is None:
+            structure = structures.setdefault(name, self.builders[name]())
+        # Held for the whole request, so batches and rollbacks are atomic to other requests
+        with structure.lock:
+            yield structure
+
+    def drop(self, session_id):
+        self.registry.drop(session_id)
+
+    def snapshot(self):
+        """Get the state of every live structure, keyed by session id and structure name"""
+        with self.registry.lock:
+            sessions = [(session_id, dict(structures))
+                        for session_id, (_, structures) in self.registry.sessions.items()]
+        return {session_id: {name: structure.to_state() for name, structure in structures.items()}
+                for session_id, structures in sessions}
+
+    def restore(self, states):
+        """Rebuild structures from the output of snapshot"""
+        for session_id, structures in states.items():
+            target = self.registry.get(session_id)
+            for name, state in structures.items():
+                target[name] = STRUCTURE_TYPES[state['type']].from_state(state)
+
+
+class SerializedStateStore(ABC):
+    """Base class for stores shared between processes through snapshots"""
+
+    def __init__(self, builders, ttl=1800):
+        self.builders = builders
+        self.ttl = ttl
+
+    @abstractmethod
+    def _lock(self, key, read_only=False):
+        """Get a context manager that makes reading and writing key atomic"""
+
+    @abstractmethod
+    def _read(self, key):
+        pass
+
+    @abstractmethod
+    def _write(self, key, blob):
+        pass
+
+    @abstractmethod
+    def _delete(self, key):
+        pass
+
+    def _touch(self, key):
+        # Refresh the TTL of an entry that was read but not modified
+        pass
+
+    @contextmanager
+    def open(self, session_id, name, read_only=False):
+        """Load a structure for one request, writing it back afterwards unless read_only"""
+        key = f"{session_id}:{name}"
+        with self._lock(key, read_only):
+            blob = self._read(key)
+            structure = loads(blob) if blob else self.builders[name]()
+            yield structure
+            # Only write back when the operation actually changed something
+            if not read_only:
+                new_blob = dumps(structure)
+                if new_blob != blob:
+                    self._write(key, new_blob)
+                    return
+        # Outside the lock, so read-only requests never hold a write lock for long
+        if blob:
+            self._touch(key)
+
+    def drop(self, session_id):
+        for name in self.builders:
+            self._delete(f"{session_id}:{name}")
+
+
+class SQLiteStateStore(SerializedStateStore):
+    """Snapshots in a memory-mapped SQLite file shared by all workers on a host"""
+
+    PURGE_EVERY = 256
+
+    def __init__(self, builders, path='dsa_state.db', ttl=1800, max_entries=100000,
+                 mmap_size=256 * 1024 * 1024):
+        super().__init__(builders, ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self.mmap_size = mmap_size
+        self.local = threading.local()
+        self.writes = 0
+        conn = self._connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS state "
+                     "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS state_expires ON state (expires_at)")
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            # Autocommit mode, transactions are managed explicitly in _lock
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def _lock(self, key, read_only=False):
+        # BEGIN IMMEDIATE takes the write lock so read-modify-write is atomic across processes;
+        # reads use a deferred transaction, which WAL mode lets run alongside the writer
+        conn = self._connection()
+        conn.execute("BEGIN DEFERRED" if read_only else "BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _read(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM state WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def _write(self, key, blob):
+        conn = self._connection()
+        conn.execute("INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                     (key, blob, time.time() + self.ttl))
+        self.writes += 1
+        if self.writes % self.PURGE_EVERY == 0:
+            self._purge(conn)
+
+    def _touch(self, key):
+        # Only refresh once half the TTL has passed, so most reads never wait for the write lock
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute("SELECT expires_at FROM state WHERE key = ?", (key,)).fetchone()
+        if row and row[0] - now < self.ttl / 2:
+            conn.execute("UPDATE state SET expires_at = ? WHERE key = ?", (now + self.ttl, key))
+
+    def _delete(self, key):
+        self._connection().execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def _purge(self, conn):
+        # Drop expired sessions, then the least recently written ones above the cap
+        conn.execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),))
+        conn.execute("DELETE FROM state WHERE key IN (SELECT key FROM state "
+                     "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of the redis-py client used here"""
+
+    SWEEP_EVERY = 256
+
+    def __init__(self):
+        self.data = {}  # name -> (value, expires_at or None)
+        self.data_lock = threading.Lock()
+        self.writes = 0
+        # Striped locks keep memory bounded no matter how many sessions exist
+        self.locks = [threading.Lock() for _ in range(64)]
+
+    def get(self, name):
+        with self.data_lock:
+            entry = self.data.get(name)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self.data[name]
+                return None
+            return value
+
+    def set(self, name, value, ex=None):
+        expires_at = time.monotonic() + ex if ex else None
+        with self.data_lock:
+            self.data[name] = (value, expires_at)
+            self.writes += 1
+            if self.writes % self.SWEEP_EVERY == 0:
+                self._sweep()
+        return True
+
+    def _sweep(self):
+        # Keys of abandoned sessions are never read again, so expiry on read alone would keep them forever
+        now = time.monotonic()
+        expired = [name for name, (_, expires_at) in self.data.items()
+                   if expires_at is not None and expires_at <= now]
+        for name in expired:
+            del self.data[name]
+
+    def expire(self, name, seconds):
+        with self.data_lock:
+            entry = self.data.get(name)
+            if entry is None:
+                return False
+            self.data[name] = (entry[0], time.monotonic() + seconds)
+            return True
+
+    def delete(self, *names):
+        with self.data_lock:
+            return sum(self.data.pop(name, None) is not None for name in names)
+
+    def lock(self, name, timeout=None):
+        return self.locks[hash(name) % len(self.locks)]
+
+
+class LockKeeper:
+    """Renews Redis locks for as long as requests hold them
+
+    One daemon thread calls reacquire() on every held lock each interval,
+    restarting its timeout, so a request that outlasts the timeout keeps
+    its lock. A worker that dies stops renewing and its locks expire.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.held = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @contextmanager
+    def hold(self, lock):
+        with self.lock:
+            self.held.add(lock)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._renew, name='redis-lock-keeper', daemon=True)
+                self.thread.start()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.held.discard(lock)
+
+    def _renew(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                held = list(self.held)
+            for lock in held:
+                try:
+                    lock.reacquire()
+                except Exception:
+                    pass  # released since it was listed
+
+
+class RedisStateStore(SerializedStateStore):
+    """Snapshots in Redis (or LocalRedis) so workers on any host share state"""
+
+    LOCK_TIMEOUT = 10
+
+    def __init__(self, builders, client=None, ttl=1800, prefix='dsa:'):
+        super().__init__(builders, ttl)
+        self.client = client if client is not None else LocalRedis()
+        self.prefix = prefix
+        self.keeper = LockKeeper(self.LOCK_TIMEOUT / 3)
+
+    @contextmanager
+    def _lock(self, key, read_only=False):
+        # A single GET is atomic on its own, only read-modify-write needs the lock
+        if read_only:
+            yield
+            return
+        lock = self.client.lock(f"{self.prefix}lock:{key}", timeout=self.LOCK_TIMEOUT)
+        with lock:
+            # LocalRedis locks never expire, so only Redis locks need renewing
+            with self.keeper.hold(lock) if hasattr(lock, 'reacquire') else nullcontext():
+                yield
+
+    def _read(self, key):
+        return self.client.get(self.prefix + key)
+
+    def _write(self, key, blob):
+        self.client.set(self.prefix + key, blob, ex=self.ttl)
+
+    def _delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def _touch(self, key):
+        self.client.expire(self.prefix + key, self.ttl)
+
+
+def create_state_store(config, builders):
+    """Build the state store selected by STATE_BACKEND"""
+    backend = config.get('STATE_BACKEND', 'memory')
+    ttl = config['SESSION_TTL']
+
+    if backend == 'memory':
+        return MemoryStateStore(builders, max_sessions=config['MAX_SESSIONS'], ttl=ttl)
+    if backend == 'sqlite':
+        return SQLiteStateStore(builders, path=config['STATE_SQLITE_PATH'], ttl=ttl,
+                                max_entries=config['MAX_SESSIONS'] * len(builders))
+    if backend == 'redis':
+        client = None
+        if config.get('REDIS_URL'):
+            if redis is None:
+                raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+            client = redis.Redis.from_url(config['REDIS_URL'])
+        return RedisStateStore(builders, client=client, ttl=ttl)
+    raise ValueError(f"Unknown state backend: {backend}")
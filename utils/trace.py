@@ -0,0 +1,20 @@
+#trace.py
+
+
+class TraceWindow:
+    """Counts every trace event but only keeps those inside [offset, offset + limit)
+
+    Large inputs can produce millions of events, this keeps memory
+    bounded by the window a client asked for.
+    """
+
+    def __init__(self, offset=0, limit=None):
+        self.offset = offset
+        self.end = None if limit is None else offset + limit
+        self.total = 0
+        self.events = []
+
+    def append(self, event):
+        if self.total >= self.offset and (self.end is None or self.total < self.end):
+            self.events.append(event)
+        self.total += 1
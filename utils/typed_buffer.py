@@ -0,0 +1,54 @@
+#typed_buffer.py
+from array import array
+
+# Element types a structure can hold unboxed, mapped to their array typecodes
+ELEMENT_TYPES = {'int': 'q', 'float': 'd'}
+INT_MIN = -2 ** 63
+INT_MAX = 2 ** 63 - 1
+
+
+def check_capacity(capacity):
+    """Validate a capacity, None meaning unbounded"""
+    if capacity is None:
+        return None
+    if isinstance(capacity, bool) or not isinstance(capacity, int) or capacity < 1:
+        raise Exception("Capacity must be a positive integer or null")
+    return capacity
+
+
+def check_element_type(element_type):
+    """Validate an element type, None meaning any JSON value"""
+    if element_type is not None and element_type not in ELEMENT_TYPES:
+        raise Exception(f"Element type must be one of: {', '.join(ELEMENT_TYPES)}")
+    return element_type
+
+
+def new_buffer(element_type, values=(), size=None):
+    """Get a list, or a typed array for a numeric element type, padded to size slots"""
+    if element_type is None:
+        buffer = list(values)
+        padding = [None]
+    else:
+        buffer = array(ELEMENT_TYPES[element_type], values)
+        padding = array(buffer.typecode, [0])
+    if size is not None and size > len(buffer):
+        buffer.extend(padding * (size - len(buffer)))
+    return buffer
+
+
+def coerce_value(element_type, value):
+    """Check a value fits the element type, converting ints to floats for float buffers"""
+    if element_type is None:
+        return value
+    if element_type == 'int':
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise Exception("Value must be an int")
+        if not INT_MIN <= value <= INT_MAX:
+            raise Exception("Value is out of the 64-bit integer range")
+        return value
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise Exception("Value must be a float")
+    try:
+        return float(value)
+    except OverflowError:
+        raise Exception("Value is out of the float range")
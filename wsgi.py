@@ -0,0 +1,26 @@
+# Production entry point:
+#   python wsgi.py                          threaded server (waitress when installed)
+#   gunicorn -c gunicorn.conf.py wsgi:app   SERVER_WORKERS processes of SERVER_THREADS threads,
+#                                           or of greenlets with DSA_SERVER_WORKER_CLASS=gevent
+from app import app
+
+
+def serve():
+    host = app.config['SERVER_HOST']
+    port = app.config['SERVER_PORT']
+    try:
+        import waitress
+    except ImportError:  # waitress is optional, werkzeug's server is used instead
+        waitress = None
+    if waitress is not None:
+        waitress.serve(app, host=host, port=port, threads=app.config['SERVER_THREADS'])
+        return
+    from werkzeug.serving import run_simple
+    if app.config['SERVER_WORKERS'] > 1:
+        run_simple(host, port, app, processes=app.config['SERVER_WORKERS'])
+    else:
+        run_simple(host, port, app, threaded=True)
+
+
+if __name__ == '__main__':
+    serve()